@@ -0,0 +1,11 @@
+from django.contrib import admin
+
+from core.admin import PerformanceModeMixin
+from .models import ArchivedPost
+
+
+@admin.register(ArchivedPost)
+class ArchivedPostAdmin(PerformanceModeMixin, admin.ModelAdmin):
+    list_display = ('pk', 'text', 'pub_date', 'author_id', 'archived')
+    raw_id_fields = ('author', 'group')
+    empty_value_display = '-пусто-'
@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from archive.utils import archive_posts
+
+
+class Command(BaseCommand):
+    help = 'Переносит старые записи и их комментарии в архив пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int,
+                            default=settings.ARCHIVE_AFTER_DAYS)
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        older_than = timezone.now() - timedelta(days=options['days'])
+        moved = archive_posts(older_than, options['batch_size'],
+                              stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(f'Перенесено записей: {moved}'))
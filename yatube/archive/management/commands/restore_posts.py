@@ -0,0 +1,34 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from archive.models import ArchivedPost
+from archive.utils import restore_posts
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Возвращает записи из архива в основную таблицу.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('ids', nargs='*', type=int)
+        parser.add_argument('--author', help='username автора')
+        parser.add_argument('--all', action='store_true')
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        queryset = ArchivedPost.objects.all()
+        if options['ids']:
+            queryset = queryset.filter(pk__in=options['ids'])
+        elif options['author']:
+            author = User.objects.filter(
+                username=options['author']).first()
+            if author is None:
+                raise CommandError('Пользователь не найден')
+            queryset = queryset.filter(author_id=author.pk)
+        elif not options['all']:
+            raise CommandError('Укажите id записей, --author или --all')
+        restored = restore_posts(queryset, options['batch_size'],
+                                 stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(
+            f'Восстановлено записей: {restored}'))
@@ -0,0 +1,47 @@
+# Generated by Django 2.2.28 on 2026-10-19 14:44
+
+from django.db import migrations, models
+from django.db.models import CharField, Value
+from django.db.models.functions import Cast, LPad
+
+
+def fill_root_paths(apps, schema_editor):
+    # Все существующие комментарии — корни своих веток.
+    ArchivedComment = apps.get_model('archive', 'ArchivedComment')
+    ArchivedComment.objects.using(schema_editor.connection.alias).update(
+        path=LPad(Cast('id', CharField()), 10, Value('0')), depth=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('archive', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='archivedcomment',
+            options={'ordering': ('path',)},
+        ),
+        migrations.AddField(
+            model_name='archivedcomment',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=1, verbose_name='Глубина'),
+        ),
+        migrations.AddField(
+            model_name='archivedcomment',
+            name='parent_id',
+            field=models.IntegerField(blank=True, null=True, verbose_name='Ответ на'),
+        ),
+        migrations.AddField(
+            model_name='archivedcomment',
+            name='path',
+            field=models.CharField(blank=True, max_length=255, verbose_name='Путь в ветке'),
+        ),
+        migrations.AddField(
+            model_name='archivedcomment',
+            name='reply_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Ответов в ветке'),
+        ),
+        migrations.RunPython(fill_root_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 2.2.28 on 2026-10-19 14:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('archive', '0002_comment_threads'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedpost',
+            name='text_html',
+            field=models.TextField(blank=True, verbose_name='HTML текста'),
+        ),
+        migrations.AddField(
+            model_name='archivedpost',
+            name='text_html_version',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='Версия рендерера'),
+        ),
+    ]
@@ -0,0 +1,61 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+
+from posts.models import Group
+
+User = get_user_model()
+
+
+class ArchivedPost(models.Model):
+    """Запись, перенесённая из posts_post. id совпадает с исходным."""
+    id = models.IntegerField(primary_key=True)
+    title = models.TextField('Оглавление', blank=True)
+    text = models.TextField('Текст')
+    text_html = models.TextField('HTML текста', blank=True)
+    text_html_version = models.PositiveSmallIntegerField('Версия рендерера',
+                                                         default=0)
+    pub_date = models.DateTimeField('Дата публикации')
+    author = models.ForeignKey(User, on_delete=models.DO_NOTHING,
+                               db_constraint=False, related_name='+',
+                               verbose_name='Автор')
+    group = models.ForeignKey(Group, on_delete=models.DO_NOTHING,
+                              db_constraint=False, blank=True, null=True,
+                              related_name='+', verbose_name='Сообщество')
+    image = models.ImageField('Картинка', upload_to='posts/', blank=True)
+    image_width = models.PositiveIntegerField('Ширина картинки', blank=True,
+                                              null=True, editable=False)
+    image_height = models.PositiveIntegerField('Высота картинки', blank=True,
+                                               null=True, editable=False)
+    image_color = models.CharField('Цвет картинки', max_length=7, blank=True,
+                                   editable=False)
+    image_placeholder = models.TextField('Превью картинки', blank=True,
+                                         editable=False)
+    like = models.IntegerField('Like', default=0)
+    archived = models.DateTimeField('Дата архивации', auto_now_add=True)
+
+    class Meta:
+        ordering = ('-pub_date',)
+        verbose_name = 'Архивная запись'
+        verbose_name_plural = 'Архивные записи'
+        indexes = [models.Index(fields=['author', '-pub_date'],
+                                name='archived_post_author_idx')]
+
+    def __str__(self):
+        return self.text[:15]
+
+
+class ArchivedComment(models.Model):
+    id = models.IntegerField(primary_key=True)
+    post = models.ForeignKey(ArchivedPost, on_delete=models.CASCADE,
+                             related_name='comments')
+    author = models.ForeignKey(User, on_delete=models.DO_NOTHING,
+                               db_constraint=False, related_name='+')
+    text = models.TextField('Текст комментария')
+    created = models.DateTimeField('Время и дата комментария')
+    parent_id = models.IntegerField('Ответ на', blank=True, null=True)
+    path = models.CharField('Путь в ветке', max_length=255, blank=True)
+    depth = models.PositiveSmallIntegerField('Глубина', default=1)
+    reply_count = models.PositiveIntegerField('Ответов в ветке', default=0)
+
+    class Meta:
+        ordering = ('path',)
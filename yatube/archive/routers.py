@@ -0,0 +1,36 @@
+from django.conf import settings
+
+
+class ArchiveRouter:
+    """Направляет модели архива в базу ARCHIVE_DATABASE.
+
+    Пользователи и группы всегда читаются из основной базы, в том числе
+    когда к ним обращаются через архивную запись.
+    """
+    app_label = 'archive'
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label == self.app_label:
+            return settings.ARCHIVE_DATABASE
+        instance = hints.get('instance')
+        if (instance is not None
+                and instance._meta.app_label == self.app_label):
+            return 'default'
+        return None
+
+    db_for_write = db_for_read
+
+    def allow_relation(self, obj1, obj2, **hints):
+        labels = {obj1._meta.app_label, obj2._meta.app_label}
+        if self.app_label in labels:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        if settings.ARCHIVE_DATABASE == 'default':
+            return None
+        if app_label == self.app_label:
+            return db == settings.ARCHIVE_DATABASE
+        if db == settings.ARCHIVE_DATABASE:
+            return False
+        return None
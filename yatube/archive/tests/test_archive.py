@@ -0,0 +1,172 @@
+from datetime import timedelta
+from http import HTTPStatus
+from unittest import mock
+
+from archive.models import ArchivedComment, ArchivedPost
+from archive.utils import (ChainedPosts, archive_posts, archived_posts,
+                           restore_posts)
+from django.contrib.auth import get_user_model
+from django.db import OperationalError, connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from moderation.models import COMMENT, POST, Signature
+from posts.models import Comment, Post
+from profile_edit.models import ProfileEdit
+from tags.models import PostTag
+
+User = get_user_model()
+
+
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        ProfileEdit.objects.create(author=cls.user, description='о себе',
+                                   profile_image='profile_image/a.png')
+        cls.old_posts = []
+        for number in range(3):
+            post = Post.objects.create(author=cls.user,
+                                       text=f'старая запись {number}')
+            Comment.objects.create(post=post, author=cls.user, text='!')
+            cls.old_posts.append(post)
+            Post.objects.filter(pk=post.pk).update(
+                pub_date=timezone.now() - timedelta(days=1000 - number))
+        cls.new_post = Post.objects.create(author=cls.user,
+                                           text='свежая запись')
+
+    def test_archive_moves_posts_and_comments(self):
+        '''Старые записи с комментариями уходят в архив пачками'''
+        moved = archive_posts(timezone.now() - timedelta(days=365),
+                              batch_size=2)
+
+        self.assertEqual(moved, 3)
+        self.assertEqual(list(Post.objects.all()), [self.new_post])
+        self.assertEqual(ArchivedComment.objects.count(), 3)
+        self.assertFalse(Comment.objects.exists())
+
+    def test_views_fall_through_to_archive(self):
+        '''Страница записи и профиль находят архивные записи'''
+        archive_posts(timezone.now() - timedelta(days=365))
+        post = self.old_posts[0]
+
+        detail = self.client.get(reverse('posts:post_detail',
+                                         args=(post.pk,)))
+        profile = self.client.get(reverse('posts:profile',
+                                          args=(self.user.username,)))
+
+        self.assertEqual(detail.status_code, HTTPStatus.OK)
+        self.assertTrue(detail.context['is_archived'])
+        self.assertEqual(len(detail.context['comments']), 1)
+        self.assertEqual(profile.context['card']['posts_count'], 4)
+        self.assertEqual(
+            [item.pk for item in profile.context['page_obj']],
+            [self.new_post.pk] + [p.pk for p in reversed(self.old_posts)])
+
+    def test_restore(self):
+        '''Записи возвращаются из архива с исходными датами'''
+        archive_posts(timezone.now() - timedelta(days=365))
+
+        restored = restore_posts(ArchivedPost.objects.all())
+
+        self.assertEqual(restored, 3)
+        self.assertEqual(Post.objects.count(), 4)
+        self.assertEqual(Comment.objects.count(), 3)
+        self.assertLess(Post.objects.get(pk=self.old_posts[0].pk).pub_date,
+                        timezone.now() - timedelta(days=365))
+
+    def test_image_meta_round_trip(self):
+        '''Метаданные картинки переживают архивацию и возврат'''
+        post = self.old_posts[0]
+        meta = {'image': 'posts/a.png', 'image_width': 40,
+                'image_height': 20, 'image_color': '#c80000',
+                'image_placeholder': 'data:image/jpeg;base64,AA=='}
+        Post.objects.filter(pk=post.pk).update(**meta)
+
+        archive_posts(timezone.now() - timedelta(days=365))
+        archived = ArchivedPost.objects.values(*meta).get(pk=post.pk)
+        restore_posts(ArchivedPost.objects.all())
+
+        self.assertEqual(archived, meta)
+        self.assertEqual(Post.objects.values(*meta).get(pk=post.pk), meta)
+
+    def test_restore_reindexes(self):
+        '''Возвращённые записи снова попадают в теги и индекс дубликатов'''
+        text = ('Длинная #история про поход в горы, озеро и ночёвку '
+                'в палатке под звёздами')
+        post = self.old_posts[0]
+        Post.objects.filter(pk=post.pk).update(text=text)
+        comment = Comment.objects.create(
+            post=post, author=self.user,
+            text='Очень длинный комментарий, который стоит проиндексировать')
+        archive_posts(timezone.now() - timedelta(days=365))
+        self.assertFalse(PostTag.objects.filter(post_id=post.pk).exists())
+
+        restore_posts(ArchivedPost.objects.all())
+
+        self.assertTrue(PostTag.objects.filter(post_id=post.pk).exists())
+        self.assertTrue(Signature.objects.filter(
+            kind=POST, object_id=post.pk).exists())
+        self.assertTrue(Signature.objects.filter(
+            kind=COMMENT, object_id=comment.pk).exists())
+
+    def test_chain_with_overlapping_dates(self):
+        '''Горячая запись старше архивных встаёт на своё место'''
+        archive_posts(timezone.now() - timedelta(days=365))
+        Post.objects.filter(pk=self.new_post.pk).update(
+            pub_date=timezone.now() - timedelta(days=999, hours=12))
+        hot = Post.objects.filter(author=self.user).order_by('-pub_date',
+                                                             '-pk')
+        archived = archived_posts(author=self.user).order_by('-pub_date',
+                                                             '-pk')
+
+        chained = ChainedPosts(hot, archived)
+
+        self.assertEqual(
+            [post.pk for post in chained[0:4]],
+            [self.old_posts[2].pk, self.old_posts[1].pk, self.new_post.pk,
+             self.old_posts[0].pk])
+        self.assertEqual(chained[2].pk, self.new_post.pk)
+
+
+@override_settings(ARCHIVE_DATABASE='archive')
+class SeparateArchiveTests(TransactionTestCase):
+    databases = {'default', 'archive'}
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='author')
+        self.post = Post.objects.create(author=self.user, text='старая')
+        Comment.objects.create(post=self.post, author=self.user, text='!')
+        Post.objects.filter(pk=self.post.pk).update(
+            pub_date=timezone.now() - timedelta(days=1000))
+        self.older_than = timezone.now() - timedelta(days=365)
+
+    def fail_commit(self, alias):
+        return mock.patch.object(connections[alias], 'commit',
+                                 side_effect=OperationalError('locked'))
+
+    def test_archive_commit_failure_keeps_rows(self):
+        '''Сбой фиксации архива не удаляет записи из горячей таблицы'''
+        with self.fail_commit('archive'), \
+                self.assertRaises(OperationalError):
+            archive_posts(self.older_than)
+
+        self.assertTrue(Post.objects.filter(pk=self.post.pk).exists())
+        self.assertEqual(Comment.objects.count(), 1)
+        self.assertEqual(archive_posts(self.older_than), 1)
+        self.assertFalse(Post.objects.exists())
+        self.assertEqual(ArchivedComment.objects.using('archive').count(), 1)
+
+    def test_restore_commit_failure_keeps_rows(self):
+        '''Сбой фиксации в горячей базе не удаляет записи из архива'''
+        archive_posts(self.older_than)
+
+        with self.fail_commit('default'), \
+                self.assertRaises(OperationalError):
+            restore_posts(ArchivedPost.objects.all())
+
+        self.assertTrue(ArchivedPost.objects.filter(pk=self.post.pk).exists())
+        self.assertEqual(restore_posts(ArchivedPost.objects.all()), 1)
+        self.assertFalse(ArchivedPost.objects.exists())
+        self.assertEqual(Comment.objects.count(), 1)
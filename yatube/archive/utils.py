@@ -0,0 +1,206 @@
+import heapq
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.functional import cached_property
+
+from core.images import IMAGE_FIELDS
+from core.surrogates import purge
+from moderation.models import COMMENT, POST
+from moderation.utils import index_batch
+from posts.groups import posts_added
+from posts.importer import insert_as_is
+from posts.models import Comment, Group, Post
+from shards.utils import delete_posts, shard_aliases, shard_for_author
+from tags.utils import sync_posts
+from .models import ArchivedComment, ArchivedPost
+
+POST_FIELDS = ('id', 'title', 'text', 'text_html', 'text_html_version',
+               'pub_date', 'author_id', 'group_id', 'image', 'like',
+               *IMAGE_FIELDS)
+COMMENT_FIELDS = ('id', 'post_id', 'author_id', 'text', 'created',
+                  'parent_id', 'path', 'depth', 'reply_count')
+
+
+def _move(ids, post_source, comment_source, post_model, comment_model,
+          using=None):
+    insert_as_is(
+        post_model,
+        [post_model(**row) for row in
+         post_source.filter(pk__in=ids).values(*POST_FIELDS)],
+        ignore_conflicts=True,
+        using=using,
+    )
+    insert_as_is(
+        comment_model,
+        (comment_model(**row) for row in
+         comment_source.filter(post_id__in=ids).values(*COMMENT_FIELDS)
+         .iterator()),
+        batch_size=settings.ARCHIVE_BATCH_SIZE,
+        ignore_conflicts=True,
+        using=using,
+    )
+    # Группы лежат только в основной базе, поэтому slug не берётся JOIN-ом.
+    rows = list(post_source.filter(pk__in=ids).values_list(
+        'pk', 'author_id', 'group_id'))
+    slugs = dict(Group.objects.filter(
+        pk__in={group_id for _, _, group_id in rows}).values_list(
+        'pk', 'slug'))
+    keys = {'index'}
+    for pk, author_id, group_id in rows:
+        keys.update((f'post:{pk}', f'author:{author_id}'))
+        if group_id in slugs:
+            keys.add(f'group:{slugs[group_id]}')
+    if post_source.model is Post:
+        delete_posts(post_source.db, ids)
+    else:
+        post_source.filter(pk__in=ids).delete()
+    purge(*keys)
+
+
+def archive_posts(older_than, batch_size=None, stdout=None):
+    """Переносит записи старше older_than вместе с комментариями в архив.
+
+    Шарды обходятся по очереди. Каждая пачка копируется и удаляется из
+    горячей таблицы во вложенных транзакциях: транзакция архива
+    фиксируется первой, удаление из шарда — после неё, чистка тегов и
+    уведомлений в основной базе — последней. При сбое между фиксациями
+    строки остаются в обеих таблицах, и повторный запуск просто удаляет
+    уже скопированное.
+    """
+    batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+    moved = 0
+    for alias in shard_aliases():
+        posts = Post.objects.using(alias)
+        while True:
+            ids = list(posts.filter(pub_date__lt=older_than)
+                       .order_by('pk')
+                       .values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                break
+            with transaction.atomic(), \
+                    transaction.atomic(using=alias), \
+                    transaction.atomic(using=settings.ARCHIVE_DATABASE):
+                _move(ids, posts, Comment.objects.using(alias),
+                      ArchivedPost, ArchivedComment)
+            moved += len(ids)
+            if stdout is not None:
+                stdout.write(f'В архиве: {moved}')
+    return moved
+
+
+def restore_posts(queryset, batch_size=None, stdout=None):
+    """Возвращает архивные записи из queryset в горячую таблицу.
+
+    Записи пачки раскладываются по шардам авторов. Как и в
+    archive_posts, первой фиксируется вставка в шард, затем статистика
+    и теги в основной базе, а удаление из архива — последним.
+
+    Записи, ушедшие в архив до появления полей image_* у ArchivedPost,
+    возвращаются без метаданных картинок: их заполняет
+    manage.py backfill_image_meta.
+    """
+    batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+    restored = 0
+    while True:
+        rows = list(queryset.order_by('pk')
+                    .values_list('pk', 'author_id')[:batch_size])
+        if not rows:
+            return restored
+        by_shard = {}
+        for pk, author_id in rows:
+            by_shard.setdefault(shard_for_author(author_id, create=True),
+                                []).append(pk)
+        for alias, ids in by_shard.items():
+            with transaction.atomic(using=settings.ARCHIVE_DATABASE), \
+                    transaction.atomic(), \
+                    transaction.atomic(using=alias):
+                _move(ids, ArchivedPost.objects, ArchivedComment.objects,
+                      Post, Comment, using=alias)
+                # Вставка не шлёт сигналов: статистика групп, теги и
+                # индекс дубликатов, очищенные при архивации, заполняются
+                # вручную.
+                posts = list(Post.objects.using(alias).filter(
+                    pk__in=ids).only('text', 'group_id', 'pub_date'))
+                posts_added(posts)
+                sync_posts(posts)
+                index_batch(POST, [(post.pk, post.text) for post in posts])
+                index_batch(COMMENT, list(Comment.objects.using(alias)
+                                          .filter(post_id__in=ids)
+                                          .values_list('pk', 'text')))
+        restored += len(rows)
+        if stdout is not None:
+            stdout.write(f'Восстановлено: {restored}')
+
+
+class ChainedPosts:
+    """Последовательность для Paginator: сначала горячие записи, затем архив.
+
+    Обе выборки упорядочены по убыванию даты. Обычно архивные записи
+    старше любой горячей, и срез склеивается из двух срезов со смещением.
+    Если даты пересекаются (импорт с исходными датами, частичное
+    восстановление), срез собирается слиянием по (pub_date, id).
+    """
+    ordered = True
+
+    def __init__(self, hot, archived):
+        self.hot = hot
+        self.archived = archived
+
+    @cached_property
+    def hot_count(self):
+        return self.hot.count()
+
+    @cached_property
+    def total(self):
+        return self.hot_count + self.archived.count()
+
+    def count(self):
+        return self.total
+
+    def __len__(self):
+        return self.total
+
+    @cached_property
+    def overlapping(self):
+        oldest_hot = self.hot.values_list('pub_date', flat=True).last()
+        newest_archived = self.archived.values_list(
+            'pub_date', flat=True).first()
+        return (oldest_hot is not None and newest_archived is not None
+                and newest_archived > oldest_hot)
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start = index.start or 0
+        stop = self.total if index.stop is None else index.stop
+        if self.overlapping:
+            merged = heapq.merge(
+                self.hot[:stop], self.archived[:stop],
+                key=lambda post: (post.pub_date, post.pk), reverse=True)
+            return list(islice(merged, start, stop))
+        result = []
+        if start < self.hot_count:
+            result.extend(self.hot[start:min(stop, self.hot_count)])
+        if stop > self.hot_count:
+            result.extend(self.archived[max(start - self.hot_count, 0):
+                                        stop - self.hot_count])
+        return result
+
+
+def _with_related(queryset, *fields):
+    if settings.ARCHIVE_DATABASE == 'default':
+        return queryset.select_related(*fields)
+    return queryset
+
+
+def archived_posts(**filters):
+    """Архивные записи; авторы и группы подтягиваются JOIN-ом, если архив
+    лежит в основной базе."""
+    return _with_related(ArchivedPost.objects.filter(**filters),
+                         'author', 'group')
+
+
+def archived_comments(post):
+    return _with_related(post.comments.all(), 'author')
@@ -0,0 +1,89 @@
+from django import forms
+from django.conf import settings
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """Пагинатор, не считающий COUNT(*) по всей таблице на каждый запрос.
+
+    Число строк выборки без фильтров берётся из кэша и пересчитывается
+    раз в ADMIN_COUNT_TIMEOUT: список может отставать от таблицы на
+    несколько минут, но, в отличие от оценки по максимальному id, не
+    завышается из-за удалённых строк.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if queryset.query.where:
+            return super().count
+        key = f'admin-count:{queryset.model._meta.label_lower}:{queryset.db}'
+        count = cache.get(key)
+        if count is None:
+            count = queryset.model._default_manager.using(
+                queryset.db).count()
+            cache.set(key, count, settings.ADMIN_COUNT_TIMEOUT)
+        return count
+
+
+class PreloadedAutocompleteSelect(AutocompleteSelect):
+    """Автодополнение, берущее выбранный объект из уже загруженной строки.
+
+    Стандартный виджет делает по запросу на каждую строку списка, чтобы
+    узнать подпись выбранного значения.
+    """
+    selected_object = None
+
+    def optgroups(self, name, value, attr=None):
+        selected = self.selected_object
+        values = [str(v) for v in value
+                  if str(v) not in self.choices.field.empty_values]
+        if selected is None or values != [str(selected.pk)]:
+            return super().optgroups(name, value, attr)
+        options = []
+        if not self.is_required:
+            options.append(self.create_option(name, '', '', False, 0))
+        options.append(self.create_option(
+            name, selected.pk, self.choices.field.label_from_instance(selected),
+            True, len(options)))
+        return [(None, options, 0)]
+
+
+class PreloadedChangeListForm(forms.ModelForm):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for name, field in self.fields.items():
+            widget = getattr(field.widget, 'widget', field.widget)
+            if isinstance(widget, PreloadedAutocompleteSelect):
+                widget.selected_object = getattr(self.instance, name, None)
+
+
+class PerformanceModeMixin:
+    """Настройки списка в админке для больших таблиц.
+
+    Включается параметром ADMIN_PERFORMANCE_MODE: оценка числа строк вместо
+    COUNT(*) и виджеты автодополнения в list_editable без запроса на строку.
+    Связанные объекты должны быть перечислены в list_select_related.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if settings.ADMIN_PERFORMANCE_MODE:
+            self.paginator = EstimatedCountPaginator
+            self.show_full_result_count = False
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if (settings.ADMIN_PERFORMANCE_MODE and 'widget' not in kwargs
+                and db_field.name in self.get_autocomplete_fields(request)):
+            kwargs['widget'] = PreloadedAutocompleteSelect(
+                db_field.remote_field, self.admin_site,
+                using=kwargs.get('using'))
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def get_changelist_form(self, request, **kwargs):
+        if settings.ADMIN_PERFORMANCE_MODE:
+            kwargs.setdefault('form', PreloadedChangeListForm)
+        return super().get_changelist_form(request, **kwargs)
@@ -0,0 +1,28 @@
+"""Массовые операции без обработки ORM по строкам.
+
+Публичного способа удалить строки одним DELETE без сигналов и каскада
+или вставить объекты без подмены полей (pk, auto_now_add) в Django нет.
+Все обращения к приватным QuerySet._raw_delete и Manager._insert
+собраны здесь, а core/tests/test_bulk.py проверяет их поведение при
+обновлении Django.
+"""
+
+
+def raw_delete(queryset):
+    """Удаляет строки queryset одним DELETE: без выборки строк, сигналов
+    pre_delete/post_delete и каскада. Возвращает число удалённых строк.
+
+    Для случаев, когда сигналы заменены своими (follows_changed) или
+    каскад удалил бы чужие данные (перенос автора между шардами).
+    """
+    return queryset._raw_delete(queryset.db)
+
+
+def raw_insert(model, objs, fields, using, ignore_conflicts=False):
+    """Вставляет объекты одним INSERT как есть, без сигналов.
+
+    Значения полей берутся из объектов без pre_save: pk и поля
+    auto_now_add не подменяются. Размер пачки выбирает вызывающий.
+    """
+    model._base_manager._insert(objs, fields=fields, raw=True, using=using,
+                                ignore_conflicts=ignore_conflicts)
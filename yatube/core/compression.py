@@ -0,0 +1,150 @@
+import gzip
+import hashlib
+import re
+import zlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE = re.compile(
+    r'^(text/|application/(json|javascript|xml|xhtml\+xml)|image/svg\+xml)')
+
+
+def accepted_encodings():
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate(accept_encoding):
+    """Выбирает кодировку из Accept-Encoding: br важнее gzip."""
+    offered = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        quality = 1.0
+        match = re.search(r'q=([0-9.]+)', params)
+        if match:
+            try:
+                quality = float(match.group(1))
+            except ValueError:
+                quality = 0.0
+        offered[name.strip().lower()] = quality
+    for encoding in accepted_encodings():
+        if offered.get(encoding, offered.get('*', 0)) > 0:
+            return encoding
+    return None
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=settings.COMPRESSION_BROTLI_LEVEL)
+    return gzip.compress(data, compresslevel=settings.COMPRESSION_GZIP_LEVEL,
+                         mtime=0)
+
+
+def shared_response(request, response):
+    """Ответ, одинаковый у разных посетителей: явно публичный или
+    отданный анониму без Cache-Control: private/no-store."""
+    directives = cache_directives(response)
+    if 'public' in directives:
+        return True
+    if directives & {'private', 'no-store'}:
+        return False
+    user = getattr(request, 'user', None)
+    return user is None or not user.is_authenticated
+
+
+def cache_directives(response):
+    return {part.split('=', 1)[0].strip().lower()
+            for part in response.get('Cache-Control', '').split(',')}
+
+
+def compress_cached(data, encoding):
+    """Сжимает data, запоминая результат по хешу содержимого.
+
+    Вызывается только для общих ответов (shared_response): страницы из
+    кэша фрагментов и {% cache %} у анонимов совпадают байт в байт, и
+    популярная страница сжимается один раз. Персональные страницы в кэш
+    не попадают и не вытесняют оттуда общие.
+    """
+    if len(data) > settings.COMPRESSION_CACHE_MAX_LENGTH:
+        return compress(data, encoding)
+    cache = caches[settings.COMPRESSION_CACHE]
+    key = f'compressed:{encoding}:{hashlib.sha1(data).hexdigest()}'
+    compressed = cache.get(key)
+    if compressed is None:
+        compressed = compress(data, encoding)
+        cache.set(key, compressed, settings.COMPRESSION_CACHE_TIMEOUT)
+    return compressed
+
+
+def compress_stream(chunks, encoding):
+    if encoding == 'br':
+        compressor = brotli.Compressor(
+            quality=settings.COMPRESSION_BROTLI_LEVEL)
+        for chunk in chunks:
+            data = compressor.process(chunk)
+            # Сбрасываем буфер, чтобы клиент получал куски сразу.
+            data += compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+        return
+    compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL,
+                                  zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Сжимает ответы brotli или gzip в зависимости от Accept-Encoding.
+
+    Маленькие, уже сжатые, частичные (Range), помеченные no-transform и
+    несжимаемые по Content-Type ответы отдаются как есть; потоковые
+    ответы сжимаются на лету по кускам.
+    """
+    def process_response(self, request, response):
+        if (response.has_header('Content-Encoding')
+                or response.has_header('Content-Range')
+                or 'no-transform' in cache_directives(response)):
+            return response
+        content_type = response.get('Content-Type', '')
+        if not COMPRESSIBLE.match(content_type):
+            return response
+        if (not response.streaming
+                and len(response.content) < settings.COMPRESSION_MIN_LENGTH):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compress_stream(
+                response.streaming_content, encoding)
+            del response['Content-Length']
+        else:
+            if shared_response(request, response):
+                compressed = compress_cached(response.content, encoding)
+            else:
+                compressed = compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            # Сжатое представление не совпадает побайтно с исходным.
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,62 @@
+import base64
+import io
+
+from django.conf import settings
+from PIL import Image, ImageFilter
+
+IMAGE_FIELDS = ('image_width', 'image_height', 'image_color',
+                'image_placeholder')
+
+EMPTY = {'image_width': None, 'image_height': None,
+         'image_color': '', 'image_placeholder': ''}
+
+
+def analyze(file):
+    """Размеры, преобладающий цвет и размытая превью-картинка в data URI.
+
+    Превью в несколько сотен байт хранится прямо в строке и подставляется
+    фоном тега img, пока грузится сам файл.
+    """
+    file.seek(0)
+    with Image.open(file) as image:
+        width, height = image.size
+        image = image.convert('RGB')
+        palette = image.resize((64, 64)).quantize(colors=8)
+        _, index = max(palette.getcolors())
+        red, green, blue = palette.getpalette()[index * 3:index * 3 + 3]
+        image.thumbnail((settings.IMAGE_PLACEHOLDER_SIZE,) * 2)
+        image = image.filter(ImageFilter.GaussianBlur(1))
+        buffer = io.BytesIO()
+        image.save(buffer, 'JPEG', quality=settings.IMAGE_PLACEHOLDER_QUALITY)
+    file.seek(0)
+    return {
+        'image_width': width,
+        'image_height': height,
+        'image_color': f'#{red:02x}{green:02x}{blue:02x}',
+        'image_placeholder': 'data:image/jpeg;base64,'
+                             + base64.b64encode(buffer.getvalue()).decode(),
+    }
+
+
+def update_image_meta(instance, field_name, force=False):
+    """Заполняет поля image_* по файлу из field_name.
+
+    Без force файл читается только при новой загрузке (ещё не
+    сохранённый FieldFile), обычное сохранение записи его не трогает.
+    Возвращает True, если поля изменились.
+    """
+    image = getattr(instance, field_name)
+    if not image:
+        meta = EMPTY
+    elif force or not image._committed:
+        try:
+            meta = analyze(image)
+        except (OSError, ValueError):
+            meta = EMPTY
+    else:
+        return False
+    changed = any(getattr(instance, name) != value
+                  for name, value in meta.items())
+    for name, value in meta.items():
+        setattr(instance, name, value)
+    return changed
@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.images import IMAGE_FIELDS, update_image_meta
+from core.surrogates import purge
+from core.versions import bump_version
+from posts.models import Post
+from posts.utils import post_keys
+from profile_edit.models import ProfileEdit
+from shards.utils import shard_aliases
+
+
+def post_changed(post):
+    bump_version('posts.post', post.pk)
+    purge(*post_keys(post))
+
+
+def profile_changed(profile):
+    bump_version('card', profile.author_id)
+    purge(f'author:{profile.author_id}')
+
+
+class Command(BaseCommand):
+    help = ('Заполняет размеры, цвет и превью картинок записей и профилей, '
+            'загруженных до появления этих полей.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int,
+                            default=settings.IMAGE_BACKFILL_CHUNK_SIZE)
+        parser.add_argument('--force', action='store_true',
+                            help='Пересчитать и уже заполненные строки.')
+
+    def _backfill(self, queryset, field_name, on_change):
+        if not self.options['force']:
+            queryset = queryset.filter(image_width__isnull=True)
+        queryset = queryset.exclude(**{field_name: ''}).order_by('pk')
+        updated = 0
+        last_pk = 0
+        while True:
+            chunk = list(queryset.filter(pk__gt=last_pk)
+                         [:self.options['chunk_size']])
+            if not chunk:
+                return updated
+            changed = []
+            for obj in chunk:
+                if update_image_meta(obj, field_name, force=True):
+                    changed.append(obj)
+                getattr(obj, field_name).close()
+            queryset.model.objects.using(queryset.db).bulk_update(
+                changed, IMAGE_FIELDS)
+            for obj in changed:
+                on_change(obj)
+            updated += len(changed)
+            last_pk = chunk[-1].pk
+            self.stdout.write(f'{queryset.model._meta.verbose_name_plural} '
+                              f'до id={last_pk}')
+
+    def handle(self, *args, **options):
+        self.options = options
+        posts = 0
+        for alias in shard_aliases():
+            posts += self._backfill(Post.objects.using(alias), 'image',
+                                    post_changed)
+        profiles = self._backfill(ProfileEdit.objects.all(), 'profile_image',
+                                  profile_changed)
+        self.stdout.write(self.style.SUCCESS(
+            f'Обновлено записей: {posts}, профилей: {profiles}'))
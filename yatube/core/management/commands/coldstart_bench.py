@@ -0,0 +1,51 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+CHILD = '''
+import json, os, sys, time
+started = time.perf_counter()
+from yatube.wsgi import application
+loaded = time.perf_counter() - started
+from core.warmup import request
+requests = [request(application, path)[1] for path in sys.argv[1:]]
+print(json.dumps({'load': loaded, 'requests': requests}))
+'''
+
+
+class Command(BaseCommand):
+    help = ('Измеряет время до первого байта в свежем процессе '
+            'с прогревом и без него.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5)
+        parser.add_argument('paths', nargs='*', default=['/', '/', '/'])
+
+    def _run(self, warm, paths):
+        env = dict(os.environ, YATUBE_WARMUP='1' if warm else '0',
+                   DJANGO_SETTINGS_MODULE=os.environ.get(
+                       'DJANGO_SETTINGS_MODULE', 'yatube.settings'))
+        output = subprocess.run(
+            [sys.executable, '-c', CHILD, *paths], env=env,
+            cwd=settings.BASE_DIR, check=True, stdout=subprocess.PIPE,
+        ).stdout
+        return json.loads(output.decode().strip().splitlines()[-1])
+
+    def handle(self, *args, **options):
+        paths = options['paths']
+        for warm in (False, True):
+            runs = [self._run(warm, paths) for _ in range(options['runs'])]
+            load = statistics.median(run['load'] for run in runs)
+            self.stdout.write(
+                f'{"С прогревом" if warm else "Без прогрева"}: '
+                f'старт воркера {load * 1000:.1f} мс')
+            for index, path in enumerate(paths):
+                ttfb = statistics.median(run['requests'][index]
+                                         for run in runs)
+                self.stdout.write(f'  запрос {index + 1} {path}: '
+                                  f'{ttfb * 1000:.1f} мс')
@@ -0,0 +1,146 @@
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (FileResponse, Http404, HttpResponse,
+                         HttpResponseNotModified, StreamingHttpResponse)
+from django.utils._os import safe_join
+from django.utils.http import http_date, quote_etag
+from django.views.static import was_modified_since
+
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def can_access(request, name):
+    """Публичные каталоги доступны всем, остальное — только персоналу."""
+    if any(part.startswith('.') for part in name.split('/')):
+        return False
+    if name.startswith(tuple(settings.MEDIA_PUBLIC_DIRS)):
+        return True
+    return request.user.is_staff
+
+
+def _etag(stat):
+    return quote_etag(f'{stat.st_mtime_ns:x}-{stat.st_size:x}')
+
+
+def _byte_range(header, size):
+    """(start, end) включительно для одного диапазона или None."""
+    match = RANGE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if first == '':
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start > end or start >= size:
+        raise ValueError(header)
+    return start, end
+
+
+def _read_range(path, start, length):
+    block = settings.MEDIA_BLOCK_SIZE
+    with open(path, 'rb') as source:
+        source.seek(start)
+        while length > 0:
+            chunk = source.read(min(block, length))
+            if not chunk:
+                return
+            length -= len(chunk)
+            yield chunk
+
+
+def _accel(name, path):
+    response = HttpResponse()
+    if settings.MEDIA_ACCEL == 'x-accel-redirect':
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_PREFIX + name
+    else:
+        response['X-Sendfile'] = path
+    # Тип и заголовки кэширования выставит фронтенд по самому файлу.
+    del response['Content-Type']
+    return response
+
+
+def _serve(request, path, stat):
+    etag = _etag(stat)
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match is not None:
+        not_modified = (if_none_match.strip() == '*' or etag in (
+            tag.strip() for tag in if_none_match.split(',')))
+    else:
+        not_modified = not was_modified_since(
+            request.META.get('HTTP_IF_MODIFIED_SINCE'),
+            stat.st_mtime, stat.st_size)
+    if not_modified:
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    content_type, encoding = mimetypes.guess_type(path)
+    content_type = content_type or 'application/octet-stream'
+    byte_range = None
+    if request.META.get('HTTP_RANGE') and request.META.get(
+            'HTTP_IF_RANGE', etag) == etag:
+        try:
+            byte_range = _byte_range(request.META['HTTP_RANGE'],
+                                     stat.st_size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+            return response
+
+    if byte_range is None:
+        # FileResponse отдаёт файл через wsgi.file_wrapper, и сервер может
+        # передать его sendfile без копирования в Python.
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+        response['Content-Length'] = stat.st_size
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            _read_range(path, start, end - start + 1),
+            status=206, content_type=content_type)
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+        response['Content-Length'] = end - start + 1
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    return response
+
+
+def serve(request, path):
+    """Отдаёт файл из MEDIA_ROOT после проверки доступа.
+
+    С MEDIA_ACCEL байты передаёт nginx (X-Accel-Redirect) или
+    Apache/lighttpd (X-Sendfile), и воркер освобождается сразу. Без него
+    работает запасной путь с Range, ETag и If-None-Match.
+    """
+    name = path.lstrip('/')
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, name)
+    except SuspiciousFileOperation:
+        raise Http404('Файл не найден')
+    if not can_access(request, name):
+        raise Http404('Файл не найден')
+    try:
+        stat = os.stat(full_path)
+    except OSError:
+        raise Http404('Файл не найден')
+    if not os.path.isfile(full_path):
+        raise Http404('Файл не найден')
+
+    if settings.MEDIA_ACCEL:
+        response = _accel(name, full_path)
+    else:
+        response = _serve(request, full_path, stat)
+    if name.startswith(tuple(settings.MEDIA_PUBLIC_DIRS)):
+        response['Cache-Control'] = (
+            f'public, max-age={settings.MEDIA_MAX_AGE}')
+    else:
+        response['Cache-Control'] = 'private'
+    return response
@@ -0,0 +1,113 @@
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """'10/m' -> (10, 60)."""
+    count, unit = rate.split('/')
+    return int(count), UNITS[unit]
+
+
+def client_ip(request):
+    if settings.RATELIMIT_TRUST_FORWARDED_FOR:
+        forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+        if forwarded:
+            return forwarded.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _interval(rate):
+    count, period = parse_rate(rate)
+    return count, period * 1000 // count
+
+
+def consume(key, rate, burst=None, now=None):
+    """Берёт жетон из ведра key и возвращает 0 или секунды до повтора.
+
+    Ведро хранится как теоретическое время прихода следующего запроса
+    (GCRA) в миллисекундах, поэтому занять жетон — один атомарный
+    cache.incr без чтения и записи состояния отдельными запросами.
+    Срок жизни ключа после каждого incr продлевается до этого времени:
+    иначе ключ истекал бы под постоянной нагрузкой и выдавал новый burst.
+    """
+    cache = caches[settings.RATELIMIT_CACHE]
+    count, interval = _interval(rate)
+    capacity = (burst or count) * interval
+    timeout = capacity // 1000 + 1
+    now = int((time.time() if now is None else now) * 1000)
+    cache.add(key, now, timeout)
+    try:
+        tat = cache.incr(key, interval)
+    except ValueError:
+        cache.add(key, now + interval, timeout)
+        return 0
+    if tat - interval < now:
+        # Ведро простаивало и полностью наполнилось.
+        cache.set(key, now + interval, interval // 1000 + 1)
+        return 0
+    if tat - now > capacity:
+        tat = cache.decr(key, interval)
+        cache.touch(key, max(tat - now, 0) // 1000 + 1)
+        return (tat + interval - now - capacity) / 1000
+    cache.touch(key, (tat - now) // 1000 + 1)
+    return 0
+
+
+def refund(key, rate):
+    """Возвращает в ведро жетон, взятый consume."""
+    try:
+        caches[settings.RATELIMIT_CACHE].decr(key, _interval(rate)[1])
+    except ValueError:
+        pass
+
+
+def _identities(request):
+    yield f'ip:{client_ip(request)}'
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        yield f'user:{user.pk}'
+        return
+    session = request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if session:
+        yield f'session:{session}'
+
+
+def too_many_requests(retry_after):
+    response = HttpResponse('Слишком много запросов, попробуйте позже.',
+                            status=429,
+                            content_type='text/plain; charset=utf-8')
+    response['Retry-After'] = str(int(retry_after) + 1)
+    return response
+
+
+def ratelimit(view):
+    """Ограничивает частоту запросов к view по настройке RATELIMITS.
+
+    Лимит ищется по имени URL (например, 'posts:add_comment') и считается
+    отдельно для IP и для пользователя (у анонимов — для сессии). Отказ
+    отдаётся до обращения к базе данных.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        match = request.resolver_match
+        limit = match and settings.RATELIMITS.get(match.view_name)
+        if limit and request.method in limit.get('methods',
+                                                 (request.method,)):
+            consumed = []
+            for identity in _identities(request):
+                key = f'ratelimit:{match.view_name}:{identity}'
+                retry_after = consume(key, limit['rate'], limit.get('burst'))
+                if retry_after:
+                    # Отказ по одному ведру не должен тратить жетоны других.
+                    for key in consumed:
+                        refund(key, limit['rate'])
+                    return too_many_requests(retry_after)
+                consumed.append(key)
+        return view(request, *args, **kwargs)
+    return wrapper
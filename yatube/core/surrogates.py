@@ -0,0 +1,118 @@
+import logging
+import threading
+import urllib.request
+from collections import deque
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+HEADER = 'Surrogate-Key'
+
+logger = logging.getLogger(__name__)
+
+
+def tag(request, *keys):
+    """Помечает ответ на запрос суррогатными ключами для кэша на краю."""
+    if not hasattr(request, 'surrogate_keys'):
+        request.surrogate_keys = set()
+    request.surrogate_keys.update(keys)
+
+
+class SurrogateKeyMiddleware:
+    """Пишет ключи из tag() в заголовок Surrogate-Key.
+
+    Анонимные успешные GET-ответы дополнительно получают
+    Surrogate-Control с долгим сроком жизни: прокси хранит их до явной
+    очистки по ключу, а браузер по-прежнему видит обычный Cache-Control.
+    Ключи, очищенные за время запроса, уходят в прокси одним вызовом
+    после ответа.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        _pending.requests = getattr(_pending, 'requests', 0) + 1
+        try:
+            response = self.get_response(request)
+        finally:
+            _pending.requests -= 1
+            if not _pending.requests:
+                _flush()
+        keys = getattr(request, 'surrogate_keys', None)
+        if not keys:
+            return response
+        response[HEADER] = ' '.join(sorted(keys))
+        user = getattr(request, 'user', None)
+        if (request.method in ('GET', 'HEAD')
+                and response.status_code == 200
+                and not (user and user.is_authenticated)
+                and not response.cookies):
+            response['Surrogate-Control'] = (
+                f'max-age={settings.SURROGATE_MAX_AGE}')
+        return response
+
+
+class BasePurger:
+    def purge(self, keys):
+        raise NotImplementedError
+
+
+class LocalPurger(BasePurger):
+    """Заглушка для разработки и тестов: запоминает последние очищенные
+    ключи."""
+    purged = deque(maxlen=1000)
+
+    def purge(self, keys):
+        self.purged.extend(keys)
+
+
+class HTTPPurger(BasePurger):
+    """Отправляет PURGE с ключами в заголовке Surrogate-Key
+    (Varnish xkey, Fastly и совместимые прокси)."""
+    def purge(self, keys):
+        keys = list(keys)
+        size = settings.SURROGATE_PURGE_BATCH_SIZE
+        for start in range(0, len(keys), size):
+            request = urllib.request.Request(
+                settings.SURROGATE_PURGE_URL, method='PURGE',
+                headers={HEADER: ' '.join(keys[start:start + size])})
+            try:
+                urllib.request.urlopen(
+                    request, timeout=settings.SURROGATE_PURGE_TIMEOUT).close()
+            except OSError:
+                # Недоступный прокси не должен ронять запрос: страницы
+                # устареют не дольше SURROGATE_MAX_AGE.
+                logger.exception('Не удалось очистить ключи в прокси')
+
+
+_purger = None
+_pending = threading.local()
+
+
+def get_purger():
+    global _purger
+    if _purger is None:
+        _purger = import_string(settings.SURROGATE_PURGER)()
+    return _purger
+
+
+def _flush():
+    if getattr(_pending, 'requests', 0):
+        # Внутри запроса ключи отправит SurrogateKeyMiddleware.
+        return
+    keys = _pending.__dict__.pop('keys', None)
+    if keys:
+        get_purger().purge(sorted(keys))
+
+
+def purge(*keys):
+    """Очищает ключи после фиксации транзакции.
+
+    Ключи из всех сигналов одной транзакции копятся в наборе, и первый
+    же обработчик on_commit отправляет их в прокси одним запросом;
+    остальные находят набор пустым. Во время HTTP-запроса набор
+    отправляется один раз после ответа, сколько бы транзакций ни было.
+    """
+    _pending.__dict__.setdefault('keys', set()).update(keys)
+    transaction.on_commit(_flush)
@@ -0,0 +1,55 @@
+from datetime import timedelta
+from unittest import mock
+
+from core.bulk import raw_delete, raw_insert
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.test import TestCase
+from django.utils import timezone
+from posts.models import Comment, Follow, Post
+
+User = get_user_model()
+
+
+class BulkTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.author = User.objects.create_user(username='author')
+
+    def test_raw_delete_skips_signals_and_cascade(self):
+        '''Удаление одним DELETE: без выборки, сигналов и каскада'''
+        Follow.objects.create(user=self.user, author=self.author)
+        post = Post.objects.create(author=self.author, text='текст')
+        Comment.objects.create(post=post, author=self.user, text='да')
+        receiver = mock.Mock()
+        post_delete.connect(receiver)
+        self.addCleanup(post_delete.disconnect, receiver)
+
+        with self.assertNumQueries(1):
+            deleted = raw_delete(Follow.objects.filter(user=self.user))
+        raw_delete(Post.objects.filter(pk=post.pk))
+
+        self.assertEqual(deleted, 1)
+        self.assertFalse(Follow.objects.exists())
+        self.assertFalse(receiver.called)
+        comments = Comment.objects.filter(post_id=post.pk)
+        self.assertEqual(comments.count(), 1)
+        raw_delete(comments)
+
+    def test_raw_insert_keeps_values(self):
+        '''Вставка сохраняет pk и дату публикации и не шлёт сигналов'''
+        pub_date = timezone.now() - timedelta(days=365)
+        post = Post(pk=10**6, author=self.author, text='старая запись',
+                    pub_date=pub_date)
+        receiver = mock.Mock()
+        post_save.connect(receiver)
+        self.addCleanup(post_save.disconnect, receiver)
+
+        raw_insert(Post, [post], Post._meta.concrete_fields, 'default')
+        raw_insert(Post, [post], Post._meta.concrete_fields, 'default',
+                   ignore_conflicts=True)
+
+        self.assertEqual(Post.objects.get(pk=10**6).pub_date, pub_date)
+        self.assertFalse(receiver.called)
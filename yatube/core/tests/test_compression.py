@@ -0,0 +1,100 @@
+import gzip
+import hashlib
+from unittest import mock
+
+from core.compression import CompressionMiddleware, compress, negotiate
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase
+
+PAGE = ('<p>' + 'Лев Толстой ' * 100 + '</p>').encode()
+
+
+class CompressionTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = caches[settings.COMPRESSION_CACHE]
+        self.cache.clear()
+        self.request = RequestFactory().get('/',
+                                            HTTP_ACCEPT_ENCODING='gzip, br')
+
+    def process(self, response, request=None):
+        middleware = CompressionMiddleware(lambda request: response)
+        return middleware(request or self.request)
+
+    def test_negotiate(self):
+        '''Кодировка выбирается с учётом q и доступности brotli'''
+        with mock.patch('core.compression.brotli', None):
+            self.assertEqual(negotiate('gzip, br'), 'gzip')
+            self.assertIsNone(negotiate('br'))
+        self.assertIsNone(negotiate('gzip;q=0'))
+        self.assertEqual(negotiate('*'), negotiate('gzip, br'))
+
+    def test_gzip_response(self):
+        '''HTML сжимается, а Vary учитывает Accept-Encoding'''
+        with mock.patch('core.compression.brotli', None):
+            response = self.process(HttpResponse(PAGE))
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), PAGE)
+        self.assertEqual(response['Content-Length'],
+                         str(len(response.content)))
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_skips_small_and_encoded(self):
+        '''Маленькие и уже сжатые ответы не трогаются'''
+        small = self.process(HttpResponse(b'<p>ok</p>'))
+        encoded = HttpResponse(PAGE)
+        encoded['Content-Encoding'] = 'identity'
+        image = HttpResponse(PAGE, content_type='image/png')
+
+        self.assertFalse(small.has_header('Content-Encoding'))
+        self.assertEqual(self.process(encoded).content, PAGE)
+        self.assertFalse(self.process(image).has_header('Content-Encoding'))
+
+    def test_compressed_bytes_are_cached(self):
+        '''Одинаковая страница сжимается только один раз'''
+        with mock.patch('core.compression.brotli', None), \
+                mock.patch('core.compression.compress',
+                           wraps=compress) as spy:
+            first = self.process(HttpResponse(PAGE))
+            second = self.process(HttpResponse(PAGE))
+
+        self.assertEqual(spy.call_count, 1)
+        self.assertEqual(first.content, second.content)
+
+    def test_personal_pages_not_cached(self):
+        '''Страницы пользователя и private-ответы сжимаются без кэша'''
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+        request.user = mock.Mock(is_authenticated=True)
+        private = HttpResponse(PAGE)
+        private['Cache-Control'] = 'private, max-age=0'
+        anonymous = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+        anonymous.user = AnonymousUser()
+        with mock.patch('core.compression.brotli', None):
+            personal = self.process(HttpResponse(PAGE), request)
+            self.process(private, anonymous)
+
+        self.assertEqual(gzip.decompress(personal.content), PAGE)
+        self.assertEqual(private['Content-Encoding'], 'gzip')
+        self.assertIsNone(self.cache.get(
+            'compressed:gzip:' + hashlib.sha1(PAGE).hexdigest()))
+
+    def test_no_transform_untouched(self):
+        '''Ответ с Cache-Control: no-transform не сжимается'''
+        response = HttpResponse(PAGE)
+        response['Cache-Control'] = 'public, no-transform'
+
+        self.assertEqual(self.process(response).content, PAGE)
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_streaming_response(self):
+        '''Потоковый ответ сжимается по кускам'''
+        chunks = [PAGE[:100], PAGE[100:]]
+        with mock.patch('core.compression.brotli', None):
+            response = self.process(StreamingHttpResponse(iter(chunks)))
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(
+            gzip.decompress(b''.join(response.streaming_content)), PAGE)
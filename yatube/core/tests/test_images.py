@@ -0,0 +1,86 @@
+import io
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from posts.importer import Importer
+from posts.models import Post
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def red_png(width=40, height=20):
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), (200, 0, 0)).save(buffer, 'PNG')
+    return SimpleUploadedFile('red.png', buffer.getvalue(),
+                              content_type='image/png')
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ImageMetaTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_meta_saved_on_upload(self):
+        '''При загрузке сохраняются размеры, цвет и превью'''
+        post = Post.objects.create(author=self.user, text='текст',
+                                   image=red_png())
+        post.refresh_from_db()
+
+        self.assertEqual((post.image_width, post.image_height), (40, 20))
+        self.assertEqual(post.image_color, '#c80000')
+        self.assertTrue(
+            post.image_placeholder.startswith('data:image/jpeg;base64,'))
+
+    def test_template_does_not_open_file(self):
+        '''Лента выводит размеры и lazy-загрузку без чтения файла'''
+        post = Post.objects.create(author=self.user, text='текст',
+                                   image=red_png())
+        post.image.storage.delete(post.image.name)
+
+        response = self.client.get(reverse('posts:index'))
+
+        self.assertContains(response, 'width="40" height="20"')
+        self.assertContains(response, 'loading="lazy"')
+        self.assertContains(response, 'data:image/jpeg;base64,')
+
+    def test_backfill(self):
+        '''Команда заполняет поля для ранее загруженных картинок'''
+        post = Post.objects.create(author=self.user, text='текст',
+                                   image=red_png(10, 30))
+        Post.objects.filter(pk=post.pk).update(image_width=None,
+                                               image_height=None,
+                                               image_placeholder='')
+
+        call_command('backfill_image_meta', stdout=io.StringIO())
+        post.refresh_from_db()
+
+        self.assertEqual((post.image_width, post.image_height), (10, 30))
+        self.assertNotEqual(post.image_placeholder, '')
+
+    def test_import_fills_meta(self):
+        '''Импорт записи с картинкой из хранилища заполняет поля'''
+        name = default_storage.save('posts/imported.png', red_png(16, 8))
+
+        importer = Importer()
+        importer.run([{'author': 'auth', 'text': 'текст', 'image': name}])
+
+        post = Post.objects.get(image=name)
+        self.assertEqual((post.image_width, post.image_height), (16, 8))
+        self.assertEqual(post.image_color, '#c80000')
@@ -0,0 +1,81 @@
+import os
+import shutil
+import tempfile
+from http import HTTPStatus
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+CONTENT = bytes(range(256)) * 4
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class MediaServeTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        for name in ('posts/image.png', 'private/report.txt'):
+            path = os.path.join(TEMP_MEDIA_ROOT, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as file:
+                file.write(CONTENT)
+        cls.url = settings.MEDIA_URL + 'posts/image.png'
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_full_file(self):
+        '''Файл отдаётся целиком с ETag и поддержкой диапазонов'''
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('public', response['Cache-Control'])
+
+    def test_range_and_conditional(self):
+        '''Range отдаёт часть файла, совпавший ETag — 304'''
+        etag = self.client.get(self.url)['ETag']
+
+        partial = self.client.get(self.url, HTTP_RANGE='bytes=10-19')
+        suffix = self.client.get(self.url, HTTP_RANGE='bytes=-4')
+        invalid = self.client.get(self.url, HTTP_RANGE='bytes=5000-')
+        cached = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(partial.status_code, HTTPStatus.PARTIAL_CONTENT)
+        self.assertEqual(b''.join(partial.streaming_content), CONTENT[10:20])
+        self.assertEqual(partial['Content-Range'], 'bytes 10-19/1024')
+        self.assertEqual(b''.join(suffix.streaming_content), CONTENT[-4:])
+        self.assertEqual(invalid.status_code,
+                         HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+        self.assertEqual(cached.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_access_check(self):
+        '''Закрытые каталоги и выход за MEDIA_ROOT недоступны'''
+        private = settings.MEDIA_URL + 'private/report.txt'
+        staff = Client()
+        staff.force_login(User.objects.create_user(username='admin',
+                                                   is_staff=True))
+
+        self.assertEqual(self.client.get(private).status_code,
+                         HTTPStatus.NOT_FOUND)
+        self.assertEqual(staff.get(private).status_code, HTTPStatus.OK)
+        self.assertEqual(
+            self.client.get(settings.MEDIA_URL + '../manage.py').status_code,
+            HTTPStatus.NOT_FOUND)
+
+    @override_settings(MEDIA_ACCEL='x-accel-redirect')
+    def test_offloaded_to_frontend(self):
+        '''С MEDIA_ACCEL передачу файла выполняет фронтенд'''
+        response = self.client.get(self.url)
+
+        self.assertEqual(response['X-Accel-Redirect'],
+                         '/protected-media/posts/image.png')
+        self.assertEqual(response.content, b'')
@@ -0,0 +1,95 @@
+from http import HTTPStatus
+from unittest import mock
+
+from core.ratelimit import consume
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from posts.models import Post
+
+User = get_user_model()
+
+
+class TokenBucketTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_burst_then_refill(self):
+        '''Ведро пропускает burst запросов и наполняется со временем'''
+        allowed = [consume('bucket', '60/m', burst=3, now=100) == 0
+                   for _ in range(4)]
+
+        self.assertEqual(allowed, [True, True, True, False])
+        self.assertEqual(consume('bucket', '60/m', burst=3, now=101.5), 0)
+        self.assertEqual(consume('bucket', '60/m', burst=3, now=1000), 0)
+
+    def test_steady_load_does_not_reset_bucket(self):
+        '''Под постоянной нагрузкой ключ не истекает и не даёт новый burst'''
+        clock = [1000.0]
+        with mock.patch('django.core.cache.backends.locmem.time.time',
+                        lambda: clock[0]):
+            allowed = 0
+            for step in range(6000):
+                clock[0] = 1000 + step / 10
+                allowed += consume('steady', '10/m', burst=5,
+                                   now=clock[0]) == 0
+
+        # burst и по жетону раз в 6 секунд за 10 минут.
+        self.assertLessEqual(allowed, 5 + 100 + 1)
+
+
+@override_settings(RATELIMITS={
+    'posts:add_comment': {'rate': '2/h', 'methods': ('POST',)},
+})
+class RateLimitViewTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(author=cls.user, text='текст')
+        cls.url = reverse('posts:add_comment', args=(cls.post.pk,))
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_limit_returns_429_without_queries(self):
+        '''Превышение лимита даёт 429 без запросов к базе'''
+        for _ in range(2):
+            self.client.post(self.url, {'text': 'спам'})
+
+        with self.assertNumQueries(0):
+            response = self.client.post(self.url, {'text': 'спам'})
+
+        self.assertEqual(response.status_code,
+                         HTTPStatus.TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(self.post.comments.count(), 2)
+
+    def test_limit_follows_user_not_session(self):
+        '''Лимит считается по пользователю, новая сессия его не сбрасывает'''
+        for _ in range(2):
+            self.client.post(self.url, {'text': 'спам'})
+        other = Client(REMOTE_ADDR='10.0.0.2')
+        other.force_login(self.user)
+
+        response = other.post(self.url, {'text': 'спам'})
+
+        self.assertEqual(response.status_code,
+                         HTTPStatus.TOO_MANY_REQUESTS)
+
+    def test_refused_request_refunds_ip_token(self):
+        '''Отказ по пользователю возвращает жетон в ведро IP'''
+        for _ in range(2):
+            self.client.post(self.url, {'text': 'спам'})
+        other = Client(REMOTE_ADDR='10.0.0.2')
+        other.force_login(self.user)
+        other.post(self.url, {'text': 'спам'})
+        other.force_login(User.objects.create_user(username='neighbour'))
+
+        statuses = [other.post(self.url, {'text': 'сосед'}).status_code
+                    for _ in range(2)]
+
+        self.assertEqual(statuses, [HTTPStatus.FOUND, HTTPStatus.FOUND])
@@ -0,0 +1,122 @@
+from unittest import mock
+from urllib.error import URLError
+
+from core.surrogates import (HTTPPurger, LocalPurger,
+                             SurrogateKeyMiddleware, purge)
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import (Client, RequestFactory, TestCase,
+                         TransactionTestCase)
+from django.urls import reverse
+from posts.models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class SurrogateKeyHeaderTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(title='группа', slug='slug',
+                                         description='описание')
+        cls.post = Post.objects.create(author=cls.user, group=cls.group,
+                                       text='текст')
+
+    def test_pages_are_tagged(self):
+        '''Страницы помечены ключами записей, авторов и групп'''
+        pages = {
+            reverse('posts:index'): 'index',
+            reverse('posts:group_list', args=(self.group.slug,)):
+                'group:slug',
+            reverse('posts:profile', args=(self.user.username,)):
+                f'author:{self.user.pk}',
+            reverse('posts:post_detail', args=(self.post.pk,)):
+                f'post:{self.post.pk}',
+        }
+        for url, key in pages.items():
+            with self.subTest(url=url):
+                response = Client().get(url)
+                keys = response['Surrogate-Key'].split()
+
+                self.assertIn(key, keys)
+                self.assertIn(f'post:{self.post.pk}', keys)
+                self.assertIn('group:slug', keys)
+                self.assertTrue(response.has_header('Surrogate-Control'))
+
+    def test_authorized_pages_are_not_cached_at_edge(self):
+        '''Страницы для вошедших пользователей не кэшируются на краю'''
+        client = Client()
+        client.force_login(self.user)
+        response = client.get(reverse('posts:index'))
+
+        self.assertIn('index', response['Surrogate-Key'])
+        self.assertFalse(response.has_header('Surrogate-Control'))
+
+
+class PurgeTests(TransactionTestCase):
+    def setUp(self):
+        LocalPurger.purged.clear()
+        self.user = User.objects.create_user(username='auth')
+        self.group = Group.objects.create(title='группа', slug='old',
+                                          description='описание')
+
+    def test_purged_once_per_transaction(self):
+        '''Ключи транзакции очищаются одним вызовом после фиксации'''
+        LocalPurger.purged.clear()
+        with transaction.atomic():
+            post = Post.objects.create(author=self.user, group=self.group,
+                                       text='текст')
+            Comment.objects.create(post=post, author=self.user, text='да')
+            self.assertEqual(list(LocalPurger.purged), [])
+
+        self.assertCountEqual(LocalPurger.purged, [
+            'index', f'post:{post.pk}', f'author:{self.user.pk}',
+            'group:old',
+        ])
+
+    def test_moved_post_purges_old_group(self):
+        '''Перенос записи очищает страницы старой и новой группы'''
+        post = Post.objects.create(author=self.user, group=self.group,
+                                   text='текст')
+        new_group = Group.objects.create(title='новая', slug='new',
+                                         description='описание')
+        LocalPurger.purged.clear()
+        post.group = new_group
+        post.save()
+
+        self.assertIn('group:old', LocalPurger.purged)
+        self.assertIn('group:new', LocalPurger.purged)
+
+    def test_request_purges_once(self):
+        '''Очистки за время запроса отправляются одним вызовом'''
+        def view(request):
+            purge('index')
+            with transaction.atomic():
+                purge('post:1')
+            purge('author:1')
+            self.assertEqual(list(LocalPurger.purged), [])
+            return HttpResponse()
+
+        LocalPurger.purged.clear()
+        with mock.patch.object(LocalPurger, 'purge',
+                               wraps=LocalPurger().purge) as spy:
+            SurrogateKeyMiddleware(view)(RequestFactory().get('/'))
+
+        spy.assert_called_once_with(['author:1', 'index', 'post:1'])
+
+    def test_unreachable_proxy_logged(self):
+        '''Недоступный прокси не роняет запрос, ошибка пишется в лог'''
+        with mock.patch('urllib.request.urlopen',
+                        side_effect=URLError('refused')), \
+                self.assertLogs('core.surrogates', 'ERROR'):
+            HTTPPurger().purge(['index'])
+
+    def test_local_history_bounded(self):
+        '''Заглушка помнит только последние ключи'''
+        LocalPurger().purge(str(i) for i in range(5000))
+
+        self.assertEqual(len(LocalPurger.purged),
+                         LocalPurger.purged.maxlen)
+        self.assertEqual(LocalPurger.purged[-1], '4999')
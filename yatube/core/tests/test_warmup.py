@@ -0,0 +1,35 @@
+from core.warmup import request, warm_up
+from django.contrib.auth import get_user_model
+from django.core.wsgi import get_wsgi_application
+from django.test import TestCase
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class WarmUpTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        user = User.objects.create_user(username='author')
+        group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test',
+            description='Тестовое описание',
+        )
+        Post.objects.create(author=user, group=group, text='текст')
+        cls.application = get_wsgi_application()
+
+    def test_warm_up_runs_every_step(self):
+        '''Прогрев проходит все шаги'''
+        timings = warm_up(self.application)
+
+        self.assertEqual(set(timings),
+                         {'urls', 'templates', 'database', 'cache'})
+
+    def test_request_measures_ttfb(self):
+        '''Запрос через WSGI отдаёт статус и время до первого байта'''
+        status, ttfb = request(self.application, '/group/test/')
+
+        self.assertEqual(status, '200 OK')
+        self.assertGreater(ttfb, 0)
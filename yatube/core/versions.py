@@ -0,0 +1,38 @@
+import time
+
+from django.core.cache import cache
+
+
+def version_key(kind, pk):
+    return f'version:{kind}:{pk}'
+
+
+def _initial_version():
+    # Если ключ версии вытеснен из кэша, новая версия не должна совпасть
+    # со старой, иначе всплывут устаревшие данные.
+    return int(time.time() * 1000)
+
+
+def bump_version(kind, pk):
+    """Делает недействительными все записи кэша, зависящие от объекта."""
+    key = version_key(kind, pk)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _initial_version(), None)
+
+
+def get_versions(pairs):
+    """Версии для набора пар (вид, pk) одним запросом к кэшу."""
+    keys = {pair: version_key(*pair) for pair in pairs}
+    found = cache.get_many(keys.values())
+    missing = {key: _initial_version()
+               for key in keys.values() if key not in found}
+    if missing:
+        cache.set_many(missing, None)
+        found.update(missing)
+    return {pair: found[key] for pair, key in keys.items()}
+
+
+def get_version(kind, pk):
+    return get_versions([(kind, pk)])[(kind, pk)]
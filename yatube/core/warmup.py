@@ -0,0 +1,113 @@
+import logging
+import os
+import time
+from io import BytesIO
+
+from django.conf import settings
+from django.db import connection
+from django.template.loader import get_template
+from django.urls import get_resolver
+
+TEMPLATE_EXTENSIONS = ('.html', '.txt')
+
+logger = logging.getLogger(__name__)
+
+
+def _host():
+    hosts = [host for host in settings.ALLOWED_HOSTS
+             if host and not host.startswith(('*', '.'))]
+    return hosts[0] if hosts else 'localhost'
+
+
+def _environ(path):
+    return {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': '',
+        'SERVER_NAME': _host(),
+        'SERVER_PORT': '80',
+        'HTTP_HOST': _host(),
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'REMOTE_ADDR': '127.0.0.1',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': BytesIO(),
+        'wsgi.errors': BytesIO(),
+        'wsgi.multithread': False,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+
+
+def request(application, path):
+    """Выполняет GET через WSGI-приложение и возвращает (статус, TTFB)."""
+    status = []
+    started = time.perf_counter()
+    response = application(_environ(path),
+                           lambda code, headers, *args: status.append(code))
+    try:
+        for chunk in response:
+            if chunk:
+                break
+        ttfb = time.perf_counter() - started
+    finally:
+        if hasattr(response, 'close'):
+            response.close()
+    return status[0] if status else None, ttfb
+
+
+def compile_urls():
+    resolver = get_resolver()
+    resolver.reverse_dict
+    return len(resolver.url_patterns)
+
+
+def compile_templates():
+    """Разбирает все шаблоны из templates/, чтобы они осели в кэше
+    загрузчика."""
+    compiled = 0
+    for root, _, files in os.walk(settings.TEMPLATES_DIR):
+        for name in files:
+            if not name.endswith(TEMPLATE_EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            get_template(os.path.relpath(path, settings.TEMPLATES_DIR)
+                         .replace(os.sep, '/'))
+            compiled += 1
+    return compiled
+
+
+def hot_paths():
+    from posts.models import Post
+    paths = ['/']
+    recent = (Post.objects.filter(group__isnull=False).order_by('-pub_date')
+              .values_list('group__slug', flat=True)[:100])
+    for slug in dict.fromkeys(recent):
+        if len(paths) > settings.WARMUP_GROUPS:
+            break
+        paths.append(f'/group/{slug}/')
+    return paths
+
+
+def warm_up(application):
+    """Прогревает воркер до первого настоящего запроса.
+
+    Возвращает словарь с длительностью каждого шага в секундах. Ошибка
+    прогрева пишется в лог и не мешает воркеру стартовать.
+    """
+    timings = {}
+    steps = (
+        ('urls', compile_urls),
+        ('templates', compile_templates),
+        ('database', connection.ensure_connection),
+        ('cache', lambda: [request(application, path)
+                           for path in hot_paths()]),
+    )
+    for name, step in steps:
+        started = time.perf_counter()
+        try:
+            step()
+        except Exception:
+            logger.exception('Прогрев: шаг %s не удался', name)
+        timings[name] = time.perf_counter() - started
+    return timings
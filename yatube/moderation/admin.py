@@ -0,0 +1,21 @@
+from django.contrib import admin
+
+from .models import HeldItem
+from .utils import publish
+
+
+@admin.register(HeldItem)
+class HeldItemAdmin(admin.ModelAdmin):
+    list_display = ('text', 'kind', 'author', 'similarity',
+                    'duplicate_kind', 'duplicate_id', 'created')
+    list_filter = ('kind',)
+    readonly_fields = ('duplicate_kind', 'duplicate_id', 'similarity')
+    actions = ('publish_selected',)
+
+    def publish_selected(self, request, queryset):
+        published = sum(publish(item) is not None for item in queryset)
+        self.message_user(request, f'Опубликовано: {published}')
+    publish_selected.short_description = 'Опубликовать'
+
+    def has_add_permission(self, request):
+        return False
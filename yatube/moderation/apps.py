@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class ModerationConfig(AppConfig):
+    name = 'moderation'
+    verbose_name = 'Модерация'
+
+    def ready(self):
+        from . import signals  # noqa: F401
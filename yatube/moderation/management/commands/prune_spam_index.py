@@ -0,0 +1,20 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from moderation.utils import prune
+
+
+class Command(BaseCommand):
+    help = ('Удаляет из индекса дубликатов подписи старше заданного числа '
+            'дней, чтобы таблицы подписей и ключей не росли бесконечно.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int,
+                            default=settings.SPAM_INDEX_DAYS)
+
+    def handle(self, *args, **options):
+        removed = prune(timezone.now() - timedelta(days=options['days']))
+        self.stdout.write(self.style.SUCCESS(f'Удалено подписей: {removed}'))
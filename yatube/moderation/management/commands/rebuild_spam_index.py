@@ -0,0 +1,64 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from moderation.minhash import numpy
+from moderation.models import COMMENT, POST, IndexGeneration
+from moderation.utils import drop_generation, index_batch
+from posts.models import Comment, Post
+from shards.utils import shard_aliases
+
+
+class Command(BaseCommand):
+    help = ('Заново строит индекс MinHash/LSH по текстам записей и '
+            'комментариев за последние дни.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int,
+                            default=settings.SPAM_INDEX_DAYS)
+        parser.add_argument('--chunk-size', type=int,
+                            default=settings.SPAM_INDEX_CHUNK_SIZE)
+
+    def _index(self, kind, queryset, generation, chunk_size):
+        indexed = 0
+        last_pk = 0
+        while True:
+            chunk = list(queryset.filter(pk__gt=last_pk).order_by('pk')
+                         .values_list('pk', 'text')[:chunk_size])
+            if not chunk:
+                return indexed
+            with transaction.atomic():
+                indexed += index_batch(kind, chunk, generation)
+            last_pk = chunk[-1][0]
+            self.stdout.write(f'{kind} до id={last_pk}')
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(days=options['days'])
+        chunk_size = options['chunk_size']
+        if numpy is None:
+            self.stdout.write('numpy не установлен, подписи считаются '
+                              'без векторизации.')
+        # Новый индекс строится в отдельном поколении короткими
+        # транзакциями по пачке: проверки тем временем читают старое
+        # поколение, а новые тексты пишутся в оба.
+        state, _ = IndexGeneration.objects.get_or_create()
+        old, new = state.current, state.current + 1
+        # Остатки прерванной перестройки.
+        drop_generation(new, chunk_size)
+        IndexGeneration.objects.filter(pk=state.pk).update(building=new)
+        indexed = 0
+        for alias in shard_aliases():
+            indexed += self._index(
+                POST, Post.objects.using(alias).filter(pub_date__gte=since),
+                new, chunk_size)
+            indexed += self._index(
+                COMMENT,
+                Comment.objects.using(alias).filter(created__gte=since),
+                new, chunk_size)
+        IndexGeneration.objects.filter(pk=state.pk).update(
+            current=new, building=None)
+        drop_generation(old, chunk_size)
+        self.stdout.write(self.style.SUCCESS(f'Подписей: {indexed}'))
@@ -0,0 +1,75 @@
+# Generated by Django 2.2.28 on 2026-10-19 14:50
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0020_feed_marker'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Bucket',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.BigIntegerField(db_index=True, verbose_name='Ключ')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='HeldItem',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('post', 'Запись'), ('comment', 'Комментарий')], max_length=10, verbose_name='Вид')),
+                ('title', models.TextField(blank=True, verbose_name='Оглавление')),
+                ('text', models.TextField(verbose_name='Текст')),
+                ('image', models.ImageField(blank=True, upload_to='held/', verbose_name='Картинка')),
+                ('post_id', models.PositiveIntegerField(blank=True, null=True, verbose_name='Запись комментария')),
+                ('parent_id', models.PositiveIntegerField(blank=True, null=True, verbose_name='Ответ на')),
+                ('duplicate_kind', models.CharField(choices=[('post', 'Запись'), ('comment', 'Комментарий')], max_length=10, verbose_name='Вид похожего')),
+                ('duplicate_id', models.PositiveIntegerField(verbose_name='id похожего')),
+                ('similarity', models.FloatField(verbose_name='Сходство')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Отправлено')),
+            ],
+            options={
+                'verbose_name': 'Задержанный текст',
+                'verbose_name_plural': 'Задержанные тексты',
+                'ordering': ('-created',),
+            },
+        ),
+        migrations.CreateModel(
+            name='Signature',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('post', 'Запись'), ('comment', 'Комментарий')], max_length=10, verbose_name='Вид')),
+                ('object_id', models.PositiveIntegerField(verbose_name='id объекта')),
+                ('minhash', models.BinaryField(verbose_name='Подпись')),
+                ('created', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Добавлена')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='signature',
+            constraint=models.UniqueConstraint(fields=('kind', 'object_id'), name='unique_signature'),
+        ),
+        migrations.AddField(
+            model_name='helditem',
+            name='author',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Автор'),
+        ),
+        migrations.AddField(
+            model_name='helditem',
+            name='group',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='posts.Group', verbose_name='Группа'),
+        ),
+        migrations.AddField(
+            model_name='bucket',
+            name='signature',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='buckets', to='moderation.Signature'),
+        ),
+    ]
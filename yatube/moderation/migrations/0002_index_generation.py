@@ -0,0 +1,34 @@
+# Generated by Django 2.2.28 on 2026-10-19 15:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('moderation', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndexGeneration',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('current', models.PositiveIntegerField(default=0, verbose_name='Текущее')),
+                ('building', models.PositiveIntegerField(blank=True, null=True, verbose_name='Строится')),
+            ],
+        ),
+        migrations.RemoveConstraint(
+            model_name='signature',
+            name='unique_signature',
+        ),
+        migrations.AddField(
+            model_name='signature',
+            name='generation',
+            field=models.PositiveIntegerField(default=0, verbose_name='Поколение'),
+        ),
+        migrations.AddConstraint(
+            model_name='signature',
+            constraint=models.UniqueConstraint(fields=('generation', 'kind', 'object_id'), name='unique_signature'),
+        ),
+    ]
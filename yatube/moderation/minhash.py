@@ -0,0 +1,118 @@
+import hashlib
+import heapq
+import random
+import re
+import zlib
+from array import array
+from functools import lru_cache
+
+from django.conf import settings
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Хэш-функции h(x) = ((a * x + b) mod P) & MASK. a < 2**31, поэтому
+# a * x + b помещается в uint64 и векторная версия совпадает с обычной.
+PRIME = 4294967311
+MASK = 0xFFFFFFFF
+SEED = 20240517
+WORD = re.compile(r'\w+')
+
+
+@lru_cache(maxsize=None)
+def coefficients(count):
+    rng = random.Random(SEED)
+    return ([rng.randrange(1, 2 ** 31) for _ in range(count)],
+            [rng.randrange(0, 2 ** 32) for _ in range(count)])
+
+
+def normalize(text):
+    """Текст без регистра, пунктуации и лишних пробелов."""
+    return ' '.join(WORD.findall(text.lower()))
+
+
+def shingles(text):
+    """32-битные хэши символьных n-грамм нормализованного текста.
+
+    Пустое множество для текстов короче SPAM_MIN_LENGTH: у коротких
+    реплик вроде «спасибо!» совпадения ничего не значат. У длинных
+    текстов остаются SPAM_MAX_SHINGLES наименьших хэшей: выборка
+    одинакова для одинаковых текстов, а время подписи не растёт с длиной.
+    """
+    text = normalize(text)
+    if len(text) < settings.SPAM_MIN_LENGTH:
+        return set()
+    size = settings.SPAM_SHINGLE_SIZE
+    hashes = {zlib.crc32(text[start:start + size].encode())
+              for start in range(len(text) - size + 1)}
+    if len(hashes) > settings.SPAM_MAX_SHINGLES:
+        hashes = set(heapq.nsmallest(settings.SPAM_MAX_SHINGLES, hashes))
+    return hashes
+
+
+def _signatures(sets):
+    """Подписи для наборов шинглов; None для пустых.
+
+    С numpy все шинглы пачки хэшируются одной матричной операцией, а
+    минимумы по наборам берутся через minimum.reduceat.
+    """
+    a, b = coefficients(settings.SPAM_MINHASH_PERMUTATIONS)
+    if numpy is None:
+        return [array('I', (min(((ai * x + bi) % PRIME) & MASK
+                                for x in hashes)
+                            for ai, bi in zip(a, b))) if hashes else None
+                for hashes in sets]
+    present = [index for index, hashes in enumerate(sets) if hashes]
+    result = [None] * len(sets)
+    if not present:
+        return result
+    a, b = (numpy.array(values, dtype=numpy.uint64) for values in (a, b))
+    flat = numpy.fromiter(
+        (x for index in present for x in sets[index]), dtype=numpy.uint64)
+    offsets = numpy.cumsum([0] + [len(sets[index]) for index in present])[:-1]
+    hashed = (a[:, None] * flat[None, :] + b[:, None]) % PRIME & MASK
+    minimums = numpy.minimum.reduceat(hashed, offsets, axis=1)
+    for column, index in enumerate(present):
+        result[index] = array('I', minimums[:, column].astype(numpy.uint32)
+                              .tolist())
+    return result
+
+
+def signature(hashes):
+    """MinHash-подпись: минимум каждой из SPAM_MINHASH_PERMUTATIONS
+    хэш-функций по шинглам."""
+    return _signatures([hashes])[0]
+
+
+def signatures(texts):
+    """Подписи пачки текстов; None для слишком коротких."""
+    return _signatures([shingles(text) for text in texts])
+
+
+def pack(minhash):
+    return minhash.tobytes()
+
+
+def unpack(data):
+    return array('I', bytes(data))
+
+
+def band_keys(minhash):
+    """Ключи LSH: по одному 64-битному числу на каждую из SPAM_LSH_BANDS
+    полос подписи. Тексты с общим ключом — кандидаты в дубликаты."""
+    bands = settings.SPAM_LSH_BANDS
+    rows = len(minhash) // bands
+    keys = []
+    for band in range(bands):
+        digest = hashlib.blake2b(
+            minhash[band * rows:(band + 1) * rows].tobytes(),
+            digest_size=8, person=band.to_bytes(2, 'big')).digest()
+        keys.append(int.from_bytes(digest, 'big', signed=True))
+    return keys
+
+
+def similarity(first, second):
+    """Оценка коэффициента Жаккара по доле совпавших минимумов."""
+    return sum(x == y for x, y in zip(first, second)) / len(first)
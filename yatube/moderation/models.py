@@ -0,0 +1,78 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+
+from posts.models import Group
+
+User = get_user_model()
+
+POST = 'post'
+COMMENT = 'comment'
+KINDS = (
+    (POST, 'Запись'),
+    (COMMENT, 'Комментарий'),
+)
+
+
+class IndexGeneration(models.Model):
+    """Поколения индекса подписей (одна строка).
+
+    Проверки читают поколение current. rebuild_spam_index строит индекс
+    в поколении building, куда попадают и новые тексты, а затем
+    переключает current на него.
+    """
+    current = models.PositiveIntegerField('Текущее', default=0)
+    building = models.PositiveIntegerField('Строится', blank=True,
+                                           null=True)
+
+
+class Signature(models.Model):
+    """MinHash-подпись текста записи или комментария."""
+    generation = models.PositiveIntegerField('Поколение', default=0)
+    kind = models.CharField('Вид', max_length=10, choices=KINDS)
+    object_id = models.PositiveIntegerField('id объекта')
+    minhash = models.BinaryField('Подпись')
+    created = models.DateTimeField('Добавлена', auto_now_add=True,
+                                   db_index=True)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(
+            fields=['generation', 'kind', 'object_id'],
+            name='unique_signature')]
+
+
+class Bucket(models.Model):
+    """Ключ полосы LSH: подписи с общим ключом — кандидаты в дубликаты."""
+    signature = models.ForeignKey(Signature, on_delete=models.CASCADE,
+                                  related_name='buckets')
+    key = models.BigIntegerField('Ключ', db_index=True)
+
+
+class HeldItem(models.Model):
+    """Запись или комментарий, похожие на уже опубликованный текст и
+    ожидающие решения модератора."""
+    kind = models.CharField('Вид', max_length=10, choices=KINDS)
+    author = models.ForeignKey(User, on_delete=models.CASCADE,
+                               related_name='+', verbose_name='Автор')
+    title = models.TextField('Оглавление', blank=True)
+    text = models.TextField('Текст')
+    group = models.ForeignKey(Group, on_delete=models.SET_NULL, blank=True,
+                              null=True, related_name='+',
+                              verbose_name='Группа')
+    image = models.ImageField('Картинка', upload_to='held/', blank=True)
+    post_id = models.PositiveIntegerField('Запись комментария', blank=True,
+                                          null=True)
+    parent_id = models.PositiveIntegerField('Ответ на', blank=True,
+                                            null=True)
+    duplicate_kind = models.CharField('Вид похожего', max_length=10,
+                                      choices=KINDS)
+    duplicate_id = models.PositiveIntegerField('id похожего')
+    similarity = models.FloatField('Сходство')
+    created = models.DateTimeField('Отправлено', auto_now_add=True)
+
+    class Meta:
+        ordering = ('-created',)
+        verbose_name = 'Задержанный текст'
+        verbose_name_plural = 'Задержанные тексты'
+
+    def __str__(self):
+        return self.text[:30]
@@ -0,0 +1,26 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from posts.models import Comment, Post
+from .models import COMMENT, POST
+from .utils import index, remove
+
+KIND = {Post: POST, Comment: COMMENT}
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+def text_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and 'text' not in update_fields):
+        return
+    # Старый текст записи запоминает posts.signals.remember_old_group.
+    if getattr(instance, '_old_text', None) == instance.text:
+        return
+    index(KIND[sender], instance.pk, instance.text,
+          getattr(instance, '_signed', None))
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Comment)
+def text_deleted(sender, instance, **kwargs):
+    remove(KIND[sender], instance.pk)
@@ -0,0 +1,171 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock, skipIf
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from moderation import minhash, utils
+from moderation.models import (COMMENT, POST, Bucket, HeldItem,
+                               IndexGeneration, Signature)
+from moderation.utils import find_duplicate, publish
+from posts.models import Comment, Post
+
+User = get_user_model()
+
+SPAM = ('Купите наши чудесные часы со скидкой девяносто процентов, '
+        'только сегодня и только у нас на сайте')
+VARIANT = ('Купите наши чудесные часы со скидкой девяносто процентов!!! '
+           'Только сегодня и только у нас на сайте.')
+OTHER = ('Сегодня ходили в поход по горам, видели озеро и ночевали '
+         'в палатке под звёздами')
+
+
+class MinHashTests(TestCase):
+    def test_similar_texts_share_buckets(self):
+        '''Похожие тексты дают близкие подписи и общий ключ LSH'''
+        first, second, other = minhash.signatures([SPAM, VARIANT, OTHER])
+
+        self.assertGreater(minhash.similarity(first, second), 0.7)
+        self.assertLess(minhash.similarity(first, other), 0.2)
+        self.assertTrue(set(minhash.band_keys(first))
+                        & set(minhash.band_keys(second)))
+        self.assertEqual(minhash.unpack(minhash.pack(first)), first)
+
+    def test_short_text_ignored(self):
+        '''Короткие реплики не индексируются'''
+        self.assertEqual(minhash.signatures(['спасибо!']), [None])
+
+    @override_settings(SPAM_MAX_SHINGLES=20)
+    def test_shingles_capped(self):
+        '''У длинного текста берутся наименьшие хэши в пределах лимита'''
+        hashes = minhash.shingles(SPAM * 10)
+
+        self.assertEqual(len(hashes), 20)
+        self.assertEqual(hashes, minhash.shingles(SPAM * 10 + ' '))
+
+    @skipIf(minhash.numpy is None, 'numpy не установлен')
+    def test_numpy_matches_python(self):
+        '''Векторная версия даёт те же подписи, что и обычная'''
+        texts = [SPAM, 'коротко', VARIANT, OTHER]
+        vectorized = minhash.signatures(texts)
+        with mock.patch('moderation.minhash.numpy', None):
+            plain = minhash.signatures(texts)
+
+        self.assertEqual(vectorized, plain)
+
+
+class DuplicateTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.bot = User.objects.create_user(username='bot')
+        cls.post = Post.objects.create(author=cls.user, text=SPAM)
+
+    def setUp(self):
+        self.client.force_login(self.bot)
+
+    def test_post_indexed_on_save(self):
+        '''Подпись и ключи сохраняются вместе с записью и удаляются с ней'''
+        post = Post.objects.create(author=self.user, text=OTHER)
+        signature = Signature.objects.get(kind=POST, object_id=post.pk)
+
+        self.assertEqual(signature.buckets.count(), 16)
+        post.delete()
+        self.assertFalse(Signature.objects.filter(pk=signature.pk).exists())
+        self.assertFalse(Bucket.objects.filter(
+            signature_id=signature.pk).exists())
+
+    def test_signature_computed_once(self):
+        '''Подпись считается один раз: при проверке, а не снова при
+        индексации, и не пересчитывается, если текст не изменился'''
+        with mock.patch('moderation.minhash._signatures',
+                        wraps=minhash._signatures) as spy:
+            self.client.post(reverse('posts:post_create'), {'text': OTHER})
+            post = Post.objects.get(author=self.bot)
+            post.save()
+
+        self.assertEqual(spy.call_count, 1)
+        self.assertTrue(Signature.objects.filter(kind=POST,
+                                                 object_id=post.pk).exists())
+
+    def test_prune(self):
+        '''Старые подписи удаляются вместе с ключами'''
+        Signature.objects.update(created=timezone.now() - timedelta(days=40))
+        Post.objects.create(author=self.user, text=OTHER)
+
+        call_command('prune_spam_index', stdout=StringIO())
+
+        self.assertEqual(Signature.objects.count(), 1)
+        self.assertEqual(Bucket.objects.count(), 16)
+        self.assertIsNone(find_duplicate(VARIANT))
+
+    def test_lookup_uses_one_query(self):
+        '''Поиск дубликата — один запрос к индексу'''
+        with self.assertNumQueries(1):
+            duplicate = find_duplicate(VARIANT)
+
+        self.assertEqual((duplicate.kind, duplicate.object_id),
+                         (POST, self.post.pk))
+        self.assertIsNone(find_duplicate(OTHER))
+
+    def test_duplicate_post_held(self):
+        '''Почти повторная запись задерживается и публикуется модератором'''
+        self.client.post(reverse('posts:post_create'), {'text': VARIANT})
+
+        item = HeldItem.objects.get()
+        self.assertFalse(Post.objects.filter(author=self.bot).exists())
+        self.assertEqual(item.duplicate_id, self.post.pk)
+
+        publish(item)
+        self.assertTrue(Post.objects.filter(author=self.bot,
+                                            text=VARIANT).exists())
+        self.assertFalse(HeldItem.objects.exists())
+
+    def test_duplicate_comment_held(self):
+        '''Комментарий-копия тоже уходит на модерацию'''
+        self.client.post(reverse('posts:add_comment', args=(self.post.pk,)),
+                         {'text': VARIANT})
+
+        self.assertFalse(Comment.objects.exists())
+        self.assertEqual(HeldItem.objects.get().post_id, self.post.pk)
+
+    def test_rebuild(self):
+        '''Команда заново строит индекс по записям и комментариям'''
+        Comment.objects.create(post=self.post, author=self.user, text=OTHER)
+        Signature.objects.all().delete()
+
+        call_command('rebuild_spam_index', stdout=StringIO())
+
+        self.assertEqual(Signature.objects.count(), 2)
+        self.assertIsNotNone(find_duplicate(VARIANT))
+
+    def test_rebuild_keeps_old_generation_until_swap(self):
+        '''Пока индекс строится, проверки видят старое поколение, а новые
+        тексты попадают в оба'''
+        Comment.objects.create(post=self.post, author=self.user,
+                               text='коротко')
+        seen = []
+
+        def index_batch(kind, rows, generation):
+            # Записи уже пройдены: новая запись попадёт в индекс только
+            # через сигнал.
+            if kind == COMMENT and not seen:
+                seen.append(find_duplicate(VARIANT))
+                Post.objects.create(author=self.user, text=OTHER)
+            return utils.index_batch(kind, rows, generation)
+
+        with mock.patch('moderation.management.commands.'
+                        'rebuild_spam_index.index_batch', index_batch):
+            call_command('rebuild_spam_index', stdout=StringIO())
+
+        self.assertIsNotNone(seen[0])
+        self.assertEqual(IndexGeneration.objects.get().current, 1)
+        self.assertEqual(
+            set(Signature.objects.values_list('generation', flat=True)), {1})
+        self.assertEqual(Signature.objects.count(), 2)
+        self.assertIsNotNone(find_duplicate(VARIANT))
@@ -0,0 +1,187 @@
+import os
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Subquery, Value
+from django.db.models.functions import Coalesce
+
+from posts.models import Comment, Post
+from shards.utils import get_post
+from .minhash import (band_keys, pack, shingles, signature, signatures,
+                      similarity, unpack)
+from .models import POST, Bucket, HeldItem, IndexGeneration, Signature
+
+Duplicate = namedtuple('Duplicate', 'kind object_id similarity')
+
+
+def generations():
+    """Поколения индекса, в которые пишутся новые подписи: текущее и
+    строящееся rebuild_spam_index, если идёт перестройка."""
+    state = IndexGeneration.objects.values_list(
+        'current', 'building').first() or (0, None)
+    return [generation for generation in state if generation is not None]
+
+
+def _current_generation():
+    return Coalesce(Subquery(IndexGeneration.objects.values('current')[:1]),
+                    Value(0))
+
+
+def _store(kind, minhashes, generations):
+    """Сохраняет подписи {id объекта: подпись} и их ключи LSH.
+
+    Уже записанные подписи не трогаются: перестройка индекса и
+    сохранение объекта могут записать одну подпись одновременно.
+    """
+    for generation in generations:
+        Signature.objects.bulk_create(
+            [Signature(generation=generation, kind=kind, object_id=object_id,
+                       minhash=pack(minhash))
+             for object_id, minhash in minhashes.items()],
+            ignore_conflicts=True)
+    ids = Signature.objects.filter(
+        generation__in=generations, kind=kind, object_id__in=minhashes,
+        buckets__isnull=True).values_list('pk', 'object_id')
+    Bucket.objects.bulk_create(
+        [Bucket(signature_id=pk, key=key)
+         for pk, object_id in ids
+         for key in band_keys(minhashes[object_id])])
+
+
+def index(kind, object_id, text, signed=None):
+    """Обновляет подпись объекта; неизменный текст не переписывается.
+
+    signed — пара (текст, подпись), уже посчитанная hold_if_duplicate:
+    если текст с тех пор не менялся, подпись не считается заново.
+    """
+    if signed is not None and signed[0] == text:
+        minhash = signed[1]
+    else:
+        minhash = signature(shingles(text))
+    if minhash is None:
+        remove(kind, object_id)
+        return
+    active = generations()
+    stored = list(Signature.objects.filter(
+        generation__in=active, kind=kind, object_id=object_id,
+    ).values_list('minhash', flat=True))
+    if len(stored) == len(active) and all(
+            bytes(data) == pack(minhash) for data in stored):
+        return
+    with transaction.atomic():
+        remove(kind, object_id)
+        _store(kind, {object_id: minhash}, active)
+
+
+def index_batch(kind, rows, generation=None):
+    """Подписи для пачки (id, текст), посчитанные разом (см. signatures).
+
+    Без generation подписи пишутся во все поколения из generations().
+    """
+    ids, texts = zip(*rows) if rows else ((), ())
+    minhashes = {object_id: minhash for object_id, minhash
+                 in zip(ids, signatures(texts)) if minhash is not None}
+    _store(kind, minhashes,
+           generations() if generation is None else [generation])
+    return len(minhashes)
+
+
+# У подписей и ключей нет обработчиков сигналов, поэтому обычный delete()
+# удаляет ключи одним DELETE по id подписей, без выборки ключей.
+def remove(kind, object_id):
+    Signature.objects.filter(kind=kind, object_id=object_id).delete()
+
+
+def _delete_in_chunks(signatures, chunk_size):
+    deleted = 0
+    while True:
+        ids = list(signatures.values_list('pk', flat=True)[:chunk_size])
+        if not ids:
+            return deleted
+        Signature.objects.filter(pk__in=ids).delete()
+        deleted += len(ids)
+
+
+def prune(before):
+    """Удаляет из индекса подписи, добавленные раньше before."""
+    return _delete_in_chunks(Signature.objects.filter(created__lt=before),
+                             settings.SPAM_INDEX_CHUNK_SIZE)
+
+
+def drop_generation(generation, chunk_size):
+    """Удаляет поколение индекса короткими транзакциями по chunk_size
+    подписей."""
+    _delete_in_chunks(Signature.objects.filter(generation=generation),
+                      chunk_size)
+
+
+def find_duplicate(text, minhash=None):
+    """Самый похожий проиндексированный текст со сходством не ниже
+    SPAM_DUPLICATE_THRESHOLD или None.
+
+    Кандидаты выбираются одним запросом по индексу ключей LSH, сходство
+    считается только для них, без перебора всех записей.
+    """
+    if minhash is None:
+        minhash = signature(shingles(text))
+    if minhash is None:
+        return None
+    candidates = Signature.objects.filter(
+        generation=_current_generation(),
+        buckets__key__in=band_keys(minhash),
+    ).distinct().values_list('kind', 'object_id', 'minhash')
+    best = None
+    for kind, object_id, data in candidates[:settings.SPAM_MAX_CANDIDATES]:
+        score = similarity(minhash, unpack(data))
+        if (score >= settings.SPAM_DUPLICATE_THRESHOLD
+                and (best is None or score > best.similarity)):
+            best = Duplicate(kind, object_id, score)
+    return best
+
+
+def hold_if_duplicate(kind, author, text, instance=None, **fields):
+    """Откладывает текст на модерацию, если он почти повторяет уже
+    опубликованный. Возвращает HeldItem или None.
+
+    Если текст пропущен, посчитанная подпись запоминается в
+    instance._signed, и сигнал text_saved индексирует объект без
+    повторного расчёта.
+    """
+    minhash = signature(shingles(text))
+    duplicate = find_duplicate(text, minhash)
+    if duplicate is None:
+        if instance is not None:
+            instance._signed = (text, minhash)
+        return None
+    return HeldItem.objects.create(
+        kind=kind, author=author, text=text,
+        duplicate_kind=duplicate.kind, duplicate_id=duplicate.object_id,
+        similarity=duplicate.similarity,
+        **{name: value for name, value in fields.items() if value})
+
+
+def publish(item):
+    """Публикует задержанный текст обычным сохранением модели, чтобы
+    сработали все сигналы. Возвращает созданный объект или None, если
+    комментируемая запись уже удалена."""
+    obj = None
+    if item.kind == POST:
+        obj = Post(author_id=item.author_id, title=item.title,
+                   text=item.text, group_id=item.group_id)
+        if item.image:
+            obj.image.save(os.path.basename(item.image.name), item.image,
+                           save=False)
+        obj.save()
+    else:
+        post = get_post(item.post_id)
+        if post is not None:
+            parent = (post.comments.filter(pk=item.parent_id).first()
+                      if item.parent_id else None)
+            obj = Comment.objects.create(post=post, author_id=item.author_id,
+                                         text=item.text, parent=parent)
+    if item.image:
+        item.image.delete(save=False)
+    item.delete()
+    return obj
+
@@ -0,0 +1,11 @@
+from django.contrib import admin
+
+from .models import Notification
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'recipient', 'verb', 'post', 'actor_count',
+                    'updated')
+    list_filter = ('verb',)
+    empty_value_display = '-пусто-'
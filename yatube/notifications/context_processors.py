@@ -0,0 +1,16 @@
+from django.conf import settings
+
+from .utils import unread_count
+
+
+def unread_notifications(request):
+    """Добавляет ленивый счётчик непрочитанных уведомлений."""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {}
+
+    def count():
+        return unread_count(user)
+
+    return {'unread_notifications': count,
+            'notifications_badge_limit': settings.NOTIFICATIONS_BADGE_LIMIT}
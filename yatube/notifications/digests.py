@@ -0,0 +1,147 @@
+import heapq
+from datetime import timedelta
+from itertools import groupby, islice
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import F
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from posts.models import Follow, Post
+from shards.utils import is_sharded, shard_for_author
+from .models import DigestCheckpoint
+
+User = get_user_model()
+
+PERIODS = {
+    'daily': timedelta(days=1),
+    'weekly': timedelta(days=7),
+}
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _posts_by_follower(user_ids, since, limit):
+    """Новые записи отслеживаемых авторов для пачки пользователей.
+
+    Один запрос на пачку: строки упорядочены по подписчику, поэтому
+    группируются на лету без накопления всей выборки в памяти.
+    """
+    if is_sharded():
+        yield from _sharded_posts_by_follower(user_ids, since, limit)
+        return
+    rows = (
+        Post.objects
+        .filter(author__following__user_id__in=user_ids, pub_date__gte=since)
+        .annotate(follower_id=F('author__following__user_id'))
+        .order_by('follower_id', '-pub_date')
+        .values('follower_id', 'id', 'title', 'text', 'pub_date',
+                'author__username')
+        .iterator()
+    )
+    for follower_id, posts in groupby(rows, key=lambda row: row['follower_id']):
+        yield follower_id, list(islice(posts, limit))
+
+
+def _sharded_posts_by_follower(user_ids, since, limit):
+    """То же при шардировании: подписки берутся из основной базы,
+    записи — из шардов авторов, не больше limit на автора.
+    """
+    following = {}
+    for user_id, author_id in (Follow.objects.filter(user_id__in=user_ids)
+                               .values_list('user_id', 'author_id')):
+        following.setdefault(user_id, []).append(author_id)
+    by_shard = {}
+    for author_id in set().union(*following.values()):
+        by_shard.setdefault(shard_for_author(author_id), []).append(
+            author_id)
+    usernames = dict(User.objects.filter(pk__in=[
+        author_id for ids in by_shard.values() for author_id in ids
+    ]).values_list('pk', 'username'))
+    by_author = {}
+    for alias, author_ids in by_shard.items():
+        rows = (
+            Post.objects.using(alias)
+            .filter(author_id__in=author_ids, pub_date__gte=since)
+            .order_by('author_id', '-pub_date')
+            .values('author_id', 'id', 'title', 'text', 'pub_date')
+            .iterator()
+        )
+        for author_id, posts in groupby(rows,
+                                        key=lambda row: row['author_id']):
+            by_author[author_id] = [
+                dict(row, author__username=usernames.get(author_id))
+                for row in islice(posts, limit)
+            ]
+    for follower_id in sorted(following):
+        posts = heapq.merge(
+            *(by_author.get(author_id, ())
+              for author_id in following[follower_id]),
+            key=lambda row: row['pub_date'], reverse=True)
+        posts = list(islice(posts, limit))
+        if posts:
+            yield follower_id, posts
+
+
+def send_digests(period, chunk_size=None, now=None, stdout=None):
+    """Рассылает дайджест всем подписчикам и возвращает число писем."""
+    chunk_size = chunk_size or settings.DIGEST_CHUNK_SIZE
+    now = now or timezone.now()
+    since = now - PERIODS[period]
+    checkpoint, _ = DigestCheckpoint.objects.get_or_create(
+        period=period, run_date=now.date())
+    if checkpoint.finished:
+        return 0
+
+    users = (
+        User.objects
+        .filter(pk__gt=checkpoint.last_user_id, is_active=True)
+        .exclude(email='')
+        .order_by('pk')
+        .only('pk', 'username', 'email')
+        .iterator(chunk_size=chunk_size)
+    )
+    sent = 0
+    connection = get_connection()
+    connection.open()
+    try:
+        for chunk in _chunks(users, chunk_size):
+            users_by_id = {user.pk: user for user in chunk}
+            messages = []
+            for user_id, posts in _posts_by_follower(
+                    users_by_id, since, settings.DIGEST_POSTS_LIMIT):
+                user = users_by_id[user_id]
+                body = render_to_string('notifications/digest_email.txt', {
+                    'user': user,
+                    'posts': posts,
+                    'period': period,
+                })
+                messages.append(EmailMessage(
+                    subject='Новые записи ваших авторов',
+                    body=body,
+                    to=[user.email],
+                    connection=connection,
+                ))
+            if messages:
+                connection.send_messages(messages)
+            sent += len(messages)
+            checkpoint.last_user_id = chunk[-1].pk
+            checkpoint.sent += len(messages)
+            checkpoint.save(update_fields=('last_user_id', 'sent'))
+            if stdout is not None:
+                stdout.write(f'Пользователи до id={chunk[-1].pk}: '
+                             f'отправлено {checkpoint.sent}')
+    finally:
+        connection.close()
+    checkpoint.finished = True
+    checkpoint.save(update_fields=('finished',))
+    return sent
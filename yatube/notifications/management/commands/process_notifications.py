@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications.utils import fanout
+
+
+class Command(BaseCommand):
+    help = 'Разбирает очередь событий и раскладывает уведомления по ящикам.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--loop', action='store_true',
+                            help='Работать постоянно, как фоновый обработчик.')
+        parser.add_argument('--interval', type=float, default=5.0)
+
+    def handle(self, *args, **options):
+        while True:
+            processed = fanout(options['batch_size'])
+            if processed:
+                self.stdout.write(f'Обработано событий: {processed}')
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from notifications.digests import PERIODS, send_digests
+
+
+class Command(BaseCommand):
+    help = ('Рассылает подписчикам дайджест новых записей. Прерванный '
+            'запуск продолжается с последней отправленной пачки.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--period', choices=tuple(PERIODS),
+                            default='daily')
+        parser.add_argument('--chunk-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        sent = send_digests(options['period'], options['chunk_size'],
+                            stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(f'Писем отправлено: {sent}'))
@@ -0,0 +1,28 @@
+# Generated by Django 2.2.28 on 2026-10-19 14:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DigestCheckpoint',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(max_length=10, verbose_name='Период')),
+                ('run_date', models.DateField(verbose_name='Дата запуска')),
+                ('last_user_id', models.PositiveIntegerField(default=0)),
+                ('sent', models.PositiveIntegerField(default=0, verbose_name='Отправлено')),
+                ('finished', models.BooleanField(default=False)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='digestcheckpoint',
+            constraint=models.UniqueConstraint(fields=('period', 'run_date'), name='unique_digest_run'),
+        ),
+    ]
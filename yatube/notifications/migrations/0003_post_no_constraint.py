@@ -0,0 +1,24 @@
+# Generated by Django 2.2.28 on 2026-10-19 14:34
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_digestcheckpoint'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notification',
+            name='post',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='posts.Post', verbose_name='Запись'),
+        ),
+        migrations.AlterField(
+            model_name='notificationevent',
+            name='post',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='posts.Post'),
+        ),
+    ]
@@ -0,0 +1,73 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+
+from posts.models import Post
+
+User = get_user_model()
+
+COMMENT = 'comment'
+FOLLOW = 'follow'
+VERBS = (
+    (COMMENT, 'Комментарий'),
+    (FOLLOW, 'Подписка'),
+)
+
+
+class NotificationEvent(models.Model):
+    """Сырое событие, ожидающее разбора фоновым обработчиком."""
+    recipient = models.ForeignKey(User, on_delete=models.CASCADE,
+                                  related_name='+')
+    actor = models.ForeignKey(User, on_delete=models.CASCADE,
+                              related_name='+')
+    verb = models.CharField(max_length=20, choices=VERBS)
+    post = models.ForeignKey(Post, on_delete=models.CASCADE,
+                             db_constraint=False,
+                             blank=True, null=True, related_name='+')
+    created = models.DateTimeField(auto_now_add=True)
+
+
+class Notification(models.Model):
+    recipient = models.ForeignKey(User, on_delete=models.CASCADE,
+                                  related_name='notifications',
+                                  verbose_name='Получатель')
+    verb = models.CharField('Событие', max_length=20, choices=VERBS)
+    post = models.ForeignKey(Post, on_delete=models.CASCADE,
+                             db_constraint=False,
+                             blank=True, null=True, related_name='+',
+                             verbose_name='Запись')
+    last_actor = models.ForeignKey(User, on_delete=models.SET_NULL,
+                                   blank=True, null=True, related_name='+',
+                                   verbose_name='Последний участник')
+    actor_count = models.PositiveIntegerField('Количество', default=1)
+    updated = models.DateTimeField('Обновлено')
+
+    class Meta:
+        ordering = ('-updated',)
+        verbose_name = 'Уведомление'
+        verbose_name_plural = 'Уведомления'
+        indexes = [models.Index(fields=['recipient', 'updated'],
+                                name='notification_inbox_idx')]
+
+    def __str__(self):
+        return f'{self.recipient} {self.verb} x{self.actor_count}'
+
+
+class NotificationMarker(models.Model):
+    """Отметка прочтения: всё, что обновлено раньше last_read, прочитано."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE,
+                                primary_key=True,
+                                related_name='notification_marker')
+    last_read = models.DateTimeField('Прочитано до')
+
+
+class DigestCheckpoint(models.Model):
+    """Прогресс рассылки дайджеста, позволяет продолжить прерванный запуск."""
+    period = models.CharField('Период', max_length=10)
+    run_date = models.DateField('Дата запуска')
+    last_user_id = models.PositiveIntegerField(default=0)
+    sent = models.PositiveIntegerField('Отправлено', default=0)
+    finished = models.BooleanField(default=False)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['period', 'run_date'],
+                                               name='unique_digest_run')]
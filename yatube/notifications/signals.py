@@ -0,0 +1,36 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from posts.follows import follows_changed
+from posts.models import Comment, Follow
+from .models import COMMENT, FOLLOW, NotificationEvent
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, **kwargs):
+    if created and instance.author_id != instance.post.author_id:
+        NotificationEvent.objects.create(
+            recipient_id=instance.post.author_id,
+            actor_id=instance.author_id,
+            verb=COMMENT,
+            post_id=instance.post_id,
+        )
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, **kwargs):
+    if created:
+        NotificationEvent.objects.create(
+            recipient_id=instance.author_id,
+            actor_id=instance.user_id,
+            verb=FOLLOW,
+        )
+
+
+@receiver(follows_changed)
+def follows_created(sender, user, created, **kwargs):
+    NotificationEvent.objects.bulk_create(
+        NotificationEvent(recipient_id=author_id, actor_id=user.pk,
+                          verb=FOLLOW)
+        for author_id in created
+    )
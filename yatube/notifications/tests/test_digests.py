@@ -0,0 +1,45 @@
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.test import TestCase
+from notifications.digests import send_digests
+from notifications.models import DigestCheckpoint
+from posts.models import Follow, Post
+
+User = get_user_model()
+
+
+class DigestTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.followers = [
+            User.objects.create_user(username=f'follower{i}',
+                                     email=f'follower{i}@yatube.ru')
+            for i in range(3)
+        ]
+        User.objects.create_user(username='lonely', email='lonely@yatube.ru')
+        for follower in cls.followers:
+            Follow.objects.create(user=follower, author=cls.author)
+        Post.objects.create(author=cls.author, text='Свежая запись')
+
+    def test_digest_sent_to_followers(self):
+        '''Дайджест уходит только подписчикам, одним соединением'''
+        sent = send_digests('daily', chunk_size=2)
+
+        self.assertEqual(sent, 3)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertIn('Свежая запись', mail.outbox[0].body)
+        self.assertTrue(DigestCheckpoint.objects.get().finished)
+
+    def test_digest_resumes_from_checkpoint(self):
+        '''Повторный запуск продолжает с сохранённой позиции'''
+        send_digests('daily', chunk_size=2)
+        DigestCheckpoint.objects.update(last_user_id=self.followers[1].pk,
+                                        finished=False)
+        mail.outbox = []
+
+        sent = send_digests('daily', chunk_size=2)
+
+        self.assertEqual(sent, 1)
+        self.assertEqual(mail.outbox[0].to, [self.followers[2].email])
@@ -0,0 +1,88 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from notifications.models import Notification, NotificationEvent
+from notifications.utils import fanout, mark_read, unread_count
+from posts.models import Comment, Follow, Post
+
+User = get_user_model()
+
+
+class NotificationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.readers = [User.objects.create_user(username=f'reader{i}')
+                       for i in range(3)]
+        cls.post = Post.objects.create(author=cls.author,
+                                       text='тестовый текст')
+
+    def test_comments_coalesced(self):
+        '''Пачка комментариев склеивается в одно уведомление'''
+        for reader in self.readers:
+            Comment.objects.create(post=self.post, author=reader, text='!')
+        Comment.objects.create(post=self.post, author=self.author, text='!')
+
+        self.assertEqual(fanout(), 3)
+        self.assertFalse(NotificationEvent.objects.exists())
+        notification = Notification.objects.get(recipient=self.author)
+        self.assertEqual(notification.actor_count, 3)
+        self.assertEqual(unread_count(self.author), 1)
+
+    def test_read_marker(self):
+        '''После прочтения новое событие создаёт новое уведомление'''
+        Follow.objects.create(user=self.readers[0], author=self.author)
+        fanout()
+        mark_read(self.author)
+        self.assertEqual(unread_count(self.author), 0)
+
+        Follow.objects.create(user=self.readers[1], author=self.author)
+        fanout()
+
+        self.assertEqual(unread_count(self.author), 1)
+        self.assertEqual(
+            Notification.objects.filter(recipient=self.author).count(), 2)
+
+    def test_inbox_marks_read(self):
+        '''Открытие ящика сбрасывает счётчик'''
+        Follow.objects.create(user=self.readers[0], author=self.author)
+        fanout()
+        client = Client()
+        client.force_login(self.author)
+
+        response = client.get(reverse('notifications:inbox'))
+
+        self.assertEqual(len(response.context['notifications']), 1)
+        self.assertEqual(unread_count(self.author), 0)
+
+    def test_merge_by_post(self):
+        '''Новые события сливаются с непрочитанным уведомлением о той же
+        записи, а о другой записи создают отдельное'''
+        other = Post.objects.create(author=self.author, text='другой текст')
+        Comment.objects.create(post=self.post, author=self.readers[0],
+                               text='!')
+        fanout()
+        Comment.objects.create(post=self.post, author=self.readers[1],
+                               text='!')
+        Comment.objects.create(post=other, author=self.readers[1], text='!')
+        fanout()
+
+        counts = dict(Notification.objects.filter(
+            recipient=self.author).values_list('post_id', 'actor_count'))
+        self.assertEqual(counts, {self.post.pk: 2, other.pk: 1})
+
+    @override_settings(NOTIFICATIONS_BADGE_LIMIT=2)
+    def test_badge_limit_from_settings(self):
+        '''Значок в шапке ограничен NOTIFICATIONS_BADGE_LIMIT'''
+        for number in range(3):
+            post = Post.objects.create(author=self.author, text=f'{number}')
+            Comment.objects.create(post=post, author=self.readers[0],
+                                   text='!')
+        fanout()
+        client = Client()
+        client.force_login(self.author)
+
+        response = client.get(reverse('posts:index'))
+
+        self.assertContains(response, '<span class="badge bg-danger">2+')
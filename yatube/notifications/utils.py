@@ -0,0 +1,97 @@
+from datetime import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Notification, NotificationEvent, NotificationMarker
+
+EPOCH = timezone.make_aware(datetime(1970, 1, 1), timezone.utc)
+
+
+def fanout(batch_size=None):
+    """Разбирает очередь событий пачками и возвращает число событий.
+
+    События с одинаковыми (получатель, тип, запись) склеиваются между собой
+    и с ещё непрочитанным уведомлением получателя, так что сотня
+    комментариев под одним постом превращается в одну строку в ящике.
+    """
+    batch_size = batch_size or settings.NOTIFICATIONS_BATCH_SIZE
+    processed = 0
+    while True:
+        with transaction.atomic():
+            events = list(NotificationEvent.objects.order_by('pk')
+                          [:batch_size])
+            if not events:
+                return processed
+            _apply(events)
+            NotificationEvent.objects.filter(
+                pk__lte=events[-1].pk).delete()
+        processed += len(events)
+
+
+def _apply(events):
+    groups = {}
+    for event in events:
+        key = (event.recipient_id, event.verb, event.post_id)
+        count, _, _ = groups.get(key, (0, None, None))
+        groups[key] = (count + 1, event.actor_id, event.created)
+
+    # Кандидаты на слияние — только непрочитанные уведомления о тех же
+    # записях: прочитанные и чужие отсекаются в SQL, а не в цикле.
+    post_ids = {key[2] for key in groups}
+    same_post = Q(post_id__in=post_ids - {None})
+    if None in post_ids:
+        same_post |= Q(post_id__isnull=True)
+    unread = {}
+    candidates = unread_queryset(None).filter(
+        same_post,
+        recipient_id__in={key[0] for key in groups},
+        verb__in={key[1] for key in groups},
+    ).order_by('updated')
+    for notification in candidates:
+        key = (notification.recipient_id, notification.verb,
+               notification.post_id)
+        if key in groups:
+            unread[key] = notification
+
+    to_update, to_create = [], []
+    for key, (count, actor_id, created) in groups.items():
+        notification = unread.get(key)
+        if notification is None:
+            to_create.append(Notification(
+                recipient_id=key[0], verb=key[1], post_id=key[2],
+                last_actor_id=actor_id, actor_count=count, updated=created,
+            ))
+        else:
+            notification.actor_count += count
+            notification.last_actor_id = actor_id
+            notification.updated = created
+            to_update.append(notification)
+    Notification.objects.bulk_create(to_create)
+    Notification.objects.bulk_update(
+        to_update, ('actor_count', 'last_actor', 'updated'))
+
+
+def unread_queryset(user):
+    """Непрочитанные уведомления user или всех получателей при None."""
+    last_read = NotificationMarker.objects.filter(
+        user=OuterRef('recipient')).values('last_read')
+    queryset = Notification.objects.filter(
+        updated__gt=Coalesce(Subquery(last_read), Value(EPOCH)))
+    if user is not None:
+        queryset = queryset.filter(recipient=user)
+    return queryset
+
+
+def unread_count(user):
+    """Число непрочитанных уведомлений, ограниченное для значка в шапке."""
+    limit = settings.NOTIFICATIONS_BADGE_LIMIT
+    return unread_queryset(user)[:limit + 1].count()
+
+
+def mark_read(user, until=None):
+    NotificationMarker.objects.update_or_create(
+        user=user, defaults={'last_read': until or timezone.now()})
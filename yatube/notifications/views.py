@@ -0,0 +1,31 @@
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import render
+from django.utils import timezone
+
+from shards.utils import is_sharded, posts_by_ids
+from .models import Notification, NotificationMarker
+from .utils import mark_read
+
+INBOX_SIZE = 50
+
+
+@login_required
+def inbox(request):
+    now = timezone.now()
+    marker = NotificationMarker.objects.filter(user=request.user).first()
+    notifications = request.user.notifications.select_related('last_actor')
+    if is_sharded():
+        notifications = list(notifications[:INBOX_SIZE])
+        posts = posts_by_ids(item.post_id for item in notifications)
+        field = Notification._meta.get_field('post')
+        for notification in notifications:
+            field.set_cached_value(notification,
+                                   posts.get(notification.post_id))
+    else:
+        notifications = notifications.select_related('post')[:INBOX_SIZE]
+    mark_read(request.user, now)
+    context = {
+        'notifications': notifications,
+        'last_read': marker.last_read if marker else None,
+    }
+    return render(request, 'notifications/inbox.html', context)
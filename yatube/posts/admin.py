@@ -1,17 +1,82 @@
-from django.contrib import admin
+from django.conf import settings
+from django.contrib import admin, messages
+from django.db import IntegrityError
+from django.shortcuts import redirect, render
+from django.urls import path
 
+from core.admin import PerformanceModeMixin
+from shards.admin import ShardedAdminMixin
+from . import search
+from .forms import ImportForm
+from .importer import import_upload
 from .models import Comment, Follow, Group, Post
 
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(ShardedAdminMixin, PerformanceModeMixin, admin.ModelAdmin):
     list_display = ('pk', 'text', 'pub_date', 'author', 'group')
     list_editable = ('group',)
+    list_select_related = ('author', 'group')
+    autocomplete_fields = ('author', 'group')
     search_fields = ('text',)
-    list_filter = ('pub_date',)
+    date_hierarchy = 'pub_date'
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        if (settings.ADMIN_PERFORMANCE_MODE and search_term
+                and search.is_available(queryset.db)):
+            return search.search(queryset, search_term), False
+        return super().get_search_results(request, queryset, search_term)
 
-admin.site.register(Group)
-admin.site.register(Comment)
-admin.site.register(Follow)
+    def get_urls(self):
+        urls = [
+            path('import/',
+                 self.admin_site.admin_view(self.import_view),
+                 name='posts_post_import'),
+        ]
+        return urls + super().get_urls()
+
+    def import_view(self, request):
+        if not self.has_add_permission(request):
+            return redirect('admin:posts_post_changelist')
+        form = ImportForm(request.POST or None, request.FILES or None)
+        if form.is_valid():
+            try:
+                stats = import_upload(form.cleaned_data['file'],
+                                      form.cleaned_data['data_format'],
+                                      form.cleaned_data['preserve_dates'])
+            except (KeyError, ValueError, IntegrityError) as error:
+                self.message_user(request, f'Ошибка импорта: {error}',
+                                  messages.ERROR)
+            else:
+                self.message_user(request, f'Импорт завершён: {stats}')
+                return redirect('admin:posts_post_changelist')
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Импорт записей',
+            'form': form,
+        }
+        return render(request, 'admin/posts/post/import.html', context)
+
+
+@admin.register(Group)
+class GroupAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'title', 'slug')
+    search_fields = ('title', 'slug')
+
+
+@admin.register(Comment)
+class CommentAdmin(ShardedAdminMixin, PerformanceModeMixin,
+                   admin.ModelAdmin):
+    list_display = ('pk', 'text', 'created', 'author', 'post')
+    list_select_related = ('author', 'post')
+    autocomplete_fields = ('author', 'post')
+    empty_value_display = '-пусто-'
+
+
+@admin.register(Follow)
+class FollowAdmin(PerformanceModeMixin, admin.ModelAdmin):
+    list_display = ('pk', 'user', 'author')
+    list_select_related = ('user', 'author')
+    autocomplete_fields = ('user', 'author')
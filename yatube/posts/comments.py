@@ -0,0 +1,98 @@
+import re
+
+from django.conf import settings
+from django.db.models import CharField, F, Subquery, Value
+from django.db.models.functions import Cast, Coalesce, LPad
+
+from .models import Comment
+
+# Путь комментария — id всех предков и его собственный, каждый дополнен
+# нулями до SEGMENT знаков. Сортировка по пути даёт обход ветки в глубину
+# с ответами по порядку появления, а поддерево узла — это отрезок путей
+# [path, path + END).
+SEGMENT = 10
+END = '~'
+CURSOR = re.compile(rf'(?:\d{{{SEGMENT}}})+')
+
+# Путь корневого комментария, вычисленный в самой БД: для bulk_create и
+# миграций, где id строк заранее неизвестны.
+ROOT_PATH = LPad(Cast('id', CharField()), SEGMENT, Value('0'))
+
+
+def ancestor_paths(path):
+    return [path[:end] for end in range(SEGMENT, len(path), SEGMENT)]
+
+
+def attach(comment, using):
+    """Проставляет путь и глубину только что созданному комментарию и
+    увеличивает счётчик ответов у всех его предков."""
+    parent_path = comment.parent.path if comment.parent_id else ''
+    comment.path = parent_path + str(comment.pk).zfill(SEGMENT)
+    comment.depth = len(comment.path) // SEGMENT
+    Comment.objects.using(using).filter(pk=comment.pk).update(
+        path=comment.path, depth=comment.depth)
+    if parent_path:
+        Comment.objects.using(using).filter(
+            post_id=comment.post_id, path__in=ancestor_paths(comment.path)
+        ).update(reply_count=F('reply_count') + 1)
+
+
+def detach(comment, using):
+    """Уменьшает счётчики предков удалённого комментария.
+
+    При каскадном удалении ветки сигнал приходит на каждый её узел, так
+    что предок вне ветки теряет ровно столько, сколько в ней было узлов.
+    """
+    if comment.depth > 1:
+        Comment.objects.using(using).filter(
+            post_id=comment.post_id, path__in=ancestor_paths(comment.path)
+        ).update(reply_count=F('reply_count') - 1)
+
+
+def fill_root_paths(queryset):
+    """Пути для комментариев, вставленных без сигналов (bulk_create)."""
+    return queryset.filter(path='').update(path=ROOT_PATH, depth=1)
+
+
+def _with_authors(comments):
+    if comments.db == 'default':
+        return comments.select_related('author')
+    # Пользователи лежат только в основной базе.
+    return comments.prefetch_related('author')
+
+
+def thread_page(comments, cursor=''):
+    """Страница обсуждений: COMMENT_THREADS_PER_PAGE корневых комментариев
+    и их ответы до глубины COMMENT_THREAD_DEPTH.
+
+    Всё читается одним запросом по отрезку путей: верхняя граница —
+    путь первого корня следующей страницы, он же курсор для неё.
+    Возвращает (комментарии, курсор или None).
+    """
+    cursor = cursor if CURSOR.fullmatch(cursor or '') else ''
+    roots = comments.filter(depth=1, path__gte=cursor).order_by('path')
+    per_page = settings.COMMENT_THREADS_PER_PAGE
+    rows = list(_with_authors(
+        comments.filter(path__gte=cursor,
+                        depth__lte=settings.COMMENT_THREAD_DEPTH)
+        .annotate(next_thread=Coalesce(
+            Subquery(roots.values('path')[per_page:per_page + 1]),
+            Value(END)))
+        .filter(path__lt=F('next_thread'))
+        .order_by('path')
+    ))
+    if not rows or rows[0].next_thread == END:
+        return rows, None
+    return rows, rows[0].next_thread
+
+
+def subtree(comment):
+    """Ответы на comment ещё на COMMENT_THREAD_DEPTH уровней вглубь —
+    для раскрытия свёрнутой ветки."""
+    return _with_authors(
+        Comment.objects.using(comment._state.db).filter(
+            post_id=comment.post_id,
+            path__gt=comment.path, path__lt=comment.path + END,
+            depth__lte=comment.depth + settings.COMMENT_THREAD_DEPTH,
+        ).order_by('path')
+    )
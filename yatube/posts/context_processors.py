@@ -0,0 +1,16 @@
+from django.conf import settings
+
+from .feed import unread_count
+
+
+def unread_feed(request):
+    """Добавляет ленивый счётчик новых записей в ленте подписок."""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {}
+
+    def count():
+        return unread_count(user)
+
+    return {'unread_feed': count,
+            'feed_badge_limit': settings.FEED_BADGE_LIMIT}
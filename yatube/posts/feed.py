@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+
+from .models import FeedMarker, Follow
+
+
+def unread_key(user_id):
+    return f'feed-unread:{user_id}'
+
+
+def unread_count(user):
+    """Число новых записей в ленте подписок из кэша или по первичному
+    ключу отметки; не больше FEED_BADGE_LIMIT + 1."""
+    key = unread_key(user.pk)
+    count = cache.get(key)
+    if count is None:
+        count = FeedMarker.objects.filter(user=user).values_list(
+            'unread', flat=True).first() or 0
+        cache.set(key, count, settings.FEED_UNREAD_TIMEOUT)
+    return count
+
+
+def mark_seen(user):
+    """Сдвигает отметку просмотра на текущий момент и обнуляет счётчик."""
+    now = timezone.now()
+    if not FeedMarker.objects.filter(user=user).update(last_seen=now,
+                                                       unread=0):
+        ensure_markers([user.pk], now)
+    cache.set(unread_key(user.pk), 0, settings.FEED_UNREAD_TIMEOUT)
+
+
+def ensure_markers(user_ids, last_seen=None):
+    """Создаёт недостающие отметки: старые записи новыми не считаются."""
+    FeedMarker.objects.bulk_create(
+        [FeedMarker(user_id=user_id, last_seen=last_seen or timezone.now())
+         for user_id in user_ids],
+        ignore_conflicts=True,
+    )
+
+
+def post_published(post):
+    """Одним UPDATE увеличивает счётчики подписчиков автора.
+
+    Счётчики, уже превысившие FEED_BADGE_LIMIT, не трогаются: значок всё
+    равно покажет «99+». Кэш счётчиков живёт FEED_UNREAD_TIMEOUT и не
+    сбрасывается у каждого подписчика.
+    """
+    FeedMarker.objects.filter(
+        user__in=Follow.objects.filter(author_id=post.author_id)
+        .values('user_id'),
+        last_seen__lt=post.pub_date,
+        unread__lte=settings.FEED_BADGE_LIMIT,
+    ).update(unread=F('unread') + 1)
@@ -0,0 +1,78 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.db.models import Max
+from django.dispatch import Signal
+
+from core.bulk import raw_delete
+from .models import Follow
+
+User = get_user_model()
+
+# Шлётся один раз на пачку подписок или отписок вместо post_save и
+# post_delete на каждую строку: author_ids — затронутые авторы, created —
+# авторы, на которых пользователь подписался впервые.
+follows_changed = Signal(providing_args=['user', 'author_ids', 'created'])
+
+
+def parse_usernames(values):
+    """Имена из полей формы или файла: через запятую, пробел или строку."""
+    names = []
+    for value in values:
+        names.extend(name.lstrip('@') for name in re.split(r'[\s,;]+', value)
+                     if name.lstrip('@'))
+    return list(dict.fromkeys(names))
+
+
+def resolve_authors(usernames):
+    """{имя: id} для существующих авторов и список неизвестных имён."""
+    found = dict(User.objects.filter(
+        username__in=usernames).values_list('username', 'id'))
+    return found, [name for name in usernames if name not in found]
+
+
+def follow(user, author_ids):
+    """Подписывает user на авторов одним INSERT OR IGNORE.
+
+    Повторная или одновременная подписка не падает на unique_follow.
+    Новые подписки определяются по id вокруг вставки: строки этого
+    INSERT получают id больше прежнего максимума у пользователя, а уже
+    существующие строки не читаются.
+    """
+    author_ids = set(author_ids) - {user.pk}
+    if not author_ids:
+        return set()
+    follows = Follow.objects.filter(user=user)
+    top = follows.aggregate(top=Max('pk'))['top'] or 0
+    Follow.objects.bulk_create(
+        [Follow(user=user, author_id=author_id) for author_id in author_ids],
+        ignore_conflicts=True,
+    )
+    created = set(follows.filter(pk__gt=top)
+                  .values_list('author_id', flat=True))
+    if created:
+        follows_changed.send(sender=Follow, user=user,
+                             author_ids=created, created=created)
+    return created
+
+
+def unfollow(user, author_ids):
+    """Отписывает user от авторов одним DELETE без выборки строк.
+
+    Сигнал получают только авторы, чьи подписки удалены. Для одного
+    автора это видно по числу удалённых строк; для нескольких
+    удаляемые подписки сначала выбираются.
+    """
+    author_ids = set(author_ids)
+    if len(author_ids) > 1:
+        author_ids = set(Follow.objects.filter(
+            user=user, author_id__in=author_ids
+        ).values_list('author_id', flat=True))
+    if not author_ids:
+        return 0
+    follows = Follow.objects.filter(user=user, author_id__in=author_ids)
+    deleted = raw_delete(follows)
+    if deleted:
+        follows_changed.send(sender=Follow, user=user,
+                             author_ids=author_ids, created=set())
+    return deleted
@@ -10,6 +10,17 @@ class PostForm(forms.ModelForm):
 
 
 class CommentForm(forms.ModelForm):
+    parent = forms.IntegerField(required=False, widget=forms.HiddenInput)
+
     class Meta:
         model = Comment
         fields = ('text',)
+
+
+class ImportForm(forms.Form):
+    file = forms.FileField(label='Файл')
+    data_format = forms.ChoiceField(label='Формат',
+                                    choices=(('ndjson', 'NDJSON'),
+                                             ('csv', 'CSV')))
+    preserve_dates = forms.BooleanField(label='Сохранить исходные даты',
+                                        required=False, initial=True)
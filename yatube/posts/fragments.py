@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from core.versions import get_versions
+from .rendering import RENDERER_VERSION
+
+POST_TEMPLATE = 'includes/post.html'
+SEPARATOR = '\n<hr>\n'
+
+
+def _dependencies(post):
+    pairs = [(post._meta.label_lower, post.pk), ('user', post.author_id)]
+    if post.group_id:
+        pairs.append(('group', post.group_id))
+    return pairs
+
+
+def render_posts(posts, group=None):
+    """Собирает ленту из закэшированных HTML-фрагментов отдельных записей.
+
+    Ключ фрагмента содержит версии записи, автора и группы, поэтому правка
+    одной записи перерисовывает только её.
+    """
+    posts = list(posts)
+    variant = 'group' if group else 'all'
+    dependencies = {post: _dependencies(post) for post in posts}
+    versions = get_versions({pair for pairs in dependencies.values()
+                             for pair in pairs})
+    keys = {}
+    for post, pairs in dependencies.items():
+        stamp = '.'.join(str(versions[pair]) for pair in pairs)
+        keys[post] = (f'post-fragment:{variant}:r{RENDERER_VERSION}:'
+                      f'{post._meta.label_lower}:{post.pk}:{stamp}')
+    fragments = cache.get_many(keys.values())
+    rendered = {}
+    for post, key in keys.items():
+        if key not in fragments:
+            rendered[key] = render_to_string(
+                POST_TEMPLATE, {'post': post, 'group': group})
+    if rendered:
+        cache.set_many(rendered, settings.POST_FRAGMENT_TIMEOUT)
+        fragments.update(rendered)
+    return mark_safe(SEPARATOR.join(fragments[keys[post]] for post in posts))
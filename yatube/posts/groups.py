@@ -0,0 +1,153 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import (Count, DateTimeField, F, IntegerField, Max,
+                              OuterRef, Subquery, Sum, Value)
+from django.db.models.functions import Coalesce, Greatest, TruncDate
+from django.utils import timezone
+
+from shards.utils import shard_aliases
+from .models import Group, GroupActivity, GroupStats, Post
+
+DIRECTORY_KEY = 'group-directory'
+
+
+def activity_start():
+    """Первый день окна активности GROUP_ACTIVITY_DAYS, включая сегодня."""
+    return timezone.localdate() - timedelta(
+        days=settings.GROUP_ACTIVITY_DAYS - 1)
+
+
+def _upsert(model, lookup, changes, defaults):
+    if model.objects.filter(**lookup).update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **defaults)
+    except IntegrityError:
+        model.objects.filter(**lookup).update(**changes)
+
+
+def posts_added(posts):
+    """Учитывает новые записи: по UPDATE на группу и на день окна."""
+    by_day = Counter()
+    latest = {}
+    for post in posts:
+        if post.group_id is None:
+            continue
+        by_day[post.group_id, timezone.localdate(post.pub_date)] += 1
+        latest[post.group_id] = max(latest.get(post.group_id, post.pub_date),
+                                    post.pub_date)
+    by_group = Counter()
+    start = activity_start()
+    for (group_id, day), count in by_day.items():
+        by_group[group_id] += count
+        if day >= start:
+            _upsert(GroupActivity, {'group_id': group_id, 'day': day},
+                    {'post_count': F('post_count') + count},
+                    {'post_count': count})
+    for group_id, count in by_group.items():
+        last = Value(latest[group_id], output_field=DateTimeField())
+        _upsert(GroupStats, {'group_id': group_id},
+                {'post_count': F('post_count') + count,
+                 'last_post': Greatest(Coalesce('last_post', last), last)},
+                {'post_count': count, 'last_post': latest[group_id]})
+
+
+def post_removed(group_id, pub_date):
+    """Вычитает запись из статистики группы.
+
+    Дата последней записи пересчитывается, только если удалили её саму.
+    """
+    GroupActivity.objects.filter(
+        group_id=group_id, day=timezone.localdate(pub_date),
+        post_count__gt=0).update(post_count=F('post_count') - 1)
+    GroupStats.objects.filter(group_id=group_id, post_count__gt=0).update(
+        post_count=F('post_count') - 1)
+    if GroupStats.objects.filter(group_id=group_id,
+                                 last_post__lte=pub_date).exists():
+        GroupStats.objects.filter(group_id=group_id).update(
+            last_post=_last_post(group_id))
+
+
+def _last_post(group_id):
+    dates = [Post.objects.using(alias).filter(group_id=group_id)
+             .aggregate(last=Max('pub_date'))['last']
+             for alias in shard_aliases()]
+    return max(filter(None, dates), default=None)
+
+
+def directory():
+    """Группы по убыванию активности за GROUP_ACTIVITY_DAYS дней.
+
+    Читает только таблицы статистики; результат кэшируется на
+    GROUP_DIRECTORY_TIMEOUT.
+    """
+    rows = cache.get(DIRECTORY_KEY)
+    if rows is None:
+        recent = GroupActivity.objects.filter(
+            group=OuterRef('pk'), day__gte=activity_start()
+        ).values('group').annotate(total=Sum('post_count')).values('total')
+        rows = list(Group.objects.annotate(
+            post_count=Coalesce('stats__post_count', Value(0)),
+            last_post=F('stats__last_post'),
+            recent_posts=Coalesce(Subquery(recent), Value(0),
+                                  output_field=IntegerField()),
+        ).order_by(
+            '-recent_posts', F('last_post').desc(nulls_last=True), 'title'
+        ).values('title', 'slug', 'description', 'post_count', 'last_post',
+                 'recent_posts'))
+        cache.set(DIRECTORY_KEY, rows, settings.GROUP_DIRECTORY_TIMEOUT)
+    return rows
+
+
+def reconcile():
+    """Пересчитывает статистику по самим записям во всех шардах и
+    исправляет расхождения. Возвращает число исправленных строк."""
+    start = activity_start()
+    totals = Counter()
+    latest = {}
+    recent = Counter()
+    for alias in shard_aliases():
+        posts = Post.objects.using(alias).exclude(group=None).order_by()
+        for group_id, count, last in posts.values('group').annotate(
+                count=Count('pk'), last=Max('pub_date')
+        ).values_list('group', 'count', 'last'):
+            totals[group_id] += count
+            latest[group_id] = max(latest.get(group_id, last), last)
+        for group_id, day, count in posts.filter(
+                pub_date__date__gte=start
+        ).annotate(day=TruncDate('pub_date')).values('group', 'day').annotate(
+                count=Count('pk')).values_list('group', 'day', 'count'):
+            recent[group_id, day] += count
+
+    fixed = 0
+    with transaction.atomic():
+        current = {row.pk: row for row in GroupStats.objects.all()}
+        for group_id in set(Group.objects.values_list('pk', flat=True)):
+            expected = (totals[group_id], latest.get(group_id))
+            row = current.get(group_id)
+            if row is None or (row.post_count, row.last_post) != expected:
+                GroupStats.objects.update_or_create(
+                    group_id=group_id, defaults={'post_count': expected[0],
+                                                 'last_post': expected[1]})
+                fixed += 1
+        GroupActivity.objects.filter(day__lt=start).delete()
+        current = {(row.group_id, row.day): row.post_count
+                   for row in GroupActivity.objects.all()}
+        for key in set(current) | set(recent):
+            if current.get(key) != recent[key]:
+                group_id, day = key
+                if recent[key]:
+                    GroupActivity.objects.update_or_create(
+                        group_id=group_id, day=day,
+                        defaults={'post_count': recent[key]})
+                else:
+                    GroupActivity.objects.filter(group_id=group_id,
+                                                 day=day).delete()
+                fixed += 1
+    cache.delete(DIRECTORY_KEY)
+    return fixed
@@ -0,0 +1,264 @@
+import csv
+import io
+import json
+import os
+import time
+from contextlib import ExitStack
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connections, router, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.bulk import raw_insert
+from core.images import update_image_meta
+from core.surrogates import purge
+from core.versions import bump_version
+from shards.utils import assign_ids, shard_aliases, shard_for_author
+from .comments import fill_root_paths
+from .groups import posts_added
+from .models import Comment, Group, ImportCheckpoint, Post
+
+User = get_user_model()
+
+FORMATS = ('ndjson', 'csv')
+
+
+class ImportStats:
+    def __init__(self):
+        self.posts = 0
+        self.comments = 0
+        self.skipped = 0
+        self.started = time.monotonic()
+
+    @property
+    def rows(self):
+        return self.posts + self.comments
+
+    @property
+    def rate(self):
+        elapsed = time.monotonic() - self.started
+        return self.rows / elapsed if elapsed else 0.0
+
+    def __str__(self):
+        return (f'записей: {self.posts}, комментариев: {self.comments}, '
+                f'пропущено: {self.skipped}, {self.rate:.0f} строк/с')
+
+
+def insert_as_is(model, objs, batch_size=None, ignore_conflicts=False,
+                 using=None):
+    """bulk_create, который пишет даты из самих объектов.
+
+    bulk_create подставляет текущее время в поля auto_now_add; здесь
+    вставка идёт в режиме raw, а текущее время получают только поля,
+    оставленные пустыми. Метаданные модели не меняются, поэтому записи,
+    создаваемые в это время другими потоками, не затрагиваются.
+    """
+    connection = connections[using or router.db_for_write(model)]
+    opts = model._meta
+    auto_now = [field.attname for field in opts.concrete_fields
+                if getattr(field, 'auto_now_add', False)]
+    objs = iter(objs)
+    while True:
+        batch = list(islice(objs, batch_size or settings.IMPORT_BATCH_SIZE))
+        if not batch:
+            return
+        now = timezone.now()
+        for obj in batch:
+            for attname in auto_now:
+                if getattr(obj, attname) is None:
+                    setattr(obj, attname, now)
+        with_pk = [obj for obj in batch if obj.pk is not None]
+        without_pk = [obj for obj in batch if obj.pk is None]
+        for group, fields in (
+                (with_pk, opts.concrete_fields),
+                (without_pk, [field for field in opts.concrete_fields
+                              if field is not opts.pk])):
+            size = max(connection.ops.bulk_batch_size(fields, group), 1)
+            for start in range(0, len(group), size):
+                raw_insert(model, group[start:start + size], fields,
+                           connection.alias, ignore_conflicts)
+
+
+def read_records(stream, data_format):
+    """Читает текстовый поток NDJSON или CSV и отдаёт словари по строке."""
+    if data_format == 'csv':
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def _date(value):
+    if not value:
+        return timezone.now()
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValueError(f'Неверная дата: {value}')
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, timezone.utc)
+    return parsed
+
+
+class Importer:
+    def __init__(self, batch_size=None, preserve_dates=True,
+                 checkpoint=None):
+        self.batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+        self.preserve_dates = preserve_dates
+        self.checkpoint = checkpoint
+        self.authors = dict(User.objects.values_list('username', 'id'))
+        self.groups = dict(Group.objects.values_list('slug', 'id'))
+        self.stats = ImportStats()
+
+    def _date(self, value):
+        return _date(value) if self.preserve_dates else timezone.now()
+
+    def _existing_posts(self, post_ids):
+        """{id записи: шард} для уже сохранённых записей."""
+        found = {}
+        for alias in shard_aliases():
+            found.update(dict.fromkeys(Post.objects.using(alias).filter(
+                pk__in=post_ids).values_list('pk', flat=True), alias))
+        return found
+
+    def _build(self, record):
+        author_id = self.authors.get(record.get('author'))
+        if author_id is None:
+            return None
+        if record.get('type', 'post') == 'comment':
+            return Comment(
+                post_id=int(record['post_id']),
+                author_id=author_id,
+                text=record['text'],
+                created=self._date(record.get('created')),
+            )
+        post = Post(
+            id=int(record['id']) if record.get('id') else None,
+            author_id=author_id,
+            group_id=self.groups.get(record.get('group')),
+            title=record.get('title') or '',
+            text=record['text'],
+            image=record.get('image') or '',
+            pub_date=self._date(record.get('pub_date')),
+        )
+        if post.image:
+            # Файл уже лежит в хранилище: сигнал pre_save при вставке
+            # пачкой не срабатывает, поэтому метаданные считаются здесь.
+            update_image_meta(post, 'image', force=True)
+            post.image.close()
+        return post
+
+    def _insert(self, batch, position):
+        posts = [obj for obj in batch if isinstance(obj, Post)]
+        comments = [obj for obj in batch if isinstance(obj, Comment)]
+        assign_ids(posts)
+        # Записи ложатся в шард автора, комментарии — в шард записи.
+        # Комментарии к несуществующим записям пропускаются здесь, а не
+        # падают на IntegrityError при коммите всей пачки.
+        shards = {post.pk: shard_for_author(post.author_id, create=True)
+                  for post in posts}
+        missing = {comment.post_id for comment in comments} - set(shards)
+        if missing:
+            shards.update(self._existing_posts(missing))
+            self.stats.skipped += sum(comment.post_id not in shards
+                                      for comment in comments)
+            comments = [comment for comment in comments
+                        if comment.post_id in shards]
+        assign_ids(comments)
+        by_shard = {}
+        for post in posts:
+            by_shard.setdefault(shard_for_author(post.author_id), (
+                [], []))[0].append(post)
+        for comment in comments:
+            by_shard.setdefault(shards[comment.post_id], ([], []))[1].append(
+                comment)
+        # Транзакция основной базы внешняя: шарды фиксируются раньше неё,
+        # а контрольная точка — последней, вместе со статистикой групп.
+        with transaction.atomic(), ExitStack() as shard_transactions:
+            for alias in by_shard:
+                shard_transactions.enter_context(
+                    transaction.atomic(using=alias))
+            for alias, (shard_posts, shard_comments) in by_shard.items():
+                insert_as_is(Post, shard_posts, using=alias)
+                insert_as_is(Comment, shard_comments, using=alias)
+                if shard_comments:
+                    fill_root_paths(Comment.objects.using(alias).filter(
+                        post_id__in={comment.post_id
+                                     for comment in shard_comments}))
+            posts_added(posts)
+            if self.checkpoint is not None:
+                self.checkpoint.position = position
+                self.checkpoint.save(update_fields=('position', 'updated'))
+        authors = {post.author_id for post in posts}
+        for author_id in authors:
+            bump_version('card', author_id)
+        # Вставка в обход save() не шлёт сигналов, поэтому страницы
+        # очищаются здесь.
+        groups = {post.group_id for post in posts}
+        purge('index',
+              *(f'author:{pk}' for pk in authors),
+              *(f'group:{slug}' for slug, pk in self.groups.items()
+                if pk in groups),
+              *(f'post:{comment.post_id}' for comment in comments))
+        self.stats.posts += len(posts)
+        self.stats.comments += len(comments)
+
+    def run(self, records, start=0, on_batch=None):
+        """Вставляет записи пачками, начиная со строки start.
+
+        С контрольной точкой её позиция сдвигается в транзакции каждой
+        пачки, поэтому после сбоя пачка не вставляется второй раз. После
+        каждой закоммиченной пачки вызывается on_batch(номер строки,
+        статистика).
+        """
+        position = start
+        records = islice(records, start, None)
+        while True:
+            chunk = list(islice(records, self.batch_size))
+            if not chunk:
+                return self.stats
+            batch = []
+            for record in chunk:
+                obj = self._build(record)
+                if obj is None:
+                    self.stats.skipped += 1
+                else:
+                    batch.append(obj)
+            position += len(chunk)
+            self._insert(batch, position)
+            if on_batch is not None:
+                on_batch(position, self.stats)
+
+
+def import_file(path, data_format=None, batch_size=None,
+                preserve_dates=True, resume=True, stdout=None):
+    """Импортирует файл, продолжая с сохранённой контрольной точки."""
+    data_format = data_format or os.path.splitext(path)[1].lstrip('.')
+    if data_format not in FORMATS:
+        raise ValueError(f'Неизвестный формат: {data_format}')
+    checkpoint, _ = ImportCheckpoint.objects.get_or_create(
+        source=os.path.abspath(path))
+    if not resume:
+        checkpoint.position = 0
+
+    def on_batch(position, stats):
+        if stdout is not None:
+            stdout.write(f'Строка {position}: {stats}')
+
+    importer = Importer(batch_size, preserve_dates, checkpoint)
+    with open(path, newline='', encoding='utf-8') as stream:
+        stats = importer.run(read_records(stream, data_format),
+                             checkpoint.position, on_batch)
+    checkpoint.delete()
+    return stats
+
+
+def import_upload(upload, data_format, preserve_dates=True):
+    """Импорт загруженного через админку файла за один проход."""
+    stream = io.TextIOWrapper(upload.file, encoding='utf-8', newline='')
+    return Importer(preserve_dates=preserve_dates).run(
+        read_records(stream, data_format))
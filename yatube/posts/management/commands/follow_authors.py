@@ -0,0 +1,40 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.follows import follow, parse_usernames, resolve_authors, unfollow
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = ('Подписывает пользователя на многих авторов сразу или '
+            'отписывает от них. Имена берутся из аргументов и файла.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('authors', nargs='*')
+        parser.add_argument('--file', help='Файл с именами авторов.')
+        parser.add_argument('--unfollow', action='store_true')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f'Нет пользователя {options["username"]}')
+        values = list(options['authors'])
+        if options['file']:
+            try:
+                with open(options['file'], encoding='utf-8') as names:
+                    values.extend(names)
+            except OSError as error:
+                raise CommandError(error)
+        found, unknown = resolve_authors(parse_usernames(values))
+        for name in unknown:
+            self.stderr.write(f'Нет автора {name}')
+        if options['unfollow']:
+            count = unfollow(user, found.values())
+            message = f'Отписок: {count}'
+        else:
+            count = len(follow(user, found.values()))
+            message = f'Новых подписок: {count}'
+        self.stdout.write(self.style.SUCCESS(message))
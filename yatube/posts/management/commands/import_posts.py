@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+
+from posts.importer import FORMATS, import_file
+
+
+class Command(BaseCommand):
+    help = ('Импортирует записи и комментарии из NDJSON или CSV пачками '
+            'через bulk_create. Авторы и группы задаются username и slug.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=FORMATS, default=None,
+                            help='По умолчанию определяется по расширению.')
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--no-preserve-dates', action='store_true',
+                            help='Ставить текущую дату вместо исходной.')
+        parser.add_argument('--restart', action='store_true',
+                            help='Игнорировать контрольную точку.')
+
+    def handle(self, *args, **options):
+        try:
+            stats = import_file(
+                options['path'],
+                data_format=options['format'],
+                batch_size=options['batch_size'],
+                preserve_dates=not options['no_preserve_dates'],
+                resume=not options['restart'],
+                stdout=self.stdout,
+            )
+        except (KeyError, OSError, ValueError, IntegrityError) as error:
+            raise CommandError(error)
+        self.stdout.write(self.style.SUCCESS(f'Импорт завершён: {stats}'))
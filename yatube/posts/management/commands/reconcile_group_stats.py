@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from posts.groups import reconcile
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает статистику групп по записям всех шардов и '
+            'исправляет расхождения, накопленные сигналами.')
+
+    def handle(self, *args, **options):
+        fixed = reconcile()
+        self.stdout.write(self.style.SUCCESS(f'Исправлено строк: {fixed}'))
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.28 on 2026-10-19 14:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_auto_20220715_1009'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='like',
+            field=models.IntegerField(blank=True, default=0, verbose_name='Like'),
+        ),
+    ]
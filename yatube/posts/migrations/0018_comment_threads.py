@@ -0,0 +1,52 @@
+# Generated by Django 2.2.28 on 2026-10-19 14:44
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import CharField, Value
+from django.db.models.functions import Cast, LPad
+
+
+def fill_root_paths(apps, schema_editor):
+    # Все существующие комментарии — корни своих веток.
+    Comment = apps.get_model('posts', 'Comment')
+    Comment.objects.using(schema_editor.connection.alias).update(
+        path=LPad(Cast('id', CharField()), 10, Value('0')), depth=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0017_image_meta'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=1, editable=False, verbose_name='Глубина'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='replies', to='posts.Comment', verbose_name='Ответ на'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='path',
+            field=models.CharField(blank=True, editable=False, max_length=255, verbose_name='Путь в ветке'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='reply_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Ответов в ветке'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'path'], name='comment_thread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'depth', 'path'], name='comment_root_idx'),
+        ),
+        migrations.RunPython(fill_root_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 2.2.28 on 2026-10-19 14:47
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0018_comment_threads'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupStats',
+            fields=[
+                ('group', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='posts.Group', verbose_name='Группа')),
+                ('post_count', models.PositiveIntegerField(default=0, verbose_name='Записей')),
+                ('last_post', models.DateTimeField(blank=True, null=True, verbose_name='Последняя запись')),
+            ],
+            options={
+                'verbose_name': 'Статистика группы',
+                'verbose_name_plural': 'Статистика групп',
+            },
+        ),
+        migrations.CreateModel(
+            name='GroupActivity',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='День')),
+                ('post_count', models.PositiveIntegerField(default=0, verbose_name='Записей')),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity', to='posts.Group', verbose_name='Группа')),
+            ],
+            options={
+                'verbose_name': 'Активность группы',
+                'verbose_name_plural': 'Активность групп',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='groupactivity',
+            constraint=models.UniqueConstraint(fields=('group', 'day'), name='unique_group_day'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 2.2.28 on 2026-10-19 14:48
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils import timezone
+
+
+def create_markers(apps, schema_editor):
+    # Подписчики начинают с нуля новых записей.
+    Follow = apps.get_model('posts', 'Follow')
+    FeedMarker = apps.get_model('posts', 'FeedMarker')
+    alias = schema_editor.connection.alias
+    now = timezone.now()
+    FeedMarker.objects.using(alias).bulk_create(
+        [FeedMarker(user_id=user_id, last_seen=now) for user_id in
+         Follow.objects.using(alias).values_list('user_id', flat=True)
+         .distinct()],
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        ('posts', '0019_group_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedMarker',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='feed_marker', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('last_seen', models.DateTimeField(verbose_name='Просмотрено до')),
+                ('unread', models.PositiveIntegerField(default=0, verbose_name='Новых записей')),
+            ],
+        ),
+        migrations.RunPython(create_markers, migrations.RunPython.noop),
+    ]
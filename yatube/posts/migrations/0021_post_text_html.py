@@ -0,0 +1,23 @@
+# Generated by Django 2.2.28 on 2026-10-19 14:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0020_feed_marker'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='text_html',
+            field=models.TextField(blank=True, editable=False, verbose_name='HTML текста'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='text_html_version',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Версия рендерера'),
+        ),
+    ]
@@ -4,6 +4,16 @@ from django.db import models
 User = get_user_model()
 
 
+class RoutedQuerySet(models.QuerySet):
+    def create(self, **kwargs):
+        # Без явного .using() базу выбирает роутер по самому объекту, как
+        # в save(), поэтому запись сразу попадает в шард автора.
+        obj = self.model(**kwargs)
+        self._for_write = True
+        obj.save(force_insert=True, using=self._db)
+        return obj
+
+
 class Group(models.Model):
     title = models.CharField(max_length=200, unique=True, verbose_name='Имя')
     slug = models.SlugField(unique=True, verbose_name='Адрес')
@@ -13,6 +23,34 @@ class Group(models.Model):
         return self.title
 
 
+class GroupStats(models.Model):
+    # Поддерживается сигналами записей (posts.groups), сверяется командой
+    # reconcile_group_stats.
+    group = models.OneToOneField(Group, primary_key=True,
+                                 on_delete=models.CASCADE,
+                                 related_name='stats', verbose_name='Группа')
+    post_count = models.PositiveIntegerField('Записей', default=0)
+    last_post = models.DateTimeField('Последняя запись', blank=True,
+                                     null=True)
+
+    class Meta:
+        verbose_name = 'Статистика группы'
+        verbose_name_plural = 'Статистика групп'
+
+
+class GroupActivity(models.Model):
+    group = models.ForeignKey(Group, on_delete=models.CASCADE,
+                              related_name='activity', verbose_name='Группа')
+    day = models.DateField('День')
+    post_count = models.PositiveIntegerField('Записей', default=0)
+
+    class Meta:
+        verbose_name = 'Активность группы'
+        verbose_name_plural = 'Активность групп'
+        constraints = [models.UniqueConstraint(fields=['group', 'day'],
+                                               name='unique_group_day')]
+
+
 class Post(models.Model):
 
     title = models.TextField(max_length=20,
@@ -21,13 +59,21 @@ class Post(models.Model):
 
     text = models.TextField(verbose_name='Текст',
                             help_text='Здесь напишите текст вашей записи ')
+    # HTML текста, отрисованный при сохранении (posts.rendering), чтобы
+    # ленты не разбирали разметку при каждом показе.
+    text_html = models.TextField('HTML текста', blank=True, editable=False)
+    text_html_version = models.PositiveSmallIntegerField(
+        'Версия рендерера', default=0, editable=False)
     
-    pub_date = models.DateTimeField(auto_now_add=True,
+    pub_date = models.DateTimeField(auto_now_add=True, db_index=True,
                                     verbose_name='Дата публикации')
+    # Без ограничений в базе: запись может лежать в шарде без таблицы
+    # пользователей и групп (см. shards).
     author = models.ForeignKey(User, on_delete=models.CASCADE,
+                               db_constraint=False,
                                related_name='posts', verbose_name='Автор')
     group = models.ForeignKey('Group', related_name='posts',
-                              on_delete=models.SET_NULL,
+                              on_delete=models.SET_NULL, db_constraint=False,
                               blank=True, null=True,
                               verbose_name='Сообщество',
                               help_text='Укажите группу в которой'
@@ -37,8 +83,20 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True
     )
+    # Заполняются при загрузке (core.images), чтобы шаблоны не открывали
+    # файл ради размеров.
+    image_width = models.PositiveIntegerField('Ширина картинки', blank=True,
+                                              null=True, editable=False)
+    image_height = models.PositiveIntegerField('Высота картинки', blank=True,
+                                               null=True, editable=False)
+    image_color = models.CharField('Цвет картинки', max_length=7, blank=True,
+                                   editable=False)
+    image_placeholder = models.TextField('Превью картинки', blank=True,
+                                         editable=False)
+
+    like = models.IntegerField('Like', blank=True, default=0)
 
-    like = models.IntegerField('Like', blank=True)
+    objects = RoutedQuerySet.as_manager()
 
 
     class Meta:
@@ -55,11 +113,29 @@ class Comment(models.Model):
                              on_delete=models.CASCADE,
                              verbose_name='комментируемая запись',)
     author = models.ForeignKey(User, related_name='comments',
-                               on_delete=models.CASCADE,
+                               on_delete=models.CASCADE, db_constraint=False,
                                verbose_name='Автор еомментария',)
     text = models.TextField(verbose_name='Текст комментария')
     created = models.DateTimeField(verbose_name='Время и дата комментария',
                                    auto_now_add=True)
+    parent = models.ForeignKey('self', related_name='replies',
+                               on_delete=models.CASCADE, blank=True,
+                               null=True, verbose_name='Ответ на')
+    path = models.CharField('Путь в ветке', max_length=255, blank=True,
+                            editable=False)
+    depth = models.PositiveSmallIntegerField('Глубина', default=1,
+                                             editable=False)
+    reply_count = models.PositiveIntegerField('Ответов в ветке', default=0,
+                                              editable=False)
+
+    objects = RoutedQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['post', 'path'], name='comment_thread_idx'),
+            models.Index(fields=['post', 'depth', 'path'],
+                         name='comment_root_idx'),
+        ]
 
 
 class Follow(models.Model):
@@ -71,3 +147,18 @@ class Follow(models.Model):
     class Meta:
         constraints = [models.UniqueConstraint(fields=['author', 'user'],
                                                name='unique_follow')]
+
+
+class FeedMarker(models.Model):
+    """Отметка просмотра ленты подписок и число новых записей после неё."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE,
+                                primary_key=True, related_name='feed_marker')
+    last_seen = models.DateTimeField('Просмотрено до')
+    unread = models.PositiveIntegerField('Новых записей', default=0)
+
+
+class ImportCheckpoint(models.Model):
+    """Позиция импорта файла; сдвигается в одной транзакции с пачкой."""
+    source = models.CharField('Файл', max_length=255, unique=True)
+    position = models.PositiveIntegerField('Строк обработано', default=0)
+    updated = models.DateTimeField('Обновлено', auto_now=True)
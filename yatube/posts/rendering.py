@@ -0,0 +1,88 @@
+import re
+
+from django.urls import reverse
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from tags.utils import HASHTAG_RE, MENTION_RE
+
+# Увеличивается при любом изменении вывода render_text: записи со старой
+# версией перерисовываются при следующем показе (stored_html).
+RENDERER_VERSION = 1
+
+PARAGRAPH = re.compile(r'\n\s*\n')
+TOKEN = re.compile(r'(`[^`\n]+`|https?://[^\s<>"\'`]+)')
+TRAILING = '.,;:!?)'
+STRONG = re.compile(r'\*\*(?=\S)(.+?)(?<=\S)\*\*')
+EMPHASIS = re.compile(r'(?<![\w*])\*(?=[^\s*])(.+?)(?<=[^\s*])\*(?![\w*])')
+
+
+def _hashtag(match):
+    url = reverse('tags:hashtag', args=(match.group(1).lower(),))
+    return f'<a href="{url}">{match.group(0)}</a>'
+
+
+def _mention(match):
+    url = reverse('tags:mention', args=(match.group(1),))
+    return f'<a href="{url}">{match.group(0)}</a>'
+
+
+def link_tags(html):
+    """#теги и @упоминания в уже экранированном тексте — в ссылки."""
+    html = HASHTAG_RE.sub(_hashtag, html)
+    return MENTION_RE.sub(_mention, html)
+
+
+def _link(url):
+    tail = ''
+    while url[-1] in TRAILING:
+        url, tail = url[:-1], url[-1] + tail
+    url = escape(url)
+    return (f'<a href="{url}" rel="nofollow noopener" target="_blank">'
+            f'{url}</a>{escape(tail)}')
+
+
+def _inline(line):
+    parts = []
+    for index, part in enumerate(TOKEN.split(line)):
+        if index % 2 == 0:
+            html = escape(part)
+            html = STRONG.sub(r'<strong>\1</strong>', html)
+            html = EMPHASIS.sub(r'<em>\1</em>', html)
+            parts.append(link_tags(html))
+        elif part.startswith('`'):
+            parts.append(f'<code>{escape(part[1:-1])}</code>')
+        else:
+            parts.append(_link(part))
+    return ''.join(parts)
+
+
+def render_text(text):
+    """HTML текста записи: абзацы, переносы строк, ссылки, теги,
+    упоминания, **жирный**, *курсив* и `код`.
+
+    Весь пользовательский текст экранируется, теги в вывод добавляет
+    только сам рендерер, поэтому отдельная очистка HTML не нужна.
+    """
+    paragraphs = PARAGRAPH.split(text.strip())
+    return '\n'.join(
+        '<p>' + '<br>\n'.join(_inline(line) for line in paragraph.splitlines())
+        + '</p>'
+        for paragraph in paragraphs if paragraph.strip()
+    )
+
+
+def update_rendered(instance):
+    instance.text_html = render_text(instance.text)
+    instance.text_html_version = RENDERER_VERSION
+
+
+def stored_html(instance):
+    """Сохранённый HTML записи; устаревший по версии рендерера
+    перерисовывается и записывается обратно без сигналов."""
+    if instance.text_html_version != RENDERER_VERSION:
+        update_rendered(instance)
+        type(instance)._default_manager.using(instance._state.db).filter(
+            pk=instance.pk).update(text_html=instance.text_html,
+                                   text_html_version=RENDERER_VERSION)
+    return mark_safe(instance.text_html)
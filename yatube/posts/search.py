@@ -0,0 +1,75 @@
+import re
+
+from django.db import connections
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'posts_post_fts'
+
+TRIGGERS = {
+    'posts_post_fts_ai': (
+        'AFTER INSERT ON posts_post BEGIN '
+        'INSERT INTO posts_post_fts(rowid, text, title) '
+        'VALUES (new.id, new.text, new.title); END'
+    ),
+    'posts_post_fts_ad': (
+        'AFTER DELETE ON posts_post BEGIN '
+        "INSERT INTO posts_post_fts(posts_post_fts, rowid, text, title) "
+        "VALUES ('delete', old.id, old.text, old.title); END"
+    ),
+    'posts_post_fts_au': (
+        'AFTER UPDATE OF text, title ON posts_post BEGIN '
+        "INSERT INTO posts_post_fts(posts_post_fts, rowid, text, title) "
+        "VALUES ('delete', old.id, old.text, old.title); "
+        'INSERT INTO posts_post_fts(rowid, text, title) '
+        'VALUES (new.id, new.text, new.title); END'
+    ),
+}
+
+
+def is_available(using='default'):
+    return connections[using].vendor == 'sqlite'
+
+
+def ensure_search_index(using='default', **kwargs):
+    """Создаёт FTS5-индекс записей и триггеры синхронизации.
+
+    SQLite пересоздаёт таблицу posts_post при изменении схемы, и триггеры
+    пропадают вместе со старой таблицей. Поэтому индекс проверяется после
+    каждой миграции и перестраивается, если триггеры пришлось создать заново.
+    """
+    if not is_available(using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' "
+            "AND name = 'posts_post'")
+        if cursor.fetchone() is None:
+            return
+        cursor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5('
+            "text, title, content='posts_post', content_rowid='id')")
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' "
+            'AND tbl_name = %s', ['posts_post'])
+        existing = {row[0] for row in cursor.fetchall()}
+        missing = set(TRIGGERS) - existing
+        for name in missing:
+            cursor.execute(f'CREATE TRIGGER {name} {TRIGGERS[name]}')
+        if missing:
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def match_expression(search_term):
+    """Превращает строку поиска в префиксный запрос FTS5."""
+    words = re.findall(r'\w+', search_term)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def search(queryset, search_term):
+    expression = match_expression(search_term)
+    if not expression:
+        return queryset
+    return queryset.filter(pk__in=RawSQL(
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+        (expression,)))
@@ -0,0 +1,125 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core.images import update_image_meta
+from core.surrogates import purge
+from core.versions import bump_version
+from .comments import attach, detach
+from .feed import ensure_markers, post_published
+from .follows import follows_changed
+from .groups import DIRECTORY_KEY, post_removed, posts_added
+from .rendering import update_rendered
+from .models import Comment, Follow, Group, Post
+from .utils import post_keys
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_changed(sender, instance, **kwargs):
+    bump_version(instance._meta.label_lower, instance.pk)
+    purge('index', *post_keys(instance), *getattr(instance, '_old_keys', ()))
+
+
+@receiver(pre_save, sender=Post)
+def image_uploaded(sender, instance, raw=False, **kwargs):
+    if not raw:
+        update_image_meta(instance, 'image')
+
+
+@receiver(pre_save, sender=Post)
+def text_rendered(sender, instance, raw=False, **kwargs):
+    if not raw:
+        update_rendered(instance)
+
+
+@receiver(pre_save, sender=Post)
+def remember_old_group(sender, instance, **kwargs):
+    # Запись, перенесённая в другую группу, должна исчезнуть и со
+    # страницы прежней группы, и из её статистики.
+    # Старый текст нужен индексу дубликатов (moderation.signals).
+    if instance._state.adding:
+        return
+    instance._old_group_id, instance._old_text = sender.objects.using(
+        instance._state.db).filter(pk=instance.pk).values_list(
+        'group_id', 'text').first() or (None, None)
+    instance._old_keys = []
+    if instance._old_group_id not in (None, instance.group_id):
+        instance._old_keys = [
+            f'group:{slug}' for slug in Group.objects.filter(
+                pk=instance._old_group_id).values_list('slug', flat=True)
+        ]
+
+
+@receiver(post_save, sender=Post)
+def count_group_post(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_group_id = getattr(instance, '_old_group_id', instance.group_id)
+    if created or old_group_id != instance.group_id:
+        if not created and old_group_id:
+            post_removed(old_group_id, instance.pub_date)
+        posts_added([instance])
+
+
+@receiver(post_delete, sender=Post)
+def uncount_group_post(sender, instance, **kwargs):
+    if instance.group_id:
+        post_removed(instance.group_id, instance.pub_date)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    purge(f'post:{instance.post_id}')
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, using, raw=False, **kwargs):
+    if created and not raw and not instance.path:
+        attach(instance, using)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, using, **kwargs):
+    detach(instance, using)
+
+
+@receiver(post_save, sender=User)
+def user_changed(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    bump_version('user', instance.pk)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, instance, **kwargs):
+    bump_version('group', instance.pk)
+    purge(f'group:{instance.slug}')
+    cache.delete(DIRECTORY_KEY)
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def follow_saved(sender, instance, created=False, **kwargs):
+    bump_version('follows', instance.user_id)
+    if created:
+        ensure_markers([instance.user_id])
+
+
+@receiver(follows_changed)
+def follows_batch_changed(sender, user, created, **kwargs):
+    # Кэш ленты подписок сбрасывается один раз на всю пачку.
+    bump_version('follows', user.pk)
+    if created:
+        ensure_markers([user.pk])
+
+
+@receiver(post_save, sender=Post)
+def count_unread(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        post_published(instance)
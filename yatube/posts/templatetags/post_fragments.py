@@ -0,0 +1,17 @@
+from django import template
+
+from posts.fragments import render_posts
+from posts.rendering import stored_html
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def post_list(context, posts):
+    return render_posts(posts, context.get('group'))
+
+
+@register.filter
+def post_body(post):
+    """Сохранённый HTML текста записи (см. posts.rendering)."""
+    return stored_html(post)
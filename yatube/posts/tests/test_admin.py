@@ -0,0 +1,63 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class PostAdminTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@yatube.ru', password='pass')
+        cls.user = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test',
+            description='Тестовое описание',
+        )
+        for number in range(5):
+            Post.objects.create(author=cls.user, group=cls.group,
+                                text=f'обычный текст {number}')
+        cls.post = Post.objects.create(author=cls.user,
+                                       text='редкое слово попугай')
+        cls.url = reverse('admin:posts_post_changelist')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def test_search_uses_full_text_index(self):
+        '''Поиск в админке идёт по FTS-индексу, в том числе по префиксу'''
+        response = self.client.get(self.url, {'q': 'попуг'})
+
+        self.assertEqual(list(response.context['cl'].result_list),
+                         [self.post])
+
+    def test_search_index_follows_edits(self):
+        '''Индекс обновляется триггерами при изменении записи'''
+        self.post.text = 'теперь про кота'
+        self.post.save()
+
+        response = self.client.get(self.url, {'q': 'попугай'})
+
+        self.assertEqual(len(response.context['cl'].result_list), 0)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        '''Авторы и группы подгружаются одним запросом'''
+        with self.assertNumQueries(5):
+            self.client.get(self.url)
+
+    def test_count_cached_not_estimated(self):
+        '''Число строк точное после удалений и берётся из кэша'''
+        Post.objects.filter(text='обычный текст 0').delete()
+
+        first = self.client.get(self.url)
+        Post.objects.filter(text='обычный текст 1').delete()
+        second = self.client.get(self.url)
+
+        self.assertEqual(first.context['cl'].result_count, 5)
+        self.assertEqual(second.context['cl'].result_count, 5)
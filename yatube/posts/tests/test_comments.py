@@ -0,0 +1,85 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts.comments import subtree, thread_page
+from posts.models import Comment, Post
+
+User = get_user_model()
+
+
+@override_settings(COMMENT_THREADS_PER_PAGE=2, COMMENT_THREAD_DEPTH=2)
+class CommentThreadTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(author=cls.user, text='текст')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def comment(self, parent=None, text='!'):
+        return Comment.objects.create(post=self.post, author=self.user,
+                                      parent=parent, text=text)
+
+    def test_path_and_reply_counts(self):
+        '''Ответ получает путь родителя, счётчики предков растут и
+        уменьшаются при удалении ветки'''
+        root = self.comment()
+        reply = self.comment(root)
+        nested = self.comment(reply)
+
+        self.assertEqual(nested.depth, 3)
+        self.assertTrue(nested.path.startswith(reply.path))
+        self.assertTrue(reply.path.startswith(root.path))
+        root.refresh_from_db()
+        self.assertEqual(root.reply_count, 2)
+
+        reply.delete()
+        root.refresh_from_db()
+        self.assertEqual(root.reply_count, 0)
+
+    def test_thread_page_is_one_query(self):
+        '''Страница веток читается одним запросом с ограничением глубины'''
+        first, second, third = self.comment(), self.comment(), self.comment()
+        reply = self.comment(first)
+        deep = self.comment(reply)
+        self.comment(second)
+
+        with self.assertNumQueries(1):
+            comments, cursor = thread_page(self.post.comments.all())
+
+        self.assertEqual(comments[:3], [first, reply, second])
+        self.assertNotIn(deep, comments)
+        self.assertNotIn(third, comments)
+        self.assertEqual(cursor, third.path)
+        self.assertEqual(thread_page(self.post.comments.all(), cursor),
+                         ([third], None))
+
+    def test_replies_expand_lazily(self):
+        '''Свёрнутая ветка раскрывается отдельным запросом'''
+        root = self.comment()
+        reply = self.comment(root)
+        deep = self.comment(reply, text='глубокий ответ')
+
+        detail = self.client.get(
+            reverse('posts:post_detail', args=(self.post.pk,)))
+        url = reverse('posts:comment_replies', args=(self.post.pk, reply.pk))
+        fragment = self.client.get(url)
+
+        self.assertNotContains(detail, 'глубокий ответ')
+        self.assertContains(detail, url)
+        self.assertEqual(list(subtree(reply)), [deep])
+        self.assertContains(fragment, 'глубокий ответ')
+
+    def test_add_reply(self):
+        '''Форма ответа создаёт комментарий внутри ветки'''
+        root = self.comment()
+
+        self.client.post(reverse('posts:add_comment', args=(self.post.pk,)),
+                         {'text': 'ответ', 'parent': root.pk})
+
+        reply = Comment.objects.get(text='ответ')
+        self.assertEqual(reply.parent, root)
+        self.assertEqual(reply.depth, 2)
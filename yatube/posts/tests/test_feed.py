@@ -0,0 +1,69 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts.feed import unread_count
+from posts.follows import follow
+from posts.models import FeedMarker, Post
+
+User = get_user_model()
+
+
+class FeedUnreadTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+
+    def setUp(self):
+        cache.clear()
+        follow(self.reader, [self.author.pk])
+        self.client.force_login(self.reader)
+
+    def publish(self, count=1):
+        for number in range(count):
+            Post.objects.create(author=self.author, text=f'текст {number}')
+
+    def test_new_posts_counted_until_feed_viewed(self):
+        '''Новые записи увеличивают счётчик, просмотр ленты его обнуляет'''
+        self.publish(2)
+
+        self.assertEqual(FeedMarker.objects.get(user=self.reader).unread, 2)
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, '<span class="badge bg-primary">2')
+
+        self.client.get(reverse('posts:follow_index'))
+        self.assertEqual(unread_count(self.reader), 0)
+        self.assertEqual(FeedMarker.objects.get(user=self.reader).unread, 0)
+
+    @override_settings(FEED_BADGE_LIMIT=2)
+    def test_counter_capped(self):
+        '''Счётчик перестаёт расти после порога значка'''
+        self.publish(5)
+        response = self.client.get(reverse('posts:index'))
+
+        self.assertEqual(FeedMarker.objects.get(user=self.reader).unread, 3)
+        self.assertContains(response, '<span class="badge bg-primary">2+')
+
+    @override_settings(POSTS_PER_PAGE=1)
+    def test_only_first_page_marks_seen(self):
+        '''Вторая страница и подгрузка ленты не сбрасывают счётчик'''
+        self.publish(2)
+
+        self.client.get(reverse('posts:follow_index'), {'page': 2})
+        self.client.get(reverse('posts:follow_index'),
+                        {'page': 1, 'fragment': 1})
+        self.assertEqual(unread_count(self.reader), 2)
+
+        self.client.get(reverse('posts:follow_index'))
+        self.assertEqual(unread_count(self.reader), 0)
+
+    def test_badge_is_cached(self):
+        '''Значок читается из кэша без обращения к базе'''
+        self.publish()
+        unread_count(self.reader)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(unread_count(self.reader), 1)
@@ -0,0 +1,110 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from notifications.models import NotificationEvent
+from posts.follows import (follow, follows_changed, parse_usernames,
+                           unfollow)
+from posts.models import Follow
+from profile_edit.cards import get_profile_card
+
+User = get_user_model()
+
+
+class FollowOperationsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='reader')
+        cls.authors = [User.objects.create_user(username=f'author{number}')
+                       for number in range(3)]
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_follow_is_idempotent(self):
+        '''Повторная подписка не дублирует строки и уведомления'''
+        ids = [author.pk for author in self.authors]
+        created = follow(self.user, ids + [self.user.pk])
+        again = follow(self.user, ids)
+
+        self.assertEqual(created, set(ids))
+        self.assertEqual(again, set())
+        self.assertEqual(Follow.objects.filter(user=self.user).count(), 3)
+        self.assertEqual(NotificationEvent.objects.count(), 3)
+        self.assertEqual(get_profile_card(self.authors[0])['follower_count'],
+                         1)
+
+    def test_unfollow_is_single_delete(self):
+        '''Отписка выполняется одним запросом DELETE'''
+        author = self.authors[0]
+        Follow.objects.create(user=self.user, author=author)
+        self.assertEqual(get_profile_card(author)['follower_count'], 1)
+
+        with self.assertNumQueries(1):
+            deleted = unfollow(self.user, [author.pk])
+
+        self.assertEqual(deleted, 1)
+        self.assertEqual(unfollow(self.user, [author.pk]), 0)
+        self.assertEqual(get_profile_card(author)['follower_count'], 0)
+
+    def test_signal_only_for_changed_rows(self):
+        '''Сигнал и уведомления — только о новых и удалённых подписках'''
+        first, second, third = (author.pk for author in self.authors)
+        Follow.objects.create(user=self.user, author_id=first)
+        NotificationEvent.objects.all().delete()
+        sent = []
+
+        def receiver(sender, author_ids, created, **kwargs):
+            sent.append((author_ids, created))
+
+        follows_changed.connect(receiver)
+        self.addCleanup(follows_changed.disconnect, receiver)
+
+        created = follow(self.user, [first, second])
+        deleted = unfollow(self.user, [second, third])
+
+        self.assertEqual(created, {second})
+        self.assertEqual(NotificationEvent.objects.count(), 1)
+        self.assertEqual(deleted, 1)
+        self.assertEqual(sent, [({second}, {second}), ({second}, set())])
+
+    def test_bulk_endpoint(self):
+        '''Пакетная подписка принимает список имён и сообщает о неизвестных'''
+        response = self.client.post(reverse('posts:follow_bulk'), {
+            'authors': ['author0, @author1', 'author1\nnobody'],
+        })
+
+        self.assertEqual(response.json(), {
+            'followed': ['author0', 'author1'], 'unknown': ['nobody'],
+        })
+
+        response = self.client.post(reverse('posts:follow_bulk'), {
+            'authors': 'author0 author1', 'action': 'unfollow',
+        })
+
+        self.assertEqual(response.json(), {'unfollowed': 2, 'unknown': []})
+        self.assertFalse(Follow.objects.filter(user=self.user).exists())
+
+    def test_command(self):
+        '''Команда подписывает пользователя на перечисленных авторов'''
+        stdout, stderr = StringIO(), StringIO()
+        call_command('follow_authors', 'reader', 'author0', 'author2',
+                     'nobody', stdout=stdout, stderr=stderr)
+
+        self.assertIn('Новых подписок: 2', stdout.getvalue())
+        self.assertIn('Нет автора nobody', stderr.getvalue())
+        self.assertEqual(
+            set(Follow.objects.filter(user=self.user)
+                .values_list('author__username', flat=True)),
+            {'author0', 'author2'})
+
+    def test_parse_usernames(self):
+        '''Имена разделяются запятыми и пробелами, дубликаты убираются'''
+        self.assertEqual(parse_usernames(['a, b;c', '@a\n d ']),
+                         ['a', 'b', 'c', 'd'])
@@ -0,0 +1,71 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.test.signals import template_rendered
+from posts.fragments import POST_TEMPLATE, render_posts
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class FragmentCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test',
+            description='Тестовое описание',
+        )
+        for number in range(3):
+            Post.objects.create(author=cls.user, group=cls.group,
+                                text=f'текст {number}')
+
+    def setUp(self):
+        cache.clear()
+        self.rendered = []
+        template_rendered.connect(self.on_render)
+
+    def tearDown(self):
+        template_rendered.disconnect(self.on_render)
+
+    def on_render(self, sender, template, context, **kwargs):
+        if template.name == POST_TEMPLATE:
+            self.rendered.append(context['post'].pk)
+
+    def posts(self):
+        return Post.objects.select_related('author', 'group')
+
+    def test_edit_rerenders_one_post(self):
+        '''Правка записи перерисовывает только её фрагмент'''
+        render_posts(self.posts())
+        post = Post.objects.first()
+        post.text = 'исправленный текст'
+        post.save()
+        self.rendered.clear()
+
+        html = render_posts(self.posts())
+
+        self.assertEqual(self.rendered, [post.pk])
+        self.assertIn('исправленный текст', html)
+
+    def test_author_change_rerenders_author_posts(self):
+        '''Смена имени автора перерисовывает его записи'''
+        render_posts(self.posts())
+        self.user.first_name = 'Лев'
+        self.user.save()
+        self.rendered.clear()
+
+        html = render_posts(self.posts())
+
+        self.assertEqual(len(self.rendered), 3)
+        self.assertIn('Лев', html)
+
+    def test_group_variant_cached_separately(self):
+        '''На странице группы фрагмент без ссылки на группу'''
+        render_posts(self.posts())
+
+        html = render_posts(self.posts(), group=self.group)
+
+        self.assertNotIn('все записи группы', html)
@@ -0,0 +1,80 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Group, GroupActivity, GroupStats, Post
+
+User = get_user_model()
+
+
+class GroupDirectoryTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.quiet = Group.objects.create(title='Тихая', slug='quiet',
+                                         description='-')
+        cls.busy = Group.objects.create(title='Шумная', slug='busy',
+                                        description='-')
+
+    def setUp(self):
+        cache.clear()
+
+    def post(self, group):
+        return Post.objects.create(author=self.user, text='текст',
+                                   group=group)
+
+    def test_stats_follow_posts(self):
+        '''Создание, перенос и удаление записей меняют статистику групп'''
+        first = self.post(self.busy)
+        second = self.post(self.busy)
+
+        stats = GroupStats.objects.get(group=self.busy)
+        self.assertEqual(stats.post_count, 2)
+        self.assertEqual(stats.last_post, second.pub_date)
+        self.assertEqual(GroupActivity.objects.get(group=self.busy)
+                         .post_count, 2)
+
+        second.group = self.quiet
+        second.save()
+        first.delete()
+
+        stats.refresh_from_db()
+        self.assertEqual(stats.post_count, 0)
+        self.assertIsNone(stats.last_post)
+        self.assertEqual(GroupStats.objects.get(group=self.quiet).post_count,
+                         1)
+
+    def test_directory_ordered_by_activity(self):
+        '''Каталог упорядочен по активности и не читает таблицу записей'''
+        self.post(self.quiet)
+        self.post(self.busy)
+        self.post(self.busy)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('posts:group_directory'))
+
+        groups = list(response.context['page_obj'])
+        self.assertEqual([group['slug'] for group in groups],
+                         ['busy', 'quiet'])
+        self.assertEqual(groups[0]['post_count'], 2)
+        self.assertEqual(groups[0]['recent_posts'], 2)
+
+    def test_reconcile(self):
+        '''Команда исправляет разошедшуюся статистику'''
+        self.post(self.busy)
+        GroupStats.objects.filter(group=self.busy).update(post_count=5)
+        GroupActivity.objects.all().delete()
+
+        call_command('reconcile_group_stats', stdout=StringIO())
+
+        self.assertEqual(GroupStats.objects.get(group=self.busy).post_count,
+                         1)
+        self.assertEqual(GroupActivity.objects.get(group=self.busy)
+                         .post_count, 1)
+        self.assertEqual(GroupStats.objects.get(group=self.quiet).post_count,
+                         0)
@@ -0,0 +1,131 @@
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from posts.importer import Importer, import_file
+from posts.models import Comment, Group, ImportCheckpoint, Post
+from shards.utils import author_posts, set_placement
+
+User = get_user_model()
+
+
+class ImportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.ndjson')
+        records = [
+            {'id': 100 + i, 'author': 'author', 'group': 'test',
+             'text': f'текст {i}', 'pub_date': '2015-03-01T10:00:00'}
+            for i in range(5)
+        ]
+        records.append({'author': 'nobody', 'text': 'пропуск'})
+        records.append({'type': 'comment', 'author': 'author',
+                        'post_id': 104, 'text': 'комментарий',
+                        'created': '2015-03-02T10:00:00'})
+        with os.fdopen(handle, 'w') as stream:
+            for record in records:
+                stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_import_preserves_dates(self):
+        '''Импорт сохраняет исходные даты и связи'''
+        stats = import_file(self.path, batch_size=2)
+
+        self.assertEqual((stats.posts, stats.comments, stats.skipped),
+                         (5, 1, 1))
+        post = Post.objects.get(pk=100)
+        self.assertEqual(post.pub_date.year, 2015)
+        self.assertEqual(post.group, self.group)
+        self.assertEqual(Comment.objects.get().created.year, 2015)
+        self.assertFalse(ImportCheckpoint.objects.exists())
+
+    def test_import_resumes_from_checkpoint(self):
+        '''Импорт продолжается с последней закоммиченной пачки'''
+        ImportCheckpoint.objects.create(source=os.path.abspath(self.path),
+                                        position=4)
+
+        stats = import_file(self.path, batch_size=2)
+
+        self.assertEqual(stats.posts, 1)
+        self.assertEqual(list(Post.objects.values_list('pk', flat=True)),
+                         [104])
+
+    def test_crash_does_not_repeat_batch(self):
+        '''Пачка, упавшая до фиксации, не сдвигает контрольную точку, и
+        повторный запуск не вставляет закоммиченные пачки второй раз'''
+        with mock.patch('posts.importer.posts_added',
+                        side_effect=[None, RuntimeError]), \
+                self.assertRaises(RuntimeError):
+            import_file(self.path, batch_size=2)
+
+        self.assertEqual(ImportCheckpoint.objects.get().position, 2)
+        stats = import_file(self.path, batch_size=2)
+
+        self.assertEqual(stats.posts, 3)
+        self.assertEqual(Post.objects.count(), 5)
+        self.assertEqual(Comment.objects.count(), 1)
+
+    def test_comment_to_missing_post_skipped(self):
+        '''Комментарий к несуществующей записи пропускается без ошибки'''
+        with open(self.path, 'a') as stream:
+            stream.write(json.dumps({'type': 'comment', 'author': 'author',
+                                     'post_id': 999, 'text': 'сирота'}) + '\n')
+
+        stats = import_file(self.path, batch_size=10)
+
+        self.assertEqual((stats.comments, stats.skipped), (1, 2))
+        self.assertFalse(Comment.objects.filter(post_id=999).exists())
+
+    def test_model_fields_untouched(self):
+        '''Импорт не отключает auto_now_add у полей моделей'''
+        field = Post._meta.get_field('pub_date')
+        with mock.patch.object(Post, 'save', side_effect=AssertionError):
+            import_file(self.path, batch_size=2)
+
+        self.assertTrue(field.auto_now_add)
+        self.assertNotEqual(
+            Post.objects.create(author=self.user, text='новая').pub_date.year,
+            2015)
+
+
+@override_settings(POST_SHARDS=['default', 'shard'])
+class ShardedImportTests(TestCase):
+    databases = {'default', 'shard'}
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+
+    def setUp(self):
+        cache.clear()
+        set_placement(self.user.pk, 'shard')
+
+    def test_rows_go_to_author_shard(self):
+        '''Записи и комментарии импортируются в шард автора'''
+        importer = Importer()
+        importer.run([
+            {'id': 10, 'author': 'author', 'text': 'запись'},
+            {'type': 'comment', 'author': 'author', 'post_id': 10,
+             'text': 'комментарий'},
+        ])
+
+        self.assertFalse(Post.objects.using('default').exists())
+        self.assertEqual(list(author_posts(self.user.pk).values_list(
+            'pk', flat=True)), [10])
+        self.assertEqual(Comment.objects.using('shard').get().post_id, 10)
@@ -0,0 +1,74 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from posts import rendering
+from posts.models import Post
+
+User = get_user_model()
+
+
+class RenderTextTests(TestCase):
+    def test_markup(self):
+        '''Абзацы, переносы, ссылки, теги и лёгкая разметка'''
+        html = rendering.render_text(
+            '**Важно**: *см.* https://example.com/a?b=1&c=2.\n'
+            '`#не_тег` #тег @auth\n\nвторой абзац')
+
+        self.assertIn('<strong>Важно</strong>', html)
+        self.assertIn('<em>см.</em>', html)
+        self.assertIn('<a href="https://example.com/a?b=1&amp;c=2" '
+                      'rel="nofollow noopener" target="_blank">', html)
+        self.assertIn('</a>.<br>', html)
+        self.assertIn('<code>#не_тег</code>', html)
+        self.assertIn(reverse('tags:hashtag', args=('тег',)), html)
+        self.assertIn(reverse('tags:mention', args=('auth',)), html)
+        self.assertTrue(html.endswith('<p>второй абзац</p>'))
+
+    def test_html_escaped(self):
+        '''Пользовательский HTML не попадает в вывод'''
+        html = rendering.render_text(
+            '<script>alert(1)</script> javascript:alert(1) `<b>`')
+
+        self.assertNotIn('<script>', html)
+        self.assertNotIn('<b>', html)
+        self.assertNotIn('href="javascript', html)
+
+
+class StoredHtmlTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_rendered_on_save(self):
+        '''HTML считается при сохранении, лента его не пересчитывает'''
+        post = Post.objects.create(author=self.user, text='**жирный**')
+
+        self.assertEqual(post.text_html, '<p><strong>жирный</strong></p>')
+        self.assertEqual(post.text_html_version, rendering.RENDERER_VERSION)
+        with mock.patch('posts.rendering.render_text') as render:
+            response = self.client.get(reverse('posts:index'))
+
+        render.assert_not_called()
+        self.assertContains(response, '<strong>жирный</strong>')
+
+    def test_stale_version_rerendered(self):
+        '''Запись со старой версией рендерера перерисовывается при показе'''
+        post = Post.objects.create(author=self.user, text='*курсив*')
+        Post.objects.filter(pk=post.pk).update(text_html='старый',
+                                               text_html_version=0)
+
+        response = self.client.get(
+            reverse('posts:post_detail', args=(post.pk,)))
+        post.refresh_from_db()
+
+        self.assertContains(response, '<em>курсив</em>')
+        self.assertEqual(post.text_html, '<p><em>курсив</em></p>')
+        self.assertEqual(post.text_html_version, rendering.RENDERER_VERSION)
@@ -329,3 +329,31 @@ class FollowTests(TestCase):
         response = self.following_client.get(self.view_profile_follow)
 
         self.assertNotEqual(response, 'тестовый текст')
+
+
+class FeedFragmentTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        for number in range(settings.POSTS_PER_PAGE + 3):
+            Post.objects.create(author=cls.user, text=f'текст номер {number}')
+        cls.view_profile = reverse('posts:profile',
+                                   kwargs={'username': cls.user.username})
+
+    def test_fragment_contains_only_posts(self):
+        '''Фрагмент ленты содержит только записи и курсор следующей пачки'''
+        response = self.client.get(self.view_profile, {'fragment': 1})
+
+        self.assertTemplateUsed(response, 'includes/post_batch.html')
+        self.assertTemplateNotUsed(response, 'base.html')
+        self.assertEqual(response['X-Next-Page'], '2')
+        self.assertContains(response, 'data-next-page="2"')
+
+    def test_last_fragment_has_no_cursor(self):
+        '''Последняя пачка не содержит курсора'''
+        response = self.client.get(self.view_profile,
+                                   {'fragment': 1, 'page': 2})
+
+        self.assertNotIn('X-Next-Page', response)
+        self.assertEqual(len(response.context['page_obj']), 3)
@@ -1,8 +1,51 @@
+from datetime import datetime, timedelta, timezone
+
 from django.conf import settings
 from django.core.paginator import Paginator
+from django.shortcuts import render
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
 
 
 def paginator(request, posts):
     paginator = Paginator(posts, settings.POSTS_PER_PAGE)
     page_number = request.GET.get('page')
-    return paginator.get_page(page_number)
\ No newline at end of file
+    return paginator.get_page(page_number)
+
+
+def post_keys(post):
+    """Суррогатные ключи страниц, на которых видна запись."""
+    keys = [f'post:{post.pk}', f'author:{post.author_id}']
+    if post.group_id:
+        keys.append(f'group:{post.group.slug}')
+    return keys
+
+
+def page_keys(page_obj):
+    return [key for post in page_obj for key in post_keys(post)]
+
+
+def encode_cursor(pub_date, pk):
+    """Курсор для постраничного вывода по ключу (pub_date, id)."""
+    stamp = (pub_date - EPOCH) // timedelta(microseconds=1)
+    return f'{stamp}_{pk}'
+
+
+def decode_cursor(value):
+    try:
+        stamp, pk = (int(part) for part in value.split('_'))
+    except (AttributeError, ValueError):
+        return None
+    return EPOCH + timedelta(microseconds=stamp), pk
+
+
+def render_feed(request, template, context):
+    """Полная страница ленты или, при ?fragment=1, только следующая пачка
+    записей для бесконечной прокрутки."""
+    if request.GET.get('fragment'):
+        response = render(request, 'includes/post_batch.html', context)
+        page_obj = context['page_obj']
+        if page_obj.has_next():
+            response['X-Next-Page'] = page_obj.next_page_number()
+        return response
+    return render(request, template, context)
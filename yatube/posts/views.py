@@ -1,42 +1,68 @@
-from django.contrib.auth import get_user_model
+from django.conf import settings
+from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
-
-from profile_edit.models import ProfileEdit
+from django.views.decorators.http import require_POST
+
+from archive.utils import ChainedPosts, archived_comments, archived_posts
+from core.ratelimit import ratelimit
+from core.surrogates import tag
+from core.versions import get_version
+from moderation.models import COMMENT, POST
+from moderation.utils import hold_if_duplicate
+from profile_edit.cards import get_profile_card
+from shards.utils import (all_posts, author_posts, get_post, get_post_or_404,
+                          posts_by_authors)
+from users.cache import get_user_by_username_or_404
+from .comments import subtree, thread_page
+from .feed import mark_seen
+from .follows import follow, parse_usernames, resolve_authors, unfollow
 from .forms import CommentForm, PostForm
-from .models import Comment, Follow, Group, Post
-from .utils import paginator
+from .groups import directory
+from .models import Follow, Group
+from .utils import page_keys, paginator, post_keys, render_feed
+
+HELD_MESSAGE = ('Текст почти совпадает с уже опубликованным и отправлен '
+                'на проверку модератору.')
 
-User = get_user_model()
 
 def index(request):
-    posts = Post.objects.select_related('group', 'author')
+    posts = all_posts()
     page_obj = paginator(request, posts)
+    tag(request, 'index', *page_keys(page_obj))
     context = {
         'page_obj': page_obj,
     }
-    return render(request, 'posts/index.html', context)
+    return render_feed(request, 'posts/index.html', context)
 
 
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
+    posts = all_posts(group=group)
     page_obj = paginator(request, posts)
+    tag(request, f'group:{group.slug}', *page_keys(page_obj))
     context = {
         'group': group,
         'page_obj': page_obj,
     }
-    return render(request, 'posts/group_list.html', context)
+    return render_feed(request, 'posts/group_list.html', context)
+
+
+def group_directory(request):
+    context = {
+        'page_obj': paginator(request, directory()),
+    }
+    return render(request, 'posts/group_directory.html', context)
 
 
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    posts = author.posts.all()
-    posts_count = posts.count()
+    author = get_user_by_username_or_404(username)
+    posts = ChainedPosts(author_posts(author.pk),
+                         archived_posts(author_id=author.pk))
     page_obj = paginator(request, posts)
-    follower_count = Follow.objects.filter(author=author).count
-    profile = get_object_or_404(ProfileEdit, author=author)
+    tag(request, f'author:{author.pk}', *page_keys(page_obj))
     if request.user.is_authenticated:
         following = Follow.objects.filter(
             user=request.user, author=author
@@ -45,38 +71,51 @@ def profile(request, username):
         following = False
 
     context = {
-        'profile': profile,
-        'follower_count': follower_count,
+        'card': get_profile_card(author),
         'author': author,
-        'posts_count': posts_count,
         'page_obj': page_obj,
         'following': following,
     }
-    return render(request, 'posts/profile.html', context)
+    return render_feed(request, 'posts/profile.html', context)
 
 
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_post(post_id)
+    is_archived = post is None
+    if is_archived:
+        post = get_object_or_404(archived_posts(), pk=post_id)
+        comments, comments_next = archived_comments(post), None
+    else:
+        comments, comments_next = thread_page(post.comments.all(),
+                                              request.GET.get('comments'))
+    tag(request, *post_keys(post))
     author = post.author
-    posts_count = author.posts.count()
-    comments = Comment.objects.filter(post=post)
+    posts_count = get_profile_card(author)['posts_count']
     form = CommentForm(request.POST or None)
     context = {
         'author': author,
         'post': post,
         'posts_count': posts_count,
         'comments': comments,
+        'comments_next': comments_next,
+        'thread_depth': settings.COMMENT_THREAD_DEPTH,
         'form': form,
+        'is_archived': is_archived,
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+@ratelimit
 @login_required
 def post_create(request):
     form = PostForm(request.POST or None, files=request.FILES or None)
     if form.is_valid() and request.method == "POST":
         post = form.save(commit=False)
         post.author = request.user
+        if hold_if_duplicate(POST, request.user, instance=post,
+                             **form.cleaned_data):
+            messages.info(request, HELD_MESSAGE)
+            return redirect('posts:profile', username=request.user)
         post.save()
         return redirect('posts:profile', username=post.author)
 
@@ -88,7 +127,7 @@ def post_create(request):
 
 @login_required
 def post_edit(request, post_id):
-    post = get_object_or_404(Post, pk=post_id, )
+    post = get_post_or_404(post_id)
     if post.author != request.user:
         return redirect('posts:post_detail', post_id=post_id)
 
@@ -105,44 +144,94 @@ def post_edit(request, post_id):
     return render(request, 'posts/post_create.html', context)
 
 
+@ratelimit
 @login_required
 def add_comment(request, post_id):
     form = CommentForm(request.POST or None)
-    post = get_object_or_404(Post.objects.select_related('author', 'group',),
-                             pk=post_id)
+    post = get_post_or_404(post_id)
     if form.is_valid():
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
-        comment.save()
+        if form.cleaned_data['parent']:
+            parent = get_object_or_404(post.comments,
+                                       pk=form.cleaned_data['parent'])
+            # Путь ограничен по длине: слишком глубокий ответ встаёт
+            # рядом с родителем.
+            while parent.depth >= settings.COMMENT_MAX_DEPTH:
+                parent = parent.parent
+            comment.parent = parent
+        if hold_if_duplicate(COMMENT, request.user, comment.text,
+                             instance=comment, post_id=post.pk,
+                             parent_id=comment.parent_id):
+            messages.info(request, HELD_MESSAGE)
+        else:
+            comment.save()
     return redirect('posts:post_detail', post_id=post_id)
 
 
+def comment_replies(request, post_id, comment_id):
+    post = get_post_or_404(post_id)
+    comment = get_object_or_404(post.comments, pk=comment_id)
+    tag(request, *post_keys(post))
+    context = {
+        'post': post,
+        'comments': subtree(comment),
+        'thread_depth': comment.depth + settings.COMMENT_THREAD_DEPTH,
+    }
+    return render(request, 'posts/includes/comments.html', context)
+
+
 @login_required
 def follow_index(request):
-    posts = Post.objects.filter(author__following__user=request.user)
+    posts = posts_by_authors(Follow.objects.filter(
+        user=request.user).values_list('author_id', flat=True))
     page_obj = paginator(request, posts)
+    # Новые записи видны только на первой странице; подгрузка и
+    # дальние страницы отметку не сдвигают.
+    if page_obj.number == 1 and not request.GET.get('fragment'):
+        mark_seen(request.user)
+    tag(request, *page_keys(page_obj))
     context = {
         'page_obj': page_obj,
-
+        'follows_version': get_version('follows', request.user.pk),
     }
-    return render(request, 'posts/follow.html', context)
+    return render_feed(request, 'posts/follow.html', context)
 
 
+@ratelimit
 @login_required
 def profile_follow(request, username):
-    user = request.user
-    author = get_object_or_404(User, username=username)
-    follow_queryset = Follow.objects.filter(user=user, author=author)
-    if user != author and not follow_queryset.exists():
-        Follow.objects.create(user=user, author=author)
+    author = get_user_by_username_or_404(username)
+    follow(request.user, [author.pk])
     return redirect(reverse('posts:profile', args=(username,)))
 
 
+@ratelimit
 @login_required
 def profile_unfollow(request, username):
-    author = get_object_or_404(User, username=username)
-    follow_queryset = Follow.objects.filter(user=request.user, author=author)
-    if follow_queryset.exists():
-        follow_queryset.delete()
+    author = get_user_by_username_or_404(username)
+    unfollow(request.user, [author.pk])
     return redirect('posts:profile', username=author.username)
+
+
+@ratelimit
+@login_required
+@require_POST
+def follow_bulk(request):
+    """Подписка или отписка сразу от многих авторов, например при
+    импорте контактов. Имена передаются в полях authors."""
+    usernames = parse_usernames(request.POST.getlist('authors'))
+    if len(usernames) > settings.FOLLOW_BULK_LIMIT:
+        return JsonResponse(
+            {'error': f'Не больше {settings.FOLLOW_BULK_LIMIT} авторов'},
+            status=400)
+    found, unknown = resolve_authors(usernames)
+    if request.POST.get('action') == 'unfollow':
+        result = {'unfollowed': unfollow(request.user, found.values())}
+    else:
+        created = follow(request.user, found.values())
+        result = {'followed': sorted(name for name, pk in found.items()
+                                     if pk in created)}
+    result['unknown'] = unknown
+    return JsonResponse(result)
@@ -0,0 +1 @@
+default_app_config = 'profile_edit.apps.ProfileEditConfig'
@@ -1,5 +1,11 @@
 from django.contrib import admin
+
+from core.admin import PerformanceModeMixin
 from .models import ProfileEdit
 
 
-admin.site.register(ProfileEdit)
+@admin.register(ProfileEdit)
+class ProfileEditAdmin(PerformanceModeMixin, admin.ModelAdmin):
+    list_display = ('pk', 'author', 'description')
+    list_select_related = ('author',)
+    autocomplete_fields = ('author',)
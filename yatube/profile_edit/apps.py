@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class ProfileEditConfig(AppConfig):
     name = 'profile_edit'
+
+    def ready(self):
+        from . import signals  # noqa: F401
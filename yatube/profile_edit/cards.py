@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from archive.models import ArchivedPost
+from core.images import IMAGE_FIELDS
+from core.versions import get_version
+from posts.models import Follow
+from .models import ProfileEdit
+
+
+def card_key(user_id, version):
+    return f'profile-card:{user_id}:{version}'
+
+
+def build_profile_card(user):
+    profile = ProfileEdit.objects.filter(author=user).first()
+    return {
+        'user_id': user.pk,
+        'username': user.username,
+        'display_name': user.get_full_name() or user.username,
+        'avatar_url': (profile.profile_image.url
+                       if profile and profile.profile_image else ''),
+        'avatar': ({name: getattr(profile, name) for name in IMAGE_FIELDS}
+                   if profile and profile.profile_image else {}),
+        'description': profile.description if profile else '',
+        'posts_count': (user.posts.count()
+                        + ArchivedPost.objects.filter(
+                            author_id=user.pk).count()),
+        'follower_count': Follow.objects.filter(author=user).count(),
+    }
+
+
+def get_profile_card(user):
+    """Данные шапки профиля одним обращением к кэшу.
+
+    Ключ содержит версию карточки, которую сдвигают сигналы записей,
+    подписок, профиля и пользователя.
+    """
+    key = card_key(user.pk, get_version('card', user.pk))
+    card = cache.get(key)
+    if card is None:
+        card = build_profile_card(user)
+        cache.set(key, card, settings.PROFILE_CARD_TIMEOUT)
+    return card
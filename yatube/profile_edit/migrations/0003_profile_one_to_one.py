@@ -0,0 +1,33 @@
+# Generated by Django 2.2.28 on 2026-10-19 14:25
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max
+import django.db.models.deletion
+
+
+def keep_latest_profile(apps, schema_editor):
+    """Каждое сохранение формы создавало новую строку: оставляем последнюю."""
+    ProfileEdit = apps.get_model('profile_edit', 'ProfileEdit')
+    duplicates = (ProfileEdit.objects.values('author')
+                  .annotate(latest=Max('id'), total=Count('id'))
+                  .filter(total__gt=1))
+    for row in duplicates.iterator():
+        ProfileEdit.objects.filter(author=row['author']).exclude(
+            id=row['latest']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profile_edit', '0002_profileedit_description'),
+    ]
+
+    operations = [
+        migrations.RunPython(keep_latest_profile, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='profileedit',
+            name='author',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='profile', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь'),
+        ),
+    ]
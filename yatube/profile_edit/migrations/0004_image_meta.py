@@ -0,0 +1,33 @@
+# Generated by Django 2.2.28 on 2026-10-19 14:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profile_edit', '0003_profile_one_to_one'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profileedit',
+            name='image_color',
+            field=models.CharField(blank=True, editable=False, max_length=7, verbose_name='Цвет картинки'),
+        ),
+        migrations.AddField(
+            model_name='profileedit',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Высота картинки'),
+        ),
+        migrations.AddField(
+            model_name='profileedit',
+            name='image_placeholder',
+            field=models.TextField(blank=True, editable=False, verbose_name='Превью картинки'),
+        ),
+        migrations.AddField(
+            model_name='profileedit',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Ширина картинки'),
+        ),
+    ]
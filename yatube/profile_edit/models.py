@@ -5,10 +5,19 @@ User = get_user_model()
 
 
 class ProfileEdit(models.Model):
-    author = models.ForeignKey(User, on_delete=models.CASCADE,
-                               verbose_name='Пользователь')
+    author = models.OneToOneField(User, on_delete=models.CASCADE,
+                                  related_name='profile',
+                                  verbose_name='Пользователь')
     profile_image = models.ImageField('Картинка профиля',
                                       upload_to='profile_image/',
                                       blank=True)
+    image_width = models.PositiveIntegerField('Ширина картинки', blank=True,
+                                              null=True, editable=False)
+    image_height = models.PositiveIntegerField('Высота картинки', blank=True,
+                                               null=True, editable=False)
+    image_color = models.CharField('Цвет картинки', max_length=7, blank=True,
+                                   editable=False)
+    image_placeholder = models.TextField('Превью картинки', blank=True,
+                                         editable=False)
     description = models.TextField('Описание', 
                                 help_text='Расскажите немного о себе и вашем контенте')
@@ -0,0 +1,45 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core.images import update_image_meta
+from core.surrogates import purge
+from core.versions import bump_version
+from posts.follows import follows_changed
+from posts.models import Follow, Post
+from .models import ProfileEdit
+
+User = get_user_model()
+
+
+@receiver(pre_save, sender=ProfileEdit)
+def profile_image_uploaded(sender, instance, raw=False, **kwargs):
+    if not raw:
+        update_image_meta(instance, 'profile_image')
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+@receiver(post_save, sender=ProfileEdit)
+def author_card_changed(sender, instance, **kwargs):
+    if sender is Post and kwargs.get('created') is False:
+        return
+    bump_version('card', instance.author_id)
+    purge(f'author:{instance.author_id}')
+
+
+@receiver(post_save, sender=User)
+def user_card_changed(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    bump_version('card', instance.pk)
+    purge(f'author:{instance.pk}')
+
+
+@receiver(follows_changed)
+def follower_counts_changed(sender, author_ids, **kwargs):
+    for author_id in author_ids:
+        bump_version('card', author_id)
+        purge(f'author:{author_id}')
@@ -0,0 +1,54 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from posts.models import Follow
+from profile_edit.cards import get_profile_card
+from profile_edit.models import ProfileEdit
+
+User = get_user_model()
+
+
+class ProfileTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_profile_without_profile_row(self):
+        '''Профиль открывается, даже если пользователь его не заполнял'''
+        response = self.client.get(reverse('posts:profile',
+                                           args=(self.user.username,)))
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.context['card']['display_name'], 'author')
+
+    def test_edit_updates_single_row(self):
+        '''Повторное сохранение правит одну и ту же строку профиля'''
+        url = reverse('profile_edit:profile_edit',
+                      args=(self.user.username,))
+        for description in ('первое', 'второе'):
+            self.authorized_client.post(url, {'description': description})
+
+        profile = ProfileEdit.objects.get(author=self.user)
+        self.assertEqual(profile.description, 'второе')
+        self.assertEqual(get_profile_card(self.user)['description'],
+                         'второе')
+
+    def test_card_cached_and_invalidated(self):
+        '''Карточка берётся из кэша и сбрасывается при подписке'''
+        get_profile_card(self.user)
+        with self.assertNumQueries(0):
+            get_profile_card(self.user)
+
+        Follow.objects.create(user=self.reader, author=self.user)
+
+        self.assertEqual(get_profile_card(self.user)['follower_count'], 1)
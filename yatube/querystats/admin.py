@@ -0,0 +1,37 @@
+import json
+
+from django.contrib import admin
+from django.http import HttpResponse
+
+from .export import export_stats
+from .models import QueryStat
+
+
+@admin.register(QueryStat)
+class QueryStatAdmin(admin.ModelAdmin):
+    list_display = ('short_sql', 'view', 'url_name', 'calls', 'total_time',
+                    'mean_time', 'max_time', 'rows', 'last_seen')
+    list_filter = ('url_name',)
+    search_fields = ('sql', 'view', 'fingerprint')
+    readonly_fields = [field.name for field in QueryStat._meta.fields]
+    actions = ('export_json',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def short_sql(self, obj):
+        return obj.sql[:120]
+    short_sql.short_description = 'Запрос'
+
+    def mean_time(self, obj):
+        return round(obj.mean_time, 3)
+    mean_time.short_description = 'Среднее, мс'
+
+    def export_json(self, request, queryset):
+        response = HttpResponse(
+            json.dumps(export_stats(queryset), ensure_ascii=False, indent=2),
+            content_type='application/json')
+        response['Content-Disposition'] = (
+            'attachment; filename="querystats.json"')
+        return response
+    export_json.short_description = 'Выгрузить в JSON'
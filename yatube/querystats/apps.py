@@ -0,0 +1,6 @@
+from django.apps import AppConfig
+
+
+class QueryStatsConfig(AppConfig):
+    name = 'querystats'
+    verbose_name = 'Статистика запросов'
@@ -0,0 +1,182 @@
+import hashlib
+import logging
+import random
+import re
+import threading
+import time
+from contextlib import ExitStack
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import IntegrityError, connections, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import QueryStat
+
+logger = logging.getLogger(__name__)
+
+NORMALIZE = (
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'%s'), '?'),
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'), '(...)'),
+    (re.compile(r'\s+'), ' '),
+)
+
+_lock = threading.Lock()
+_stats = {}
+_sql = {}
+_local = threading.local()
+_flusher = None
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(sql):
+    """(отпечаток, нормализованный текст): литералы и параметры заменены
+    на ?, списки IN (?, ?, ...) свёрнуты, пробелы схлопнуты."""
+    normalized = sql.strip()
+    for pattern, replacement in NORMALIZE:
+        normalized = pattern.sub(replacement, normalized)
+    return hashlib.sha1(normalized.encode()).hexdigest(), normalized
+
+
+class CountingCursor:
+    """Обёртка курсора БД, считающая строки, выбранные после execute."""
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.entry = None
+
+    def _count(self, rows):
+        if self.entry is not None:
+            self.entry[3] += rows
+
+    def fetchone(self):
+        row = self.cursor.fetchone()
+        if row is not None:
+            self._count(1)
+        return row
+
+    def fetchmany(self, *args):
+        rows = self.cursor.fetchmany(*args)
+        self._count(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self.cursor.fetchall()
+        self._count(len(rows))
+        return rows
+
+    def __iter__(self):
+        for row in self.cursor:
+            self._count(1)
+            yield row
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+
+def _entry(sql):
+    digest, normalized = fingerprint(sql)
+    key = (digest, *getattr(_local, 'view', ('', '')))
+    with _lock:
+        entry = _stats.get(key)
+        if entry is None:
+            # [вызовы, суммарное время, максимум, строки]
+            entry = _stats[key] = [0, 0.0, 0.0, 0]
+            _sql[digest] = normalized
+    return entry
+
+
+def record(execute, sql, params, many, context):
+    """execute_wrapper: время и число строк запроса в буфер процесса."""
+    wrapper = context['cursor']
+    if not isinstance(wrapper.cursor, CountingCursor):
+        wrapper.cursor = CountingCursor(wrapper.cursor)
+    entry = _entry(sql)
+    wrapper.cursor.entry = None
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = (time.perf_counter() - started) * 1000
+        with _lock:
+            entry[0] += 1
+            entry[1] += elapsed
+            entry[2] = max(entry[2], elapsed)
+            if wrapper.cursor.cursor.rowcount > 0:
+                # INSERT, UPDATE и DELETE сообщают число строк сразу.
+                entry[3] += wrapper.cursor.cursor.rowcount
+        wrapper.cursor.entry = entry
+
+
+def set_view(view, url_name):
+    _local.view = (view, url_name)
+
+
+def clear_view():
+    _local.__dict__.pop('view', None)
+
+
+def collecting():
+    """Контекст, в котором запросы ко всем базам попадают в статистику."""
+    stack = ExitStack()
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(record))
+    return stack
+
+
+def sampled():
+    rate = settings.QUERYSTATS_SAMPLE_RATE
+    return rate >= 1 or (rate > 0 and random.random() < rate)
+
+
+def flush():
+    """Переносит накопленное в таблицу QueryStat и очищает буфер."""
+    global _stats
+    with _lock:
+        stats, _stats = _stats, {}
+        texts = dict(_sql)
+    now = timezone.now()
+    for (digest, view, url_name), (calls, total, peak, rows) in stats.items():
+        lookup = {'fingerprint': digest, 'view': view, 'url_name': url_name}
+        changes = {
+            'calls': F('calls') + calls,
+            'total_time': F('total_time') + total,
+            'max_time': Greatest('max_time', Value(peak)),
+            'rows': F('rows') + rows,
+            'last_seen': now,
+        }
+        if QueryStat.objects.filter(**lookup).update(**changes):
+            continue
+        try:
+            with transaction.atomic():
+                QueryStat.objects.create(
+                    sql=texts[digest], calls=calls, total_time=total,
+                    max_time=peak, rows=rows, last_seen=now, **lookup)
+        except IntegrityError:
+            QueryStat.objects.filter(**lookup).update(**changes)
+    return len(stats)
+
+
+def _flush_forever():
+    while True:
+        time.sleep(settings.QUERYSTATS_FLUSH_INTERVAL)
+        try:
+            flush()
+        except Exception:
+            logger.exception('Не удалось сохранить статистику запросов')
+        finally:
+            connections.close_all()
+
+
+def start_flusher():
+    """Фоновый поток сброса: сам сброс не попадает в запросы пользователей."""
+    global _flusher
+    if _flusher is None or not _flusher.is_alive():
+        with _lock:
+            if _flusher is None or not _flusher.is_alive():
+                _flusher = threading.Thread(target=_flush_forever,
+                                            name='querystats', daemon=True)
+                _flusher.start()
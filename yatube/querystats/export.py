@@ -0,0 +1,14 @@
+FIELDS = ('fingerprint', 'sql', 'view', 'url_name', 'calls', 'total_time',
+          'max_time', 'rows', 'first_seen', 'last_seen')
+
+
+def export_stats(queryset):
+    """Строки статистики для JSON; время в миллисекундах."""
+    rows = []
+    for row in queryset.values(*FIELDS):
+        row['mean_time'] = (row['total_time'] / row['calls']
+                            if row['calls'] else 0)
+        row['first_seen'] = row['first_seen'].isoformat()
+        row['last_seen'] = row['last_seen'].isoformat()
+        rows.append(row)
+    return rows
@@ -0,0 +1,23 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from querystats.export import export_stats
+from querystats.models import QueryStat
+
+
+class Command(BaseCommand):
+    help = 'Выгружает статистику SQL-запросов в JSON, самые тяжёлые первыми.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=None)
+        parser.add_argument('--order', default='-total_time',
+                            choices=('-total_time', '-calls', '-max_time',
+                                     '-rows'))
+
+    def handle(self, *args, **options):
+        queryset = QueryStat.objects.order_by(options['order'])
+        if options['limit']:
+            queryset = queryset[:options['limit']]
+        self.stdout.write(json.dumps(export_stats(queryset),
+                                     ensure_ascii=False, indent=2))
@@ -0,0 +1,28 @@
+from . import collector
+
+
+class QueryStatsMiddleware:
+    """Собирает статистику SQL для доли запросов QUERYSTATS_SAMPLE_RATE.
+
+    Запросы middleware до выбора view записываются с view='middleware',
+    остальные — с модулем и именем view и именем URL.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not collector.sampled():
+            return self.get_response(request)
+        collector.start_flusher()
+        collector.set_view('middleware', '')
+        try:
+            with collector.collecting():
+                return self.get_response(request)
+        finally:
+            collector.clear_view()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        name = getattr(view_func, '__qualname__', type(view_func).__name__)
+        collector.set_view(f'{view_func.__module__}.{name}',
+                           match.view_name if match else '')
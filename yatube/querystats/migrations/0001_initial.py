@@ -0,0 +1,39 @@
+# Generated by Django 2.2.28 on 2026-10-19 14:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueryStat',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(max_length=40, verbose_name='Отпечаток')),
+                ('sql', models.TextField(verbose_name='Запрос')),
+                ('view', models.CharField(blank=True, max_length=200, verbose_name='View')),
+                ('url_name', models.CharField(blank=True, max_length=200, verbose_name='Имя URL')),
+                ('calls', models.BigIntegerField(default=0, verbose_name='Вызовов')),
+                ('total_time', models.FloatField(default=0, verbose_name='Всего, мс')),
+                ('max_time', models.FloatField(default=0, verbose_name='Максимум, мс')),
+                ('rows', models.BigIntegerField(default=0, verbose_name='Строк')),
+                ('first_seen', models.DateTimeField(auto_now_add=True, verbose_name='Впервые')),
+                ('last_seen', models.DateTimeField(verbose_name='Последний раз')),
+            ],
+            options={
+                'verbose_name': 'Статистика запроса',
+                'verbose_name_plural': 'Статистика запросов',
+                'ordering': ('-total_time',),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='querystat',
+            constraint=models.UniqueConstraint(fields=('fingerprint', 'view', 'url_name'), name='unique_query_stat'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+from django.db import models
+
+
+class QueryStat(models.Model):
+    """Накопленная статистика по одному виду SQL-запроса из одного view."""
+    fingerprint = models.CharField('Отпечаток', max_length=40)
+    sql = models.TextField('Запрос')
+    view = models.CharField('View', max_length=200, blank=True)
+    url_name = models.CharField('Имя URL', max_length=200, blank=True)
+    calls = models.BigIntegerField('Вызовов', default=0)
+    total_time = models.FloatField('Всего, мс', default=0)
+    max_time = models.FloatField('Максимум, мс', default=0)
+    rows = models.BigIntegerField('Строк', default=0)
+    first_seen = models.DateTimeField('Впервые', auto_now_add=True)
+    last_seen = models.DateTimeField('Последний раз')
+
+    class Meta:
+        ordering = ('-total_time',)
+        verbose_name = 'Статистика запроса'
+        verbose_name_plural = 'Статистика запросов'
+        constraints = [models.UniqueConstraint(
+            fields=['fingerprint', 'view', 'url_name'],
+            name='unique_query_stat')]
+
+    def __str__(self):
+        return self.sql[:50]
+
+    @property
+    def mean_time(self):
+        return self.total_time / self.calls if self.calls else 0
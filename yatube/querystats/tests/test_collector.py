@@ -0,0 +1,69 @@
+import json
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from posts.models import Post
+from querystats import collector
+from querystats.models import QueryStat
+
+User = get_user_model()
+
+
+def fingerprint_of(sql):
+    return collector.fingerprint(sql)[0]
+
+
+class FingerprintTests(TestCase):
+    def test_literals_are_normalized(self):
+        '''Запросы, отличающиеся только значениями, дают один отпечаток'''
+        first = fingerprint_of(
+            "SELECT * FROM t WHERE id IN (1, 2, 3) AND name = 'a'")
+        second = fingerprint_of(
+            "SELECT *  FROM t\nWHERE id IN (%s, %s) AND name = 'it''s'")
+
+        self.assertEqual(first, second)
+        self.assertEqual(collector.fingerprint('SELECT 1')[1], 'SELECT ?')
+
+
+@override_settings(QUERYSTATS_SAMPLE_RATE=1)
+class CollectorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        for number in range(3):
+            Post.objects.create(author=cls.user, text=f'текст {number}')
+
+    def setUp(self):
+        collector.flush()
+        QueryStat.objects.all().delete()
+
+    def test_queries_attributed_to_view(self):
+        '''Запросы страницы сохраняются с view, именем URL и числом строк'''
+        self.client.get(reverse('posts:index'))
+        self.client.get(reverse('posts:index'))
+        collector.flush()
+
+        stats = QueryStat.objects.filter(url_name='posts:index')
+        posts = stats.get(sql__contains='FROM "posts_post"',
+                          sql__startswith='SELECT "posts_post"')
+
+        self.assertEqual(posts.view, 'posts.views.index')
+        self.assertEqual(posts.calls, 2)
+        self.assertEqual(posts.rows, 6)
+        self.assertGreaterEqual(posts.total_time, posts.max_time)
+
+    def test_export_command(self):
+        '''Команда выгружает статистику в JSON'''
+        self.client.get(reverse('posts:index'))
+        collector.flush()
+        output = StringIO()
+
+        call_command('export_querystats', '--limit', '1', stdout=output)
+        rows = json.loads(output.getvalue())
+
+        self.assertEqual(len(rows), 1)
+        self.assertIn('mean_time', rows[0])
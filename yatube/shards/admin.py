@@ -0,0 +1,93 @@
+from django.contrib import admin
+from django.core.exceptions import ValidationError
+
+from .models import ShardAssignment
+from .utils import is_sharded, shard_aliases
+
+
+@admin.register(ShardAssignment)
+class ShardAssignmentAdmin(admin.ModelAdmin):
+    """Только просмотр: переносить авторов нужно командой rebalance_shards,
+    иначе записи останутся в старой базе."""
+    list_display = ('author', 'shard', 'moving_to')
+    list_filter = ('shard',)
+    readonly_fields = ('author', 'shard', 'moving_to')
+
+    def has_add_permission(self, request):
+        return False
+
+
+def _selected_shard(request):
+    alias = request.GET.get(ShardListFilter.parameter_name)
+    return alias if alias in shard_aliases() else shard_aliases()[0]
+
+
+class ShardListFilter(admin.SimpleListFilter):
+    """Выбор шарда в списке; без шардирования фильтр не показывается.
+
+    Варианта «Все» нет: список читается из одного шарда за раз, саму
+    выборку переключает ShardedAdminMixin.get_queryset.
+    """
+    title = 'Шард'
+    parameter_name = 'shard'
+
+    def lookups(self, request, model_admin):
+        if not is_sharded():
+            return ()
+        return [(alias, alias) for alias in shard_aliases()]
+
+    def choices(self, changelist):
+        selected = self.value() or shard_aliases()[0]
+        for alias, title in self.lookup_choices:
+            yield {
+                'selected': alias == selected,
+                'query_string': changelist.get_query_string(
+                    {self.parameter_name: alias}),
+                'display': title,
+            }
+
+    def queryset(self, request, queryset):
+        return queryset
+
+
+class ShardedAdminMixin:
+    """Админка записей и комментариев, разложенных по шардам.
+
+    Список строится по шарду из фильтра ShardListFilter; пользователи и
+    группы лежат только в основной базе, поэтому в остальных шардах они
+    подгружаются prefetch_related вместо JOIN. Страница объекта ищет его
+    во всех шардах.
+    """
+
+    def get_list_filter(self, request):
+        return (ShardListFilter, *super().get_list_filter(request))
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        alias = _selected_shard(request)
+        if alias == 'default':
+            return queryset
+        return queryset.using(alias).prefetch_related(
+            *self.list_select_related)
+
+    def get_list_select_related(self, request):
+        if _selected_shard(request) != 'default':
+            return ()
+        return super().get_list_select_related(request)
+
+    def get_object(self, request, object_id, from_field=None):
+        if not is_sharded():
+            return super().get_object(request, object_id, from_field)
+        queryset = self.get_queryset(request)
+        opts = self.model._meta
+        field = (opts.pk if from_field is None
+                 else opts.get_field(from_field))
+        try:
+            value = field.to_python(object_id)
+        except ValidationError:
+            return None
+        for alias in shard_aliases():
+            obj = queryset.using(alias).filter(**{field.name: value}).first()
+            if obj is not None:
+                return obj
+        return None
@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class ShardsConfig(AppConfig):
+    name = 'shards'
+
+    def ready(self):
+        from . import signals  # noqa: F401
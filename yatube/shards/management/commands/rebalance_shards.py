@@ -0,0 +1,44 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from shards.utils import (is_sharded, move_authors, plan_moves,
+                          shard_aliases, shard_for_author, shard_loads)
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = ('Переносит авторов между шардами, не останавливая сайт: '
+            'указанных через --author или по плану выравнивания нагрузки.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--author', action='append', default=[],
+                            help='Имя автора; можно повторять.')
+        parser.add_argument('--to', help='Шард назначения для --author.')
+        parser.add_argument('--dry-run', action='store_true')
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        if not is_sharded():
+            raise CommandError('В POST_SHARDS указан один шард.')
+        if options['author']:
+            if options['to'] not in shard_aliases():
+                raise CommandError('Укажите --to из POST_SHARDS.')
+            authors = dict(User.objects.filter(
+                username__in=options['author']).values_list('username', 'id'))
+            missing = set(options['author']) - set(authors)
+            if missing:
+                raise CommandError(f'Нет авторов: {", ".join(missing)}')
+            moves = [(author_id, shard_for_author(author_id), options['to'])
+                     for author_id in authors.values()]
+        else:
+            moves = plan_moves(shard_loads())
+
+        for author_id, source, target in moves:
+            self.stdout.write(f'Автор {author_id}: {source} -> {target}')
+        if not options['dry_run']:
+            move_authors([(author_id, target)
+                          for author_id, source, target in moves],
+                         options['batch_size'], stdout=self.stdout)
+            self.stdout.write(
+                self.style.SUCCESS(f'Перенесено авторов: {len(moves)}'))
@@ -0,0 +1,36 @@
+# Generated by Django 2.2.28 on 2026-10-19 14:34
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdSequence',
+            fields=[
+                ('name', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('next_id', models.BigIntegerField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ShardAssignment',
+            fields=[
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('shard', models.CharField(max_length=64, verbose_name='Шард')),
+                ('moving_to', models.CharField(blank=True, max_length=64, verbose_name='Переносится в')),
+            ],
+            options={
+                'verbose_name': 'Размещение автора',
+                'verbose_name_plural': 'Карта шардов',
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+
+User = get_user_model()
+
+
+class ShardAssignment(models.Model):
+    """Карта шардов: в какой базе лежат записи автора и комментарии к ним."""
+    author = models.OneToOneField(User, on_delete=models.CASCADE,
+                                  primary_key=True, related_name='+',
+                                  verbose_name='Автор')
+    shard = models.CharField('Шард', max_length=64)
+    moving_to = models.CharField('Переносится в', max_length=64, blank=True)
+
+    class Meta:
+        verbose_name = 'Размещение автора'
+        verbose_name_plural = 'Карта шардов'
+
+    def __str__(self):
+        return f'{self.author_id} -> {self.shard}'
+
+
+class IdSequence(models.Model):
+    """Общий для всех шардов счётчик первичных ключей модели."""
+    name = models.CharField(max_length=100, primary_key=True)
+    next_id = models.BigIntegerField()
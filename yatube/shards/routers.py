@@ -0,0 +1,52 @@
+from django.contrib.auth import get_user_model
+
+from .utils import is_sharded, shard_for_author
+
+SHARDED = ('posts.post', 'posts.comment')
+
+
+def _author_id(model, instance):
+    label = instance._meta.label_lower
+    if label == 'posts.post':
+        return instance.author_id
+    if label == 'posts.comment':
+        return instance.post.author_id
+    if (isinstance(instance, get_user_model())
+            and model._meta.label_lower == 'posts.post'):
+        return instance.pk
+    return None
+
+
+class ShardRouter:
+    """Раскладывает записи и комментарии по шардам POST_SHARDS по автору.
+
+    Комментарии лежат в шарде записи. Запросы без подсказки-экземпляра
+    уходят в основную базу, поэтому общие ленты собираются функциями из
+    shards.utils, а не менеджером модели.
+    """
+    def db_for_read(self, model, create=False, **hints):
+        instance = hints.get('instance')
+        if instance is None or not is_sharded():
+            return None
+        if model._meta.label_lower in SHARDED:
+            if (instance._meta.label_lower in SHARDED
+                    and not instance._state.adding):
+                return instance._state.db
+            author_id = _author_id(model, instance)
+            if author_id is None:
+                return None
+            return shard_for_author(author_id, create)
+        if instance._meta.label_lower in SHARDED:
+            # Пользователи, группы и прочее живут только в основной базе.
+            return 'default'
+        return None
+
+    def db_for_write(self, model, **hints):
+        # Только запись закрепляет автора за шардом в карте.
+        return self.db_for_read(model, create=True, **hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        labels = {obj1._meta.label_lower, obj2._meta.label_lower}
+        if labels.intersection(SHARDED):
+            return True
+        return None
@@ -0,0 +1,37 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core.bulk import raw_delete
+from posts.models import Comment, Post
+from .utils import assign_ids, mirror, moving_target
+
+
+def _author_id(instance):
+    if isinstance(instance, Comment):
+        return instance.post.author_id
+    return instance.author_id
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_save, sender=Comment)
+def assign_global_id(sender, instance, **kwargs):
+    assign_ids([instance])
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+def mirror_save(sender, instance, using, raw=False, **kwargs):
+    target = moving_target(_author_id(instance))
+    if target and target != using and not raw:
+        mirror(instance, target)
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Comment)
+def mirror_delete(sender, instance, using, **kwargs):
+    target = moving_target(_author_id(instance))
+    if target and target != using:
+        if sender is Post:
+            raw_delete(Comment.objects.using(target).filter(
+                post_id=instance.pk))
+        raw_delete(sender.objects.using(target).filter(pk=instance.pk))
@@ -0,0 +1,258 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from archive.models import ArchivedPost
+from archive.utils import archive_posts, restore_posts
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from notifications.digests import send_digests
+from notifications.models import COMMENT, Notification
+from posts.models import Comment, Follow, Group, Post
+from shards.models import ShardAssignment
+from shards.routers import ShardRouter
+from shards.utils import (MergedPosts, allocate_ids, all_posts, move_authors,
+                          placement, plan_moves, posts_by_authors,
+                          set_placement, shard_for_author)
+from tags.models import PostTag
+from users.export import records
+
+User = get_user_model()
+
+
+class MergedPostsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.first = User.objects.create_user(username='first')
+        cls.second = User.objects.create_user(username='second')
+        now = timezone.now()
+        for number in range(7):
+            post = Post.objects.create(
+                author=cls.first if number % 3 else cls.second,
+                text=f'текст {number}')
+            Post.objects.filter(pk=post.pk).update(
+                pub_date=now - timedelta(minutes=number))
+
+    def test_merge_keeps_order(self):
+        '''Слияние двух выборок совпадает с единой сортировкой'''
+        expected = list(all_posts()[0:7])
+        merged = MergedPosts(Post.objects.filter(author=author)
+                             .order_by('-pub_date', '-pk')
+                             for author in (self.first, self.second))
+
+        self.assertEqual(len(merged), 7)
+        self.assertEqual(merged[0:7], expected)
+        self.assertEqual(merged[2:5], expected[2:5])
+        self.assertEqual(merged[6], expected[6])
+
+    def test_global_ids(self):
+        '''Общий счётчик выдаёт id больше существующих и не повторяется'''
+        top = Post.objects.order_by('-pk').first().pk
+        first = allocate_ids(Post, 3)
+        second = allocate_ids(Post, 2)
+
+        self.assertEqual(first.start, top + 1)
+        self.assertEqual(list(second), [top + 4, top + 5])
+
+
+@override_settings(POST_SHARDS=['default', 'shard'])
+class ShardRouterTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+
+    def setUp(self):
+        cache.clear()
+        self.router = ShardRouter()
+
+    def test_rows_follow_author(self):
+        '''Запись и комментарий к ней направляются в шард автора'''
+        shard = shard_for_author(self.author.pk)
+        post = Post(author=self.author, text='текст')
+        comment = Comment(post=post, author=User(pk=10**6), text='текст')
+
+        self.assertEqual(self.router.db_for_write(Post, instance=post),
+                         shard)
+        self.assertEqual(self.router.db_for_write(Comment, instance=comment),
+                         shard)
+        self.assertEqual(self.router.db_for_read(Post, instance=self.author),
+                         shard)
+
+    def test_users_stay_in_default(self):
+        '''Связанные с записью пользователи читаются из основной базы'''
+        post = Post(author=self.author, text='текст')
+        post._state.adding = False
+        post._state.db = 'shard'
+
+        self.assertEqual(self.router.db_for_read(User, instance=post),
+                         'default')
+        self.assertEqual(self.router.db_for_read(Comment, instance=post),
+                         'shard')
+
+
+@override_settings(POST_SHARDS=['default', 'shard'])
+class MoveAuthorsTests(TestCase):
+    databases = {'default', 'shard'}
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.authors = [User.objects.create_user(username=f'author{number}')
+                       for number in range(2)]
+
+    def setUp(self):
+        cache.clear()
+        for author in self.authors:
+            set_placement(author.pk, 'default')
+            post = Post.objects.create(author=author, text='текст')
+            Comment.objects.create(post=post, author=author, text='да')
+
+    def test_authors_moved_together(self):
+        '''Перенос нескольких авторов ждёт обновления карты дважды'''
+        with mock.patch('shards.utils.time.sleep') as sleep:
+            moved = move_authors([(author.pk, 'shard')
+                                  for author in self.authors],
+                                 stdout=StringIO())
+
+        self.assertEqual(moved, 2)
+        self.assertEqual(sleep.call_count, 2)
+        self.assertFalse(Post.objects.using('default').exists())
+        self.assertFalse(Comment.objects.using('default').exists())
+        self.assertEqual(Post.objects.using('shard').count(), 2)
+        self.assertEqual(Comment.objects.using('shard').count(), 2)
+        self.assertEqual(
+            len(posts_by_authors([author.pk for author in self.authors])),
+            2)
+
+    def test_read_does_not_assign(self):
+        '''Чтение не создаёт строку в карте шардов, запись создаёт'''
+        reader = User.objects.create_user(username='reader')
+
+        self.assertEqual(placement(reader.pk),
+                         (['default', 'shard'][reader.pk % 2], None))
+        self.assertFalse(
+            ShardAssignment.objects.filter(author_id=reader.pk).exists())
+        post = Post.objects.create(author=reader, text='текст')
+        self.assertEqual(post._state.db, shard_for_author(reader.pk))
+        self.assertTrue(
+            ShardAssignment.objects.filter(author_id=reader.pk).exists())
+
+
+@override_settings(POST_SHARDS=['default', 'shard'])
+class ShardedReadsTests(TestCase):
+    databases = {'default', 'shard'}
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader',
+                                              email='reader@yatube.ru')
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@yatube.ru', password='pass')
+        cls.group = Group.objects.create(title='Группа', slug='group',
+                                         description='Описание')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        set_placement(self.author.pk, 'shard')
+        self.post = Post.objects.create(
+            author=self.author, group=self.group, title='Из шарда',
+            text='Запись из шарда #шард')
+        self.comment = Comment.objects.create(
+            post=self.post, author=self.reader, text='Комментарий')
+
+    def test_post_stored_in_shard(self):
+        '''Запись автора лежит в его шарде, теги — в основной базе'''
+        self.assertEqual(self.post._state.db, 'shard')
+        self.assertFalse(Post.objects.using('default').exists())
+        self.assertTrue(PostTag.objects.filter(post_id=self.post.pk).exists())
+
+    def test_tag_feed(self):
+        '''Лента тега показывает записи из шардов'''
+        response = self.client.get(reverse('tags:hashtag', args=['шард']))
+
+        self.assertEqual(response.context['posts'], [self.post])
+
+    def test_inbox(self):
+        '''Уведомление показывает запись из шарда'''
+        Notification.objects.create(
+            recipient=self.author, verb=COMMENT, post_id=self.post.pk,
+            last_actor=self.reader, updated=timezone.now())
+        self.client.force_login(self.author)
+
+        response = self.client.get(reverse('notifications:inbox'))
+
+        self.assertContains(response, 'Запись из шарда')
+
+    def test_digest(self):
+        '''Дайджест собирает записи авторов из их шардов'''
+        self.assertEqual(send_digests('daily'), 1)
+        self.assertIn('Из шарда', mail.outbox[0].body)
+
+    def test_export(self):
+        '''Выгрузка берёт записи и комментарии из шардов'''
+        data = b''.join(records(self.author)) + b''.join(
+            records(self.reader))
+
+        self.assertIn('"group__slug": "group"'.encode(), data)
+        self.assertIn('Комментарий'.encode(), data)
+
+    def test_backfill_tags(self):
+        '''Индекс тегов строится по записям всех шардов'''
+        PostTag.objects.all().delete()
+
+        call_command('backfill_tags', stdout=StringIO())
+
+        self.assertTrue(PostTag.objects.filter(post_id=self.post.pk).exists())
+
+    def test_archive_and_restore(self):
+        '''Архивация читает шарды и чистит теги, возврат идёт в шард'''
+        archived = archive_posts(timezone.now() + timedelta(days=1))
+
+        self.assertEqual(archived, 1)
+        self.assertFalse(Post.objects.using('shard').exists())
+        self.assertFalse(Comment.objects.using('shard').exists())
+        self.assertFalse(PostTag.objects.exists())
+
+        restore_posts(ArchivedPost.objects.all())
+
+        self.assertTrue(Post.objects.using('shard').filter(
+            pk=self.post.pk).exists())
+        self.assertEqual(Comment.objects.using('shard').count(), 1)
+        self.assertFalse(Post.objects.using('default').exists())
+        self.assertTrue(PostTag.objects.filter(post_id=self.post.pk).exists())
+
+    def test_admin(self):
+        '''Админка показывает записи выбранного шарда и открывает их'''
+        self.client.force_login(self.admin)
+        changelist = reverse('admin:posts_post_changelist')
+
+        self.assertEqual(
+            len(self.client.get(changelist).context['cl'].result_list), 0)
+        response = self.client.get(changelist, {'shard': 'shard'})
+        self.assertEqual(list(response.context['cl'].result_list),
+                         [self.post])
+        response = self.client.get(reverse('admin:posts_post_change',
+                                           args=[self.post.pk]))
+        self.assertEqual(response.status_code, 200)
+
+
+class PlanMovesTests(SimpleTestCase):
+    def test_plan_evens_out_shards(self):
+        '''План переносит авторов, пока это уменьшает перекос'''
+        loads = {'a': {1: 50, 2: 30, 3: 10, 4: 5}, 'b': {5: 5}}
+
+        moves = plan_moves(loads)
+
+        self.assertEqual(moves, [(2, 'a', 'b'), (3, 'a', 'b'),
+                                 (4, 'a', 'b')])
+        self.assertEqual(loads['b'], {5: 5})
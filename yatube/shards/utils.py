@@ -0,0 +1,328 @@
+import heapq
+import time
+from itertools import islice
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Max
+from django.http import Http404
+from django.utils.functional import cached_property
+
+from core.bulk import raw_delete
+from posts.models import Comment, Post
+from .models import IdSequence, ShardAssignment
+
+
+def shard_aliases():
+    return settings.POST_SHARDS
+
+
+def is_sharded():
+    return len(settings.POST_SHARDS) > 1
+
+
+def _map_key(author_id):
+    return f'shard:{author_id}'
+
+
+def placement(author_id, create=False):
+    """(шард, шард переноса) автора; новый автор размещается по модулю.
+
+    Чтение карту не меняет: автор без строки в карте получает шард по
+    модулю, а строка появляется только при записи (create=True), чтобы
+    GET-запросы не писали в основную базу. Такое размещение кэшируется
+    с None вместо шарда переноса.
+    """
+    key = _map_key(author_id)
+    cached = cache.get(key)
+    if cached is not None and (cached[1] is not None or not create):
+        return cached
+    aliases = shard_aliases()
+    default = aliases[author_id % len(aliases)]
+    if create:
+        assignment, _ = ShardAssignment.objects.get_or_create(
+            author_id=author_id, defaults={'shard': default})
+        cached = (assignment.shard, assignment.moving_to)
+    else:
+        cached = ShardAssignment.objects.filter(author_id=author_id) \
+            .values_list('shard', 'moving_to').first() or (default, None)
+    cache.set(key, cached, settings.SHARD_MAP_TIMEOUT)
+    return cached
+
+
+def shard_for_author(author_id, create=False):
+    if not is_sharded():
+        return shard_aliases()[0]
+    return placement(author_id, create)[0]
+
+
+def moving_target(author_id):
+    if not is_sharded():
+        return None
+    return placement(author_id)[1] or None
+
+
+def set_placement(author_id, shard, moving_to=''):
+    ShardAssignment.objects.update_or_create(
+        author_id=author_id,
+        defaults={'shard': shard, 'moving_to': moving_to},
+    )
+    cache.set(_map_key(author_id), (shard, moving_to),
+              settings.SHARD_MAP_TIMEOUT)
+
+
+def allocate_ids(model, count):
+    """Выдаёт count первичных ключей, уникальных во всех шардах.
+
+    Счётчик живёт в основной базе и при первом обращении начинается
+    с максимального id среди шардов, поэтому включить шардирование можно
+    на заполненной базе.
+    """
+    name = model._meta.label_lower
+    with transaction.atomic(using='default'):
+        updated = IdSequence.objects.filter(name=name).update(
+            next_id=F('next_id') + count)
+        if not updated:
+            start = max(model.objects.using(alias).aggregate(
+                top=Max('pk'))['top'] or 0 for alias in shard_aliases())
+            IdSequence.objects.create(name=name, next_id=start + 1 + count)
+        last = IdSequence.objects.get(name=name).next_id
+    return range(last - count, last)
+
+
+def assign_ids(objs):
+    """Проставляет общие id новым объектам одной модели перед вставкой."""
+    if not is_sharded():
+        return
+    new = [obj for obj in objs if obj.pk is None]
+    if new:
+        for obj, pk in zip(new, allocate_ids(type(new[0]), len(new))):
+            obj.pk = pk
+
+
+def _feed(alias):
+    posts = Post.objects.using(alias).order_by('-pub_date', '-pk')
+    if alias == 'default':
+        return posts.select_related('author', 'group')
+    # Пользователи и группы лежат только в основной базе.
+    return posts.prefetch_related('author', 'group')
+
+
+class MergedPosts:
+    """Последовательность для Paginator поверх выборок из нескольких шардов.
+
+    Каждый шард отдаёт записи по убыванию (pub_date, id); срез берёт из
+    шардов не больше stop записей и сливает их k-путевым слиянием.
+    """
+    ordered = True
+
+    def __init__(self, querysets):
+        self.querysets = list(querysets)
+
+    @cached_property
+    def total(self):
+        return sum(queryset.count() for queryset in self.querysets)
+
+    def count(self):
+        return self.total
+
+    def __len__(self):
+        return self.total
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        if len(self.querysets) == 1:
+            return list(self.querysets[0][index])
+        start = index.start or 0
+        stop = self.total if index.stop is None else index.stop
+        merged = heapq.merge(
+            *(queryset[:stop] for queryset in self.querysets),
+            key=lambda post: (post.pub_date, post.pk), reverse=True)
+        return list(islice(merged, start, stop))
+
+
+def all_posts(**filters):
+    """Записи всех авторов: сбор со всех шардов со слиянием."""
+    return MergedPosts(_feed(alias).filter(**filters)
+                       for alias in shard_aliases())
+
+
+def author_posts(author_id):
+    return _feed(shard_for_author(author_id)).filter(author_id=author_id)
+
+
+def posts_by_authors(author_ids):
+    """Записи выбранных авторов; запрос уходит только в их шарды.
+
+    Без шардирования author_ids может быть подзапросом и не вычисляется.
+    """
+    if not is_sharded():
+        return all_posts(author_id__in=author_ids)
+    by_shard = {}
+    for author_id in author_ids:
+        by_shard.setdefault(shard_for_author(author_id), []).append(
+            author_id)
+    return MergedPosts(_feed(alias).filter(author_id__in=ids)
+                       for alias, ids in by_shard.items())
+
+
+def posts_by_ids(ids):
+    """{id: запись} для записей из любых шардов; по запросу на шард."""
+    ids = set(ids) - {None}
+    found = {}
+    for alias in shard_aliases():
+        if not ids - set(found):
+            break
+        found.update((post.pk, post) for post in
+                     _feed(alias).filter(pk__in=ids - set(found)))
+    return found
+
+
+def delete_posts(alias, ids):
+    """Удаляет записи шарда alias вместе с комментариями и строками
+    основной базы, которые на них ссылаются: каскад Django видит только
+    базу самого удаления."""
+    Post.objects.using(alias).filter(pk__in=ids).delete()
+    if alias == 'default':
+        return
+    for relation in Post._meta.related_objects:
+        if relation.related_model is not Comment:
+            relation.related_model._base_manager.using('default').filter(
+                **{f'{relation.field.name}__in': ids}).delete()
+
+
+def get_post(pk):
+    """Запись по id из любого шарда или None."""
+    for alias in shard_aliases():
+        post = _feed(alias).filter(pk=pk).first()
+        if post is not None:
+            return post
+    return None
+
+
+def get_post_or_404(pk):
+    post = get_post(pk)
+    if post is None:
+        raise Http404('Запись не найдена')
+    return post
+
+
+def shard_loads():
+    """Число записей каждого автора по шардам: {шард: {автор: записей}}."""
+    return {
+        alias: dict(Post.objects.using(alias).order_by()
+                    .values_list('author_id').annotate(Count('pk')))
+        for alias in shard_aliases()
+    }
+
+
+def plan_moves(loads):
+    """Жадный план переноса авторов с самого нагруженного шарда на самый
+    свободный, пока перенос уменьшает разрыв между ними."""
+    loads = {alias: dict(authors) for alias, authors in loads.items()}
+    moves = []
+    while len(loads) > 1:
+        totals = {alias: sum(authors.values())
+                  for alias, authors in loads.items()}
+        heavy = max(totals, key=totals.get)
+        light = min(totals, key=totals.get)
+        gap = totals[heavy] - totals[light]
+        fitting = [(count, author_id)
+                   for author_id, count in loads[heavy].items()
+                   if count * 2 <= gap]
+        if not fitting:
+            return moves
+        count, author_id = max(fitting)
+        loads[light][author_id] = loads[heavy].pop(author_id)
+        moves.append((author_id, heavy, light))
+    return moves
+
+
+def _copy(queryset, target):
+    """Копирует строки в шард target; уже скопированные не трогает."""
+    model = queryset.model
+    fields = [field.attname for field in model._meta.concrete_fields]
+    model.objects.using(target).bulk_create(
+        [model(**row) for row in queryset.values(*fields)],
+        ignore_conflicts=True,
+    )
+
+
+def mirror(instance, target):
+    """Повторяет изменение строки в шарде переноса."""
+    model = type(instance)
+    fields = [field.attname for field in model._meta.concrete_fields]
+    row = {name: getattr(instance, name) for name in fields}
+    updated = model.objects.using(target).filter(pk=instance.pk).update(
+        **row)
+    if not updated:
+        model.objects.using(target).bulk_create([model(**row)],
+                                                ignore_conflicts=True)
+
+
+def _copy_author(author_id, source, target, batch_size, stdout):
+    posts = Post.objects.using(source).filter(author_id=author_id)
+    moved = 0
+    last_pk = 0
+    while True:
+        ids = list(posts.filter(pk__gt=last_pk).order_by('pk')
+                   .values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return moved
+        with transaction.atomic(using=target):
+            _copy(Post.objects.using(source).filter(pk__in=ids), target)
+            _copy(Comment.objects.using(source).filter(post_id__in=ids),
+                  target)
+        moved += len(ids)
+        last_pk = ids[-1]
+        if stdout is not None:
+            stdout.write(f'Автор {author_id}: скопировано записей {moved}')
+
+
+def _delete_author(author_id, source):
+    posts = Post.objects.using(source).filter(author_id=author_id)
+    with transaction.atomic(using=source):
+        # Сырое удаление: каскад в основной базе снёс бы метки и
+        # уведомления, которые по-прежнему ссылаются на эти id.
+        comments = Comment.objects.using(source).filter(
+            post_id__in=posts.values('pk'))
+        raw_delete(comments)
+        raw_delete(posts)
+
+
+def move_authors(moves, batch_size=None, stdout=None):
+    """Переносит записи авторов и комментарии к ним в новые шарды на ходу.
+
+    moves — пары (автор, шард назначения). Пока идёт перенос, чтение и
+    запись остаются в старом шарде, а сигналы повторяют каждое изменение
+    в новом. После копирования карта переключается, и старые строки
+    удаляются. Паузы длиной SHARD_MAP_TIMEOUT дают процессам со старой
+    картой в кэше её обновить; их две на весь перенос, а не на автора.
+    Возвращает число перенесённых записей.
+    """
+    batch_size = batch_size or settings.SHARD_COPY_BATCH_SIZE
+    moves = [(author_id, shard_for_author(author_id, create=True), target)
+             for author_id, target in moves]
+    moves = [move for move in moves if move[1] != move[2]]
+    if not moves:
+        return 0
+    for author_id, source, target in moves:
+        set_placement(author_id, source, moving_to=target)
+    time.sleep(settings.SHARD_MAP_TIMEOUT)
+
+    moved = sum(_copy_author(author_id, source, target, batch_size, stdout)
+                for author_id, source, target in moves)
+
+    for author_id, source, target in moves:
+        set_placement(author_id, target)
+    time.sleep(settings.SHARD_MAP_TIMEOUT)
+    for author_id, source, target in moves:
+        _delete_author(author_id, source)
+    return moved
+
+
+def move_author(author_id, target, batch_size=None, stdout=None):
+    """Переносит одного автора (см. move_authors)."""
+    return move_authors([(author_id, target)], batch_size, stdout)
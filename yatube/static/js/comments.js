@@ -0,0 +1,18 @@
+// Раскрывает свёрнутые глубокие ветки комментариев: сервер отдаёт только
+// фрагмент с ответами, он вставляется на место ссылки.
+(function () {
+  document.addEventListener('click', function (event) {
+    var link = event.target.closest('a.comment-expand');
+    if (!link) {
+      return;
+    }
+    event.preventDefault();
+    fetch(link.href, {credentials: 'same-origin'})
+      .then(function (response) { return response.text(); })
+      .then(function (html) {
+        var comment = link.closest('.media');
+        comment.insertAdjacentHTML('afterend', html);
+        link.remove();
+      });
+  });
+})();
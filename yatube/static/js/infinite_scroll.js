@@ -0,0 +1,55 @@
+// Подгружает следующие записи ленты по мере прокрутки.
+// Сервер отдаёт только фрагмент с записями (?fragment=1), а не всю страницу.
+(function () {
+  var sentinel = document.getElementById('feed-sentinel');
+  if (!sentinel || !('IntersectionObserver' in window)) {
+    return;
+  }
+  var pagination = document.querySelector('nav[aria-label="Page navigation"]');
+  if (pagination) {
+    pagination.hidden = true;
+  }
+  var loading = false;
+
+  function load() {
+    var next = sentinel.dataset.nextPage;
+    if (!next || loading) {
+      return;
+    }
+    loading = true;
+    var params = new URLSearchParams(window.location.search);
+    params.set('page', next);
+    params.set('fragment', '1');
+    fetch(window.location.pathname + '?' + params.toString(), {
+      credentials: 'same-origin',
+    })
+      .then(function (response) { return response.text(); })
+      .then(function (html) {
+        var holder = document.createElement('div');
+        holder.innerHTML = html;
+        var batch = holder.querySelector('.post-batch');
+        sentinel.parentNode.insertBefore(document.createElement('hr'), sentinel);
+        sentinel.parentNode.insertBefore(batch, sentinel);
+        if (batch.dataset.nextPage) {
+          sentinel.dataset.nextPage = batch.dataset.nextPage;
+        } else {
+          delete sentinel.dataset.nextPage;
+          observer.disconnect();
+        }
+        loading = false;
+      })
+      .catch(function () {
+        loading = false;
+        if (pagination) {
+          pagination.hidden = false;
+        }
+      });
+  }
+
+  var observer = new IntersectionObserver(function (entries) {
+    if (entries[0].isIntersecting) {
+      load();
+    }
+  }, {rootMargin: '600px'});
+  observer.observe(sentinel);
+})();
@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.models import Post
+from shards.utils import shard_aliases
+from tags.utils import sync_posts
+
+
+class Command(BaseCommand):
+    help = 'Строит индекс хэштегов и упоминаний по существующим записям.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int,
+                            default=settings.TAG_BACKFILL_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        added = removed = 0
+        for alias in shard_aliases():
+            last_pk = 0
+            while True:
+                chunk = list(Post.objects.using(alias)
+                             .filter(pk__gt=last_pk).order_by('pk')
+                             .only('pk', 'text', 'pub_date')[:chunk_size])
+                if not chunk:
+                    break
+                chunk_added, chunk_removed = sync_posts(chunk)
+                added += chunk_added
+                removed += chunk_removed
+                last_pk = chunk[-1].pk
+                self.stdout.write(f'{alias}: записи до id={last_pk}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Связей добавлено: {added}, удалено: {removed}'))
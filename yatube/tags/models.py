@@ -0,0 +1,38 @@
+from django.db import models
+
+from posts.models import Post
+
+HASHTAG = '#'
+MENTION = '@'
+KINDS = (
+    (HASHTAG, 'Хэштег'),
+    (MENTION, 'Упоминание'),
+)
+
+
+class Tag(models.Model):
+    kind = models.CharField('Вид', max_length=1, choices=KINDS)
+    name = models.CharField('Имя', max_length=150)
+
+    class Meta:
+        verbose_name = 'Тег'
+        verbose_name_plural = 'Теги'
+        constraints = [models.UniqueConstraint(fields=['kind', 'name'],
+                                               name='unique_tag')]
+
+    def __str__(self):
+        return f'{self.kind}{self.name}'
+
+
+class PostTag(models.Model):
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE,
+                            related_name='post_tags')
+    post = models.ForeignKey(Post, on_delete=models.CASCADE,
+                             db_constraint=False, related_name='post_tags')
+    pub_date = models.DateTimeField('Дата публикации записи')
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['tag', 'post'],
+                                               name='unique_post_tag')]
+        indexes = [models.Index(fields=['tag', '-pub_date', '-post'],
+                                name='post_tag_feed_idx')]
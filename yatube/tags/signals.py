@@ -0,0 +1,11 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from posts.models import Post
+from .utils import sync_posts
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        sync_posts([instance])
@@ -0,0 +1,13 @@
+from django import template
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from posts.rendering import link_tags
+
+register = template.Library()
+
+
+@register.filter
+def linkify_tags(text):
+    """Экранирует текст и превращает #теги и @упоминания в ссылки."""
+    return mark_safe(link_tags(escape(text)))
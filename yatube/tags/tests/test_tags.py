@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from posts.models import Post
+from tags.models import HASHTAG, MENTION, PostTag, Tag
+from tags.utils import sync_posts
+
+User = get_user_model()
+
+
+class TagTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.friend = User.objects.create_user(username='friend')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_tags_extracted_on_save(self):
+        '''Хэштеги и упоминания попадают в индекс при сохранении'''
+        post = Post.objects.create(
+            author=self.user, text='Привет, @friend и @ghost! #Django #django')
+
+        self.assertEqual(
+            set(post.post_tags.values_list('tag__kind', 'tag__name')),
+            {(HASHTAG, 'django'), (MENTION, 'friend')})
+
+    def test_edit_updates_index_incrementally(self):
+        '''Правка записи меняет только разницу в тегах'''
+        post = Post.objects.create(author=self.user, text='#один #два')
+        kept = PostTag.objects.get(post=post, tag__name='один')
+
+        post.text = '#один #три'
+        post.save()
+
+        self.assertEqual(
+            set(post.post_tags.values_list('tag__name', flat=True)),
+            {'один', 'три'})
+        self.assertTrue(PostTag.objects.filter(pk=kept.pk).exists())
+
+    def test_removed_pairs_deleted_at_once(self):
+        '''Снятые с нескольких записей теги удаляются одним DELETE'''
+        posts = [Post.objects.create(author=self.user, text='#один #два'),
+                 Post.objects.create(author=self.user, text='#два #три')]
+        posts[0].text = '#один'
+        posts[1].text = '#три #один'
+
+        with CaptureQueriesContext(connection) as queries:
+            added, removed = sync_posts(posts)
+
+        deletes = [query['sql'] for query in queries.captured_queries
+                   if query['sql'].startswith('DELETE')]
+        self.assertEqual((added, removed), (1, 2))
+        self.assertEqual(len(deletes), 1)
+        self.assertEqual(
+            set(PostTag.objects.filter(post__in=posts)
+                .values_list('post_id', 'tag__name')),
+            {(posts[0].pk, 'один'), (posts[1].pk, 'три'),
+             (posts[1].pk, 'один')})
+
+    def test_tag_feed_keyset_pagination(self):
+        '''Лента тега листается курсором'''
+        for number in range(settings.POSTS_PER_PAGE + 2):
+            Post.objects.create(author=self.user, text=f'#лента {number}')
+        url = reverse('tags:hashtag', args=('лента',))
+
+        first = self.client.get(url)
+        second = self.client.get(url, {'before': first.context['next_cursor']})
+
+        self.assertEqual(first.context['tag_count'],
+                         settings.POSTS_PER_PAGE + 2)
+        self.assertEqual(len(first.context['posts']), settings.POSTS_PER_PAGE)
+        self.assertEqual(len(second.context['posts']), 2)
+        self.assertIsNone(second.context['next_cursor'])
+        self.assertFalse(set(first.context['posts'])
+                         & set(second.context['posts']))
+
+    def test_text_linkified(self):
+        '''Теги в тексте записи становятся ссылками'''
+        post = Post.objects.create(author=self.user, text='<b>#Тег</b>')
+
+        response = self.client.get(reverse('posts:post_detail',
+                                           args=(post.pk,)))
+
+        self.assertContains(
+            response, '&lt;b&gt;<a href="/tags/%D1%82%D0%B5%D0%B3/">#Тег</a>')
+        self.assertEqual(Tag.objects.get().name, 'тег')
@@ -0,0 +1,10 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'tags'
+
+urlpatterns = [
+    path('<str:name>/', views.hashtag, name='hashtag'),
+    path('mention/<str:username>/', views.mention, name='mention'),
+]
@@ -0,0 +1,84 @@
+import operator
+import re
+from functools import reduce
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+from .models import HASHTAG, MENTION, PostTag, Tag
+
+User = get_user_model()
+
+HASHTAG_RE = re.compile(r'(?<![\w&])#(\w{1,100})')
+MENTION_RE = re.compile(r'(?<![\w.])@([\w.+-]{1,150})(?<![.])')
+
+
+def extract(text):
+    """Хэштеги (в нижнем регистре) и упоминания из текста записи."""
+    hashtags = {name.lower() for name in HASHTAG_RE.findall(text)}
+    mentions = set(MENTION_RE.findall(text))
+    return hashtags, mentions
+
+
+def count_key(tag_id):
+    return f'tag-count:{tag_id}'
+
+
+def tag_count(tag):
+    key = count_key(tag.pk)
+    count = cache.get(key)
+    if count is None:
+        count = tag.post_tags.count()
+        cache.set(key, count, settings.TAG_COUNT_TIMEOUT)
+    return count
+
+
+def _resolve(wanted):
+    """Возвращает {(вид, имя): id}, создавая недостающие теги."""
+    if not wanted:
+        return {}
+    Tag.objects.bulk_create(
+        [Tag(kind=kind, name=name) for kind, name in wanted],
+        ignore_conflicts=True)
+    names = {name for _, name in wanted}
+    return {(kind, name): pk for pk, kind, name in
+            Tag.objects.filter(name__in=names)
+            .values_list('pk', 'kind', 'name')
+            if (kind, name) in wanted}
+
+
+def sync_posts(posts):
+    """Приводит индекс тегов к тексту записей, меняя только разницу."""
+    parsed = {post.pk: extract(post.text) for post in posts}
+    usernames = set().union(*(mentions for _, mentions in parsed.values()))
+    existing_users = set(User.objects.filter(
+        username__in=usernames).values_list('username', flat=True))
+    wanted = {}
+    for post_id, (hashtags, mentions) in parsed.items():
+        wanted[post_id] = (
+            {(HASHTAG, name) for name in hashtags}
+            | {(MENTION, name) for name in mentions & existing_users})
+    with transaction.atomic():
+        tag_ids = _resolve(set().union(*wanted.values()))
+        desired = {(post_id, tag_ids[pair])
+                   for post_id, pairs in wanted.items() for pair in pairs}
+        current = set(PostTag.objects.filter(post_id__in=parsed)
+                      .values_list('post_id', 'tag_id'))
+        removed = current - desired
+        added = desired - current
+        if removed:
+            PostTag.objects.filter(reduce(operator.or_, (
+                Q(post_id=post_id, tag_id=tag_id)
+                for post_id, tag_id in removed))).delete()
+        dates = {post.pk: post.pub_date for post in posts}
+        PostTag.objects.bulk_create(
+            [PostTag(post_id=post_id, tag_id=tag_id,
+                     pub_date=dates[post_id])
+             for post_id, tag_id in added])
+    changed = {tag_id for _, tag_id in removed | added}
+    if changed:
+        cache.delete_many([count_key(tag_id) for tag_id in changed])
+    return len(added), len(removed)
@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.db.models import Q
+from django.shortcuts import get_object_or_404, render
+
+from posts.utils import decode_cursor, encode_cursor
+from shards.utils import is_sharded, posts_by_ids
+from .models import HASHTAG, MENTION, Tag
+from .utils import tag_count
+
+
+def _feed(request, tag):
+    per_page = settings.POSTS_PER_PAGE
+    rows = tag.post_tags.order_by('-pub_date', '-post_id')
+    cursor = decode_cursor(request.GET.get('before'))
+    if cursor is not None:
+        pub_date, post_id = cursor
+        rows = rows.filter(Q(pub_date__lt=pub_date)
+                           | Q(pub_date=pub_date, post_id__lt=post_id))
+    if is_sharded():
+        # Записи лежат в шардах авторов, JOIN из основной базы их не видит.
+        rows = list(rows[:per_page + 1])
+        found = posts_by_ids(row.post_id for row in rows[:per_page])
+        posts = [found[row.post_id] for row in rows[:per_page]
+                 if row.post_id in found]
+    else:
+        rows = list(rows.select_related('post__author', 'post__group')
+                    [:per_page + 1])
+        posts = [row.post for row in rows[:per_page]]
+    next_cursor = None
+    if len(rows) > per_page:
+        last = rows[per_page - 1]
+        next_cursor = encode_cursor(last.pub_date, last.post_id)
+    context = {
+        'tag': tag,
+        'tag_count': tag_count(tag),
+        'posts': posts,
+        'next_cursor': next_cursor,
+    }
+    return render(request, 'tags/tag_feed.html', context)
+
+
+def hashtag(request, name):
+    return _feed(request, get_object_or_404(Tag, kind=HASHTAG,
+                                            name=name.lower()))
+
+
+def mention(request, username):
+    return _feed(request, get_object_or_404(Tag, kind=MENTION,
+                                            name=username))
@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import Http404
+
+User = get_user_model()
+
+
+def user_key(user_id):
+    return f'user:{user_id}'
+
+
+def username_key(username):
+    return f'username:{username}'
+
+
+def get_cached_user(user_id, loader=None):
+    """Пользователь по id из кэша; при промахе загружается loader-ом."""
+    key = user_key(user_id)
+    user = cache.get(key)
+    if user is None:
+        if loader is None:
+            user = User.objects.filter(pk=user_id).first()
+        else:
+            user = loader(user_id)
+        if user is not None:
+            cache.set(key, user, settings.USER_CACHE_TIMEOUT)
+    return user
+
+
+def get_user_by_username_or_404(username):
+    """Пользователь по username: id берётся из кэша, объект — тоже."""
+    user_id = cache.get(username_key(username))
+    if user_id is not None:
+        user = get_cached_user(user_id)
+        if user is not None and user.username == username:
+            return user
+    user = User.objects.filter(username=username).first()
+    if user is None:
+        raise Http404('Пользователь не найден')
+    cache.set_many({
+        username_key(username): user.pk,
+        user_key(user.pk): user,
+    }, settings.USER_CACHE_TIMEOUT)
+    return user
+
+
+def invalidate_user(sender, instance, **kwargs):
+    cache.delete_many([user_key(instance.pk),
+                       username_key(instance.username)])
@@ -0,0 +1,133 @@
+import json
+import zipfile
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from archive.models import ArchivedComment, ArchivedPost
+from posts.models import Comment, Follow, Group, Post
+from profile_edit.models import ProfileEdit
+from shards.utils import shard_aliases, shard_for_author
+
+FORMATS = {
+    'zip': ('application/zip', 'zip'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+
+def _line(kind, data):
+    data['type'] = kind
+    return (json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False)
+            + '\n').encode()
+
+
+def _rows(queryset, *fields):
+    chunk_size = settings.EXPORT_CHUNK_SIZE
+    return queryset.order_by('pk').values(*fields).iterator(
+        chunk_size=chunk_size)
+
+
+def _posts(user):
+    return Post.objects.using(shard_for_author(user.pk)).filter(author=user)
+
+
+def records(user):
+    """Построчно отдаёт данные пользователя в формате NDJSON."""
+    yield _line('user', {
+        'username': user.username,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'email': user.email,
+        'date_joined': user.date_joined,
+    })
+    for row in _rows(ProfileEdit.objects.filter(author=user),
+                     'description', 'profile_image'):
+        yield _line('profile', row)
+    # Записи лежат в шарде автора, а архив может быть отдельной базой,
+    # поэтому slug группы берётся из основной, а не JOIN-ом.
+    slugs = None
+    for queryset, extra in (
+            (_posts(user), {}),
+            (ArchivedPost.objects.filter(author=user), {'archived': True})):
+        for row in _rows(queryset, 'id', 'title', 'text', 'pub_date',
+                         'group_id', 'image'):
+            if slugs is None:
+                slugs = dict(Group.objects.values_list('pk', 'slug'))
+            row['group__slug'] = slugs.get(row.pop('group_id'))
+            yield _line('post', {**row, **extra})
+    # Комментировать можно записи любого шарда.
+    for alias in shard_aliases():
+        for row in _rows(Comment.objects.using(alias).filter(author=user),
+                         'id', 'post_id', 'text', 'created'):
+            yield _line('comment', row)
+    for row in _rows(ArchivedComment.objects.filter(author=user),
+                     'id', 'post_id', 'text', 'created'):
+        yield _line('comment', {**row, 'archived': True})
+    for row in _rows(Follow.objects.filter(user=user), 'author__username'):
+        yield _line('following', {'username': row['author__username']})
+    for row in _rows(Follow.objects.filter(author=user), 'user__username'):
+        yield _line('follower', {'username': row['user__username']})
+
+
+def _media_files(user):
+    image_field = Post._meta.get_field('image')
+    for queryset in (_posts(user), ArchivedPost.objects.filter(author=user)):
+        for name in queryset.exclude(
+                image='').order_by('pk').values_list('image', flat=True) \
+                .iterator(chunk_size=settings.EXPORT_CHUNK_SIZE):
+            yield image_field.storage, name
+    profile_field = ProfileEdit._meta.get_field('profile_image')
+    for name in ProfileEdit.objects.filter(author=user).exclude(
+            profile_image='').values_list('profile_image', flat=True):
+        yield profile_field.storage, name
+
+
+class _Pipe:
+    """Поток без seek для ZipFile: копит записанные байты до выдачи."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def zip_stream(user):
+    """Отдаёт ZIP-архив по частям, не держа его целиком в памяти."""
+    block_size = settings.EXPORT_BLOCK_SIZE
+    pipe = _Pipe()
+    with zipfile.ZipFile(pipe, 'w') as archive:
+        info = zipfile.ZipInfo('data.ndjson')
+        info.compress_type = zipfile.ZIP_DEFLATED
+        with archive.open(info, 'w', force_zip64=True) as entry:
+            for line in records(user):
+                entry.write(line)
+                if pipe.chunks:
+                    yield pipe.drain()
+        for storage, name in _media_files(user):
+            if not storage.exists(name):
+                continue
+            with storage.open(name, 'rb') as source, archive.open(
+                    f'media/{name}', 'w', force_zip64=True) as entry:
+                while True:
+                    block = source.read(block_size)
+                    if not block:
+                        break
+                    entry.write(block)
+                    yield pipe.drain()
+    yield pipe.drain()
+
+
+def export_stream(user, export_format):
+    if export_format == 'ndjson':
+        return records(user)
+    return zip_stream(user)
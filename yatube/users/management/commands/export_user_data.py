@@ -0,0 +1,28 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from users.export import FORMATS, export_stream
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Выгружает записи, комментарии, подписки и медиа пользователя.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('--format', choices=tuple(FORMATS), default='zip')
+        parser.add_argument('--output', default=None,
+                            help='Имя файла, по умолчанию <username>.<ext>')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError('Пользователь не найден')
+        extension = FORMATS[options['format']][1]
+        output = options['output'] or f'{user.username}.{extension}'
+        with open(output, 'wb') as destination:
+            for chunk in export_stream(user, options['format']):
+                destination.write(chunk)
+        self.stdout.write(self.style.SUCCESS(f'Архив сохранён в {output}'))
@@ -0,0 +1,44 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from users.cache import get_user_by_username_or_404
+
+User = get_user_model()
+
+
+class CachedUserTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.url = reverse('about:author')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_anonymous_request_skips_session(self):
+        '''Анонимный запрос не обращается к сессии и пользователям'''
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+    def test_authenticated_user_cached(self):
+        '''Повторный запрос берёт сессию и пользователя из кэша'''
+        client = Client()
+        client.force_login(self.user)
+        client.get(self.url)
+
+        # Остаётся только счётчик уведомлений в шапке.
+        with self.assertNumQueries(1):
+            response = client.get(self.url)
+
+        self.assertEqual(response.context['user'], self.user)
+
+    def test_user_invalidated_on_save(self):
+        '''Сохранение пользователя сбрасывает кэш'''
+        get_user_by_username_or_404('author')
+        self.user.first_name = 'Новое'
+        self.user.save()
+
+        self.assertEqual(get_user_by_username_or_404('author').first_name,
+                         'Новое')
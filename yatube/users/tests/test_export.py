@@ -0,0 +1,89 @@
+import io
+import json
+import shutil
+import tempfile
+import zipfile
+from datetime import timedelta
+
+from archive.utils import archive_posts
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from posts.models import Comment, Follow, Post
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ExportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.other = User.objects.create_user(username='other')
+        cls.client_author = Client()
+        cls.client_author.force_login(cls.user)
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='тестовый текст',
+            image=SimpleUploadedFile('small.gif', b'GIF89a' * 100,
+                                     content_type='image/gif'),
+        )
+        Comment.objects.create(post=cls.post, author=cls.user, text='мой')
+        Follow.objects.create(user=cls.user, author=cls.other)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_ndjson_export(self):
+        '''NDJSON содержит записи, комментарии и подписки'''
+        response = self.client_author.get(reverse('users:export'),
+                                          {'format': 'ndjson'})
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        kinds = [json.loads(line)['type'] for line in lines]
+
+        self.assertEqual(kinds, ['user', 'post', 'comment', 'following'])
+
+    def test_zip_export(self):
+        '''ZIP-архив содержит данные и картинки'''
+        response = self.client_author.get(reverse('users:export'))
+        archive = zipfile.ZipFile(
+            io.BytesIO(b''.join(response.streaming_content)))
+
+        self.assertEqual(archive.testzip(), None)
+        self.assertEqual(archive.read(f'media/{self.post.image.name}'),
+                         b'GIF89a' * 100)
+        self.assertIn(b'"post"', archive.read('data.ndjson'))
+
+    def test_archived_content_exported(self):
+        '''Выгрузка включает архивные записи, комментарии и картинки'''
+        old = Post.objects.create(
+            author=self.user, text='старая запись',
+            image=SimpleUploadedFile('old.gif', b'GIF89a' * 10,
+                                     content_type='image/gif'))
+        Comment.objects.create(post=old, author=self.user, text='старый')
+        Post.objects.filter(pk=old.pk).update(
+            pub_date=timezone.now() - timedelta(days=1000))
+        archive_posts(timezone.now() - timedelta(days=365))
+
+        response = self.client_author.get(reverse('users:export'))
+        archive = zipfile.ZipFile(
+            io.BytesIO(b''.join(response.streaming_content)))
+        lines = [json.loads(line) for line in
+                 archive.read('data.ndjson').decode().splitlines()]
+
+        archived = {(line['type'], line['text']): line for line in lines
+                    if line.get('archived')}
+
+        self.assertEqual(set(archived), {('post', 'старая запись'),
+                                         ('comment', 'старый')})
+        self.assertEqual(archived['post', 'старая запись']['id'], old.pk)
+        self.assertEqual(archive.read(f'media/{old.image.name}'),
+                         b'GIF89a' * 10)
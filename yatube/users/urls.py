@@ -10,5 +10,6 @@ urlpatterns = [
          name='logout'),
     path('signup/', views.SignUp.as_view(), name='signup'),
     path('login/', LoginView.as_view(template_name='users/login.html'),
-         name='login')
+         name='login'),
+    path('export/', views.export_data, name='export'),
 ]
@@ -1,10 +1,30 @@
+from django.contrib.auth.decorators import login_required
+from django.http import StreamingHttpResponse
 from django.urls import reverse_lazy
+from django.utils.decorators import method_decorator
 from django.views.generic import CreateView
 
+from core.ratelimit import ratelimit
+from .export import FORMATS, export_stream
 from .forms import CreationForm
 
 
+@method_decorator(ratelimit, name='dispatch')
 class SignUp(CreateView):
     form_class = CreationForm
     success_url = reverse_lazy('posts:index')
     template_name = 'users/signup.html'
+
+
+@login_required
+def export_data(request):
+    export_format = request.GET.get('format')
+    if export_format not in FORMATS:
+        export_format = 'zip'
+    content_type, extension = FORMATS[export_format]
+    response = StreamingHttpResponse(
+        export_stream(request.user, export_format),
+        content_type=content_type)
+    response['Content-Disposition'] = (
+        f'attachment; filename="{request.user.username}.{extension}"')
+    return response
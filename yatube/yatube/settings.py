@@ -1,4 +1,5 @@
 import os
+import sys
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -18,6 +19,12 @@ INSTALLED_APPS = [
     'core',
     'about',
     'profile_edit',
+    'notifications',
+    'archive',
+    'tags',
+    'shards',
+    'querystats',
+    'moderation',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -27,11 +34,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'querystats.middleware.QueryStatsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.compression.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'core.surrogates.SurrogateKeyMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'users.middleware.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     ]
@@ -47,14 +57,23 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Кэширующий загрузчик включён явно: по умолчанию Django
+            # отключает его при DEBUG = True.
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
-                'core.context_processors.year.year'
+                'core.context_processors.year.year',
+                'notifications.context_processors.unread_notifications',
+                'posts.context_processors.unread_feed',
             ],
         },
     },
@@ -69,6 +88,29 @@ DATABASES = {
     }
 }
 
+# Для отдельного файла архива добавьте базу 'archive' в DATABASES,
+# укажите ARCHIVE_DATABASE = 'archive' и выполните
+# python manage.py migrate archive --database=archive
+ARCHIVE_DATABASE = 'default'
+
+# Записи и комментарии раскладываются по авторам между базами из
+# POST_SHARDS. Добавьте базы в DATABASES, перечислите их здесь, выполните
+# migrate --database=<шард> и перенесите авторов командой rebalance_shards.
+POST_SHARDS = ['default']
+
+# Дополнительные базы для тестов шардов и отдельного архива (shards.tests,
+# archive.tests) существуют только под manage.py test, в памяти, и
+# создаются лишь для тестов, которые их запрашивают.
+if sys.argv[1:2] == ['test']:
+    for alias in ('shard', 'archive'):
+        DATABASES[alias] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': ':memory:',
+        }
+
+DATABASE_ROUTERS = ['shards.routers.ShardRouter',
+                    'archive.routers.ArchiveRouter']
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -114,8 +156,145 @@ MEDIA_URL = '/media/'
 
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Медиафайлы отдаёт core.media.serve. В продакшене передачу берёт на себя
+# фронтенд: 'x-accel-redirect' для nginx (нужен internal location
+# MEDIA_ACCEL_PREFIX с alias на MEDIA_ROOT) или 'x-sendfile' для Apache и
+# lighttpd. None — отдавать файлы из Python.
+MEDIA_ACCEL = None
+
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+
+MEDIA_PUBLIC_DIRS = ('posts/', 'profile_image/')
+
+MEDIA_MAX_AGE = 60 * 60 * 24 * 30
+
+MEDIA_BLOCK_SIZE = 64 * 1024
+
 CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
+    },
+    'compression': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'compression',
+    },
+}
+
+NOTIFICATIONS_BATCH_SIZE = 500
+
+NOTIFICATIONS_BADGE_LIMIT = 99
+
+DIGEST_CHUNK_SIZE = 500
+
+DIGEST_POSTS_LIMIT = 20
+
+EXPORT_CHUNK_SIZE = 500
+
+EXPORT_BLOCK_SIZE = 64 * 1024
+
+IMPORT_BATCH_SIZE = 1000
+
+ADMIN_PERFORMANCE_MODE = True
+
+ADMIN_COUNT_TIMEOUT = 60 * 5
+
+ARCHIVE_AFTER_DAYS = 365 * 2
+
+ARCHIVE_BATCH_SIZE = 500
+
+RATELIMIT_CACHE = 'default'
+
+RATELIMIT_TRUST_FORWARDED_FOR = False
+
+RATELIMITS = {
+    'posts:add_comment': {'rate': '10/m', 'burst': 5, 'methods': ('POST',)},
+    'posts:post_create': {'rate': '5/m', 'burst': 3, 'methods': ('POST',)},
+    'posts:profile_follow': {'rate': '30/m', 'burst': 10},
+    'posts:profile_unfollow': {'rate': '30/m', 'burst': 10},
+    'posts:follow_bulk': {'rate': '10/h', 'burst': 5},
+    'users:signup': {'rate': '5/h', 'burst': 3, 'methods': ('POST',)},
 }
+
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+USER_CACHE_TIMEOUT = 60 * 15
+
+POST_FRAGMENT_TIMEOUT = 60 * 60 * 24
+
+WARMUP_GROUPS = 5
+
+PROFILE_CARD_TIMEOUT = 60 * 15
+
+TAG_COUNT_TIMEOUT = 60 * 10
+
+TAG_BACKFILL_CHUNK_SIZE = 500
+
+COMPRESSION_MIN_LENGTH = 200
+
+COMPRESSION_GZIP_LEVEL = 6
+
+COMPRESSION_BROTLI_LEVEL = 5
+
+COMPRESSION_CACHE = 'compression'
+
+COMPRESSION_CACHE_TIMEOUT = 60 * 5
+
+COMPRESSION_CACHE_MAX_LENGTH = 512 * 1024
+
+SURROGATE_PURGER = 'core.surrogates.LocalPurger'
+
+SURROGATE_PURGE_URL = 'http://127.0.0.1:6081/'
+
+SURROGATE_PURGE_BATCH_SIZE = 256
+
+SURROGATE_PURGE_TIMEOUT = 5
+
+SURROGATE_MAX_AGE = 60 * 60 * 24
+
+SHARD_MAP_TIMEOUT = 60
+
+SHARD_COPY_BATCH_SIZE = 500
+
+FOLLOW_BULK_LIMIT = 500
+
+FEED_BADGE_LIMIT = 99
+
+FEED_UNREAD_TIMEOUT = 60
+
+COMMENT_THREADS_PER_PAGE = 20
+
+COMMENT_THREAD_DEPTH = 3
+
+COMMENT_MAX_DEPTH = 20
+
+GROUP_ACTIVITY_DAYS = 7
+
+GROUP_DIRECTORY_TIMEOUT = 60 * 5
+
+IMAGE_PLACEHOLDER_SIZE = 16
+
+IMAGE_PLACEHOLDER_QUALITY = 40
+
+IMAGE_BACKFILL_CHUNK_SIZE = 200
+
+QUERYSTATS_SAMPLE_RATE = 0.1
+
+QUERYSTATS_FLUSH_INTERVAL = 60
+
+SPAM_MIN_LENGTH = 40
+
+SPAM_SHINGLE_SIZE = 5
+
+SPAM_MAX_SHINGLES = 1000
+
+SPAM_MINHASH_PERMUTATIONS = 64
+
+SPAM_LSH_BANDS = 16
+
+SPAM_DUPLICATE_THRESHOLD = 0.7
+
+SPAM_MAX_CANDIDATES = 50
+
+SPAM_INDEX_DAYS = 30
+
+SPAM_INDEX_CHUNK_SIZE = 100
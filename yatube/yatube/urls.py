@@ -1,9 +1,10 @@
 from argparse import Namespace
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
+from core.media import serve
+
 handler404 = 'core.views.page_not_found'
 handler403 = 'core.views.csrf_failure'
 handler500 = 'core.views.internal_server_error'
@@ -14,9 +15,14 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('auth/', include('django.contrib.auth.urls')),
     path('about/', include('about.urls', namespace='about')),
-    path('profile_edit/', include('profile_edit.urls', namespace='profile_edit'))
+    path('profile_edit/', include('profile_edit.urls', namespace='profile_edit')),
+    path('notifications/', include('notifications.urls',
+                                   namespace='notifications')),
+    path('tags/', include('tags.urls', namespace='tags')),
 
 ] 
 
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+if settings.MEDIA_URL.startswith('/'):
+    urlpatterns.append(
+        path(settings.MEDIA_URL.lstrip('/') + '<path:path>', serve,
+             name='media'))
\ No newline at end of file
@@ -5,3 +5,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
 application = get_wsgi_application()
+
+if os.environ.get('YATUBE_WARMUP', '1') == '1':
+    from core.warmup import warm_up
+
+    warm_up(application)